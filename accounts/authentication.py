@@ -0,0 +1,86 @@
+import logging
+
+import redis
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+logger = logging.getLogger(__name__)
+
+
+def user_version_key(user_id):
+    """Cache key holding the user's cache version, bumped on every invalidation"""
+    return f'auth:user:{user_id}:version'
+
+
+def user_cache_key(user_id, version):
+    """Cache key holding the resolved user for a JWT user ID and cache version"""
+    return f'auth:user:{user_id}:v{version}'
+
+
+def invalidate_cached_user(user_id):
+    """
+    Bump the user's cache version so the next request reloads them from the
+    database; entries cached under older versions are never read again
+    """
+    key = user_version_key(user_id)
+    try:
+        try:
+            cache.incr(key)
+        except ValueError:
+            if not cache.add(key, 1, None):
+                cache.incr(key)
+    except redis.RedisError as exc:
+        logger.warning("Could not invalidate cached user %s: %s", user_id, exc)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that resolves users from a short-lived cache.
+
+    Only the user lookup is cached; the token signature and expiry are still
+    verified on every request, and the active-user and password-hash revoke
+    checks run against the cached user. Entries are keyed by a per-user
+    version that is bumped whenever the user is saved or logs out, so a
+    password change takes effect on the next request. When the cache is
+    unavailable users are loaded from the database. Refresh tokens (and
+    their blacklist) never go through here.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        try:
+            key = user_cache_key(user_id, cache.get(user_version_key(user_id), 0))
+            user = cache.get(key)
+        except redis.RedisError as exc:
+            logger.warning("Could not read cached user %s: %s", user_id, exc)
+            return super().get_user(validated_token)
+
+        if user is None:
+            user = super().get_user(validated_token)
+            try:
+                cache.set(key, user, settings.AUTH_USER_CACHE_TTL)
+            except redis.RedisError as exc:
+                logger.warning("Could not cache user %s: %s", user_id, exc)
+            return user
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
@@ -1,3 +1,77 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+import redis
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from .authentication import CachedJWTAuthentication, user_version_key
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CachedJWTAuthenticationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('owner')
+        self.authentication = CachedJWTAuthentication()
+
+    def authenticate(self, token):
+        return self.authentication.get_user(self.authentication.get_validated_token(str(token)))
+
+    def version(self):
+        return cache.get(user_version_key(self.user.id), 0)
+
+    def test_user_is_served_from_cache(self):
+        token = AccessToken.for_user(self.user)
+        self.authenticate(token)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate(token), self.user)
+
+    def test_save_invalidates_cached_user(self):
+        token = AccessToken.for_user(self.user)
+        self.authenticate(token)
+        version = self.version()
+
+        self.user.first_name = 'Ada'
+        self.user.save()
+
+        self.assertEqual(self.version(), version + 1)
+        self.assertEqual(self.authenticate(token).first_name, 'Ada')
+
+    def test_deactivated_user_is_rejected(self):
+        token = AccessToken.for_user(self.user)
+        self.authenticate(token)
+
+        self.user.is_active = False
+        self.user.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_logout_invalidates_cached_user(self):
+        refresh = RefreshToken.for_user(self.user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        version = self.version()
+
+        response = client.post('/api/auth/logout/', {'refresh_token': str(refresh)})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.version(), version + 1)
+
+    def test_cache_errors_fall_back_to_database(self):
+        token = AccessToken.for_user(self.user)
+        error = redis.ConnectionError("Connection refused")
+
+        with mock.patch.object(cache, 'get', side_effect=error), mock.patch.object(cache, 'incr', side_effect=error):
+            self.assertEqual(self.authenticate(token), self.user)
+            self.user.first_name = 'Ada'
+            self.user.save()
+
+        with mock.patch.object(cache, 'set', side_effect=error):
+            self.assertEqual(self.authenticate(token).first_name, 'Ada')
@@ -3,6 +3,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth.models import User
+from .authentication import invalidate_cached_user
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, 
     UserProfileSerializer, ChangePasswordSerializer
@@ -94,6 +95,8 @@ def logout(request):
             token = RefreshToken(refresh_token)
             token.blacklist()
         
+        invalidate_cached_user(request.user.pk)
+        
         return Response({'message': 'Logout successful'})
     except Exception:
         return Response({'error': 'Invalid token'}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
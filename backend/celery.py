@@ -20,6 +20,38 @@ app.conf.beat_schedule = {
         'task': 'monitoring.tasks.periodic_website_checks',
         'schedule': 60.0,  # Run every 60 seconds
     },
+    'rollup-status-check-counters': {
+        'task': 'monitoring.tasks.rollup_status_check_counters',
+        'schedule': 300.0,  # Run every 5 minutes
+    },
+    'deliver-notifications': {
+        'task': 'monitoring.tasks.deliver_notifications',
+        'schedule': 60.0,  # Flush once per digest window, set from NOTIFICATION_DIGEST_WINDOW below
+    },
+    'check-certificates': {
+        'task': 'monitoring.tasks.check_certificates',
+        'schedule': 3600.0,  # Run hourly, each host:port is re-inspected per TLS_CHECK_INTERVAL
+    },
+    'detect-response-time-anomalies': {
+        'task': 'monitoring.tasks.detect_response_time_anomalies',
+        'schedule': 60.0,  # Run every minute
+    },
+    'sweep-heartbeats': {
+        'task': 'monitoring.tasks.sweep_heartbeats',
+        'schedule': 30.0,  # Run every 30 seconds
+    },
+    'purge-websites': {
+        'task': 'monitoring.tasks.purge_websites',
+        'schedule': 3600.0,  # Run hourly, each run is capped by WEBSITE_PURGE_MAX_SECONDS
+    },
+    'reconcile-dashboards': {
+        'task': 'monitoring.tasks.reconcile_dashboards',
+        'schedule': 900.0,  # Run every 15 minutes; checks and alerts update aggregates in between
+    },
+    'render-status-pages': {
+        'task': 'monitoring.tasks.render_status_pages',
+        'schedule': 3600.0,  # Run hourly; incident changes re-render pages immediately
+    },
     'cleanup-old-status-checks': {
         'task': 'monitoring.tasks.cleanup_old_status_checks',
         'schedule': 86400.0,  # Run daily
@@ -28,6 +60,13 @@ app.conf.beat_schedule = {
 
 app.conf.timezone = 'UTC'
 
+
+@app.on_after_configure.connect
+def apply_settings_to_schedule(sender, **kwargs):
+    # Django settings may still be loading when this module is imported
+    sender.conf.beat_schedule['deliver-notifications']['schedule'] = float(settings.NOTIFICATION_DIGEST_WINDOW)
+
+
 @app.task(bind=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
\ No newline at end of file
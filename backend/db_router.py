@@ -0,0 +1,80 @@
+"""
+Primary/replica database routing
+
+All writes, and every read outside an HTTP request (Celery tasks, the
+result writers, management commands), go to the primary `default`
+database. Reads made while serving a safe (GET/HEAD/OPTIONS) request go
+to one of the DATABASE_REPLICAS aliases, unless the request is pinned to
+the primary:
+
+- as soon as the request itself writes, its remaining reads use the
+  primary (read-your-writes within the request);
+- a request that wrote sets a short-lived cookie, and follow-up requests
+  carrying it read from the primary until replicas have caught up.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+PIN_COOKIE = 'db_primary_pin'
+
+_request_state = ContextVar('db_request_state', default=None)
+
+
+class RequestState:
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+class PrimaryReplicaRouter:
+    """Database router sending request reads to replicas and everything else to the primary"""
+
+    def db_for_read(self, model, **hints):
+        state = _request_state.get()
+        if state is None or not state.use_replica or state.wrote or not settings.DATABASE_REPLICAS:
+            return 'default'
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas mirror the primary, so objects from any alias may be related
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+class ReplicaRoutingMiddleware:
+    """Mark safe, unpinned requests as eligible for replica reads"""
+
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RequestState(
+            use_replica=request.method in self.SAFE_METHODS and PIN_COOKIE not in request.COOKIES
+        )
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+
+        if state.wrote and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
@@ -0,0 +1,193 @@
+"""
+Sampled per-request profiling
+
+ProfilingMiddleware profiles a PROFILING_SAMPLE_RATE share of requests:
+
+- every SQL query on every database alias is counted and timed through a
+  connection execute wrapper, and repeated SQL (the same statement run
+  with different parameters, the signature of an N+1 lookup) is counted
+  as duplicates;
+- the response gets a Server-Timing header splitting the request into
+  db, app (view and serializer code outside SQL) and render time;
+- per-view totals are accumulated in the cache and reported by
+  `manage.py profiling_stats`;
+- with PROFILING_CPROFILE on, sampled requests also run under cProfile
+  and the ones slower than PROFILING_CPROFILE_MIN_MS are dumped to
+  PROFILING_CPROFILE_DIR as .prof files.
+
+Requests that are not sampled pay for one random() call.
+"""
+import cProfile
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+
+STATS_PREFIX = 'profiling:'
+VIEWS_KEY = f'{STATS_PREFIX}views'
+STAT_FIELDS = ['requests', 'total_us', 'db_us', 'render_us', 'queries', 'duplicates']
+
+logger = logging.getLogger(__name__)
+
+
+class RequestProfile:
+    """Query and phase timings of one request; also the execute wrapper collecting them"""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.signatures = Counter()
+        self.render_started = None
+        self.render_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.queries += 1
+            self.signatures[sql] += 1
+
+    def rendered(self, response):
+        self.render_time = time.perf_counter() - self.render_started
+
+    @property
+    def duplicates(self):
+        return sum(count - 1 for count in self.signatures.values())
+
+    def most_repeated(self):
+        return self.signatures.most_common(1)[0]
+
+    def server_timing(self, total):
+        app = max(total - self.sql_time - self.render_time, 0.0)
+        return ', '.join([
+            f'db;dur={self.sql_time * 1000:.1f};desc="{self.queries} queries, {self.duplicates} duplicates"',
+            f'app;dur={app * 1000:.1f}',
+            f'render;dur={self.render_time * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+
+class ProfilingMiddleware:
+    """Profile a sample of requests (see the module docstring)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.PROFILING_SAMPLE_RATE:
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        request._profile = profile
+        profiler = cProfile.Profile() if settings.PROFILING_CPROFILE else None
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile))
+            if profiler:
+                profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiler:
+                    profiler.disable()
+        total = time.perf_counter() - started
+
+        view = view_label(request)
+        response['Server-Timing'] = profile.server_timing(total)
+        try:
+            record_stats(view, profile, total)
+        except Exception as exc:
+            # Profiling must never fail the request it measured, e.g. with the cache down
+            logger.warning("Could not record profiling stats for %s: %s", view, exc)
+
+        if profile.queries and profile.duplicates >= settings.PROFILING_DUPLICATE_THRESHOLD:
+            sql, count = profile.most_repeated()
+            logger.warning("%s ran %d duplicate queries; repeated %d times: %s", view, profile.duplicates, count, sql)
+        if profiler and total * 1000 >= settings.PROFILING_CPROFILE_MIN_MS:
+            dump_profile(profiler, view)
+        return response
+
+    def process_template_response(self, request, response):
+        profile = getattr(request, '_profile', None)
+        if profile is not None:
+            profile.render_started = time.perf_counter()
+            response.add_post_render_callback(profile.rendered)
+        return response
+
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    name = (match.view_name or match._func_path) if match else 'unresolved'
+    return f'{request.method}:{name}'
+
+
+def record_stats(view, profile, total):
+    """Add one request to the view's totals in the cache"""
+    values = {
+        'requests': 1,
+        'total_us': int(total * 1_000_000),
+        'db_us': int(profile.sql_time * 1_000_000),
+        'render_us': int(profile.render_time * 1_000_000),
+        'queries': profile.queries,
+        'duplicates': profile.duplicates,
+    }
+    for field, value in values.items():
+        key = f'{STATS_PREFIX}{view}:{field}'
+        try:
+            cache.incr(key, value)
+        except ValueError:
+            # Missing key; another process may create it in between
+            if not cache.add(key, value, settings.PROFILING_STATS_TTL):
+                cache.incr(key, value)
+
+    views = cache.get(VIEWS_KEY, [])
+    if view not in views:
+        cache.set(VIEWS_KEY, [*views, view], settings.PROFILING_STATS_TTL)
+
+
+def view_stats():
+    """Return aggregated per-view stats, slowest average first"""
+    views = cache.get(VIEWS_KEY, [])
+    stored = cache.get_many([f'{STATS_PREFIX}{view}:{field}' for view in views for field in STAT_FIELDS])
+
+    rows = []
+    for view in views:
+        totals = {field: stored.get(f'{STATS_PREFIX}{view}:{field}', 0) for field in STAT_FIELDS}
+        requests = totals['requests']
+        if not requests:
+            continue
+        rows.append({
+            'view': view,
+            'requests': requests,
+            'avg_ms': totals['total_us'] / requests / 1000,
+            'avg_db_ms': totals['db_us'] / requests / 1000,
+            'avg_render_ms': totals['render_us'] / requests / 1000,
+            'avg_queries': totals['queries'] / requests,
+            'avg_duplicates': totals['duplicates'] / requests,
+        })
+    return sorted(rows, key=lambda row: row['avg_ms'], reverse=True)
+
+
+def reset_stats():
+    views = cache.get(VIEWS_KEY, [])
+    cache.delete_many([f'{STATS_PREFIX}{view}:{field}' for view in views for field in STAT_FIELDS] + [VIEWS_KEY])
+
+
+def dump_profile(profiler, view):
+    directory = Path(settings.PROFILING_CPROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', view)}-{time.time():.0f}.prof"
+    profiler.dump_stats(path)
+    logger.info("Saved profile of slow request %s to %s", view, path)
@@ -12,7 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
-from decouple import config
+import dj_database_url
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -43,6 +44,7 @@ INSTALLED_APPS = [
     # Third party apps
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'django_filters',
 
@@ -52,7 +54,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'backend.profiling.ProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'backend.db_router.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -93,6 +97,20 @@ DATABASES = {
     }
 }
 
+# Read replicas, e.g. DATABASE_REPLICA_URLS=postgres://replica1/db,postgres://replica2/db
+# Dashboard/API reads use them; writes and background jobs stay on 'default'.
+DATABASE_REPLICAS = []
+for index, url in enumerate(config('DATABASE_REPLICA_URLS', default='', cast=Csv())):
+    alias = f'replica{index + 1}'
+    DATABASES[alias] = dj_database_url.parse(url)
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['backend.db_router.PrimaryReplicaRouter']
+
+# Seconds a client that just wrote keeps reading from the primary
+DATABASE_REPLICA_PIN_SECONDS = config('DATABASE_REPLICA_PIN_SECONDS', default=10, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -142,7 +160,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -167,6 +185,32 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
 }
 
+# Cache (shared between web workers so auth invalidation is seen everywhere)
+REDIS_URL = config('REDIS_URL', default='redis://localhost:6379/0')
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.redis.RedisCache'),
+        'LOCATION': config('CACHE_LOCATION', default=REDIS_URL),
+    }
+}
+
+# Seconds a JWT-authenticated user stays cached between DB lookups
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', default=60, cast=int)
+
+# Sampled request profiling (Server-Timing headers, manage.py profiling_stats)
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.0, cast=float)  # share of requests, 0 disables
+PROFILING_DUPLICATE_THRESHOLD = 5  # duplicate queries in one request before an N+1 warning is logged
+PROFILING_STATS_TTL = 7 * 24 * 3600  # seconds
+PROFILING_CPROFILE = config('PROFILING_CPROFILE', default=False, cast=bool)
+PROFILING_CPROFILE_MIN_MS = config('PROFILING_CPROFILE_MIN_MS', default=500, cast=int)
+PROFILING_CPROFILE_DIR = config('PROFILING_CPROFILE_DIR', default=str(BASE_DIR / 'profiles'))
+
+# Default time window for large admin changelists ('1h', '24h', '7d', '30d' or 'all')
+ADMIN_DEFAULT_WINDOW = config('ADMIN_DEFAULT_WINDOW', default='7d')
+# Above this many rows (by the PostgreSQL planner's estimate) admin changelists show an estimated count
+ADMIN_EXACT_COUNT_LIMIT = config('ADMIN_EXACT_COUNT_LIMIT', default=10000, cast=int)
+
 # CORS Settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -180,8 +224,8 @@ CORS_ALLOWED_ORIGINS = [
 CORS_ALLOW_CREDENTIALS = True
 
 # Celery Configuration
-CELERY_BROKER_URL = config('REDIS_URL', default='redis://localhost:6379/0')
-CELERY_RESULT_BACKEND = config('REDIS_URL', default='redis://localhost:6379/0')
+CELERY_BROKER_URL = REDIS_URL
+CELERY_RESULT_BACKEND = REDIS_URL
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
@@ -190,3 +234,83 @@ CELERY_TIMEZONE = 'UTC'
 # Custom settings for monitoring
 WEBSITE_CHECK_INTERVAL = 60  # seconds
 WEBSITE_CHECK_TIMEOUT = 10   # seconds
+WEBSITE_CHECK_MAX_BODY_BYTES = config('WEBSITE_CHECK_MAX_BODY_BYTES', default=256 * 1024, cast=int)  # GET content checks
+
+# How periodic checks are executed: 'celery' (one task per website) or
+# 'redis' (job batches for the standalone monitoring.probe_worker processes)
+PROBE_BACKEND = config('PROBE_BACKEND', default='celery')
+PROBE_BATCH_SIZE = 100  # websites per job batch
+# Where Celery probes put results: 'direct' (write to the DB) or 'stream'
+# (Redis stream consumed by manage.py persist_probe_results writers)
+PROBE_RESULT_PIPELINE = config('PROBE_RESULT_PIPELINE', default='direct')
+# Redis rings of the latest checks per website (website list, uptime, dashboard)
+RECENT_CHECKS_STORE = config('RECENT_CHECKS_STORE', default=True, cast=bool)
+RECENT_CHECKS_SIZE = 100  # checks kept per website; also the uptime_percentage window
+RECENT_CHECKS_TTL = 24 * 3600  # seconds a ring survives without writes
+RECENT_CHECKS_SOCKET_TIMEOUT = 0.5  # seconds before falling back to the database
+WEBSITE_BULK_IMPORT_MAX_ROWS = config('WEBSITE_BULK_IMPORT_MAX_ROWS', default=5000, cast=int)
+WEBSITE_BULK_IMPORT_BATCH_SIZE = 500
+WEBSITE_BULK_IMPORT_ATTEMPTS = 3  # inserts retried after losing a race with a concurrent import
+WEBSITE_BULK_IMPORT_STAGGER = 60  # seconds over which first checks are spread
+
+# Purge of soft-deleted websites
+WEBSITE_PURGE_GRACE = 7 * 24 * 3600  # seconds after deletion before rows are removed
+WEBSITE_PURGE_CHUNK_SIZE = 1000  # rows per delete statement
+WEBSITE_PURGE_THROTTLE = 0.1  # seconds to pause between chunks
+WEBSITE_PURGE_MAX_SECONDS = 300  # per run
+
+# Write-through dashboard aggregates (Redis hashes per user, see monitoring/dashboard.py)
+DASHBOARD_AGGREGATE = config('DASHBOARD_AGGREGATE', default=True, cast=bool)
+DASHBOARD_TTL = 24 * 3600  # seconds an aggregate survives without being read
+DASHBOARD_ALERT_BUCKET = 900  # granularity of the 24h alert counter, in seconds
+
+# Public status pages (pre-rendered snapshots served from the cache)
+STATUS_PAGE_DAYS = 90  # daily uptime bars shown
+STATUS_PAGE_MAX_AGE = config('STATUS_PAGE_MAX_AGE', default=60, cast=int)  # seconds browsers and CDNs may cache a page
+STATUS_PAGE_STALE_SECONDS = 600  # stale-while-revalidate window
+STATUS_PAGE_CACHE_TIMEOUT = 2 * 3600  # outlives the hourly refresh
+STATUS_PAGE_ROOT = config('STATUS_PAGE_ROOT', default='')  # also write <slug>.json files here for a web server/CDN
+
+# Heartbeat monitors: seconds a ping token stays cached before it is looked up again
+HEARTBEAT_TOKEN_CACHE_TTL = 3600
+
+# SLA counters: bucket size of the cumulative check series, in seconds
+SLA_COUNTER_BUCKET = 3600
+SLA_ROLLUP_DELAY = 120  # seconds to wait after a bucket closes before rolling it up
+SLA_ROLLUP_MAX_BUCKETS = 168
+SLA_ROLLUP_REROLL_BUCKETS = 6  # closed buckets rolled up again on every run to count late checks
+
+# Email (alert digests)
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='alerts@localhost')
+
+# Notification delivery pipeline
+NOTIFICATION_DIGEST_WINDOW = 60  # seconds alerts are coalesced before sending
+NOTIFICATION_BATCH_SIZE = 10000  # deliveries picked up per run
+NOTIFICATION_MAX_CONCURRENCY = config('NOTIFICATION_MAX_CONCURRENCY', default=8, cast=int)
+NOTIFICATION_MAX_ATTEMPTS = 5
+NOTIFICATION_RETRY_BACKOFF = 60  # seconds, doubled after each failed attempt
+NOTIFICATION_WEBHOOK_TIMEOUT = 10  # seconds
+NOTIFICATION_WEBHOOK_BACKEND = config(
+    'NOTIFICATION_WEBHOOK_BACKEND', default='monitoring.notifications.RequestsWebhookBackend'
+)
+
+# TLS certificate checks (run separately from the HTTP probes)
+TLS_CHECK_INTERVAL = 12 * 3600  # seconds between inspections of one host:port
+TLS_CHECK_TIMEOUT = 10  # seconds
+TLS_CHECK_CONCURRENCY = 16
+
+# Response time anomaly detection (median + MAD over each website's recent checks)
+ANOMALY_WINDOW = 60  # checks per website used for the baseline
+ANOMALY_RECENT_CHECKS = 3  # latest checks compared against the baseline
+ANOMALY_LOOKBACK = 2 * 3600  # seconds of history loaded per run
+ANOMALY_MIN_SAMPLES = 20
+ANOMALY_MIN_MAD = 5  # milliseconds
+ANOMALY_SCORE_THRESHOLD = 6.0
+ANOMALY_COOLDOWN = 1800  # seconds between anomaly alerts for one website
+ANOMALY_BATCH_SIZE = 5000  # websites loaded per query
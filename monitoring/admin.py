@@ -1,25 +1,182 @@
+import json
+from datetime import timedelta
+
+from django.conf import settings
 from django.contrib import admin
-from .models import Website, StatusCheck, UptimeAlert, AlertNotification
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils import timezone
+from django.utils.functional import cached_property
+from .models import (
+    Website, StatusCheck, Incident, UptimeAlert, AlertNotification,
+    NotificationChannel, NotificationDelivery, StatusPage, TLSCertificate
+)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that avoids exact COUNT(*) on large tables
+    
+    On PostgreSQL the planner's row estimate is used once it exceeds
+    ADMIN_EXACT_COUNT_LIMIT: pg_class.reltuples for an unfiltered
+    changelist, the EXPLAIN estimate for a filtered one (including the
+    default recent window). Smaller results and other backends get a real
+    count.
+    """
+    
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and connections[self.object_list.db].vendor == 'postgresql':
+            estimate = self.estimated_count()
+            if estimate > settings.ADMIN_EXACT_COUNT_LIMIT:
+                return estimate
+        return super().count
+    
+    def estimated_count(self):
+        if self.object_list.query.where:
+            plan = json.loads(self.object_list.explain(format='json'))
+            return int(plan[0]['Plan']['Plan Rows'])
+        with connections[self.object_list.db].cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [self.object_list.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        return row[0] if row else 0
+
+
+class RecentWindowFilter(admin.SimpleListFilter):
+    """
+    Time window filter that defaults to a recent window
+    
+    Without a selection the changelist is bounded to ADMIN_DEFAULT_WINDOW
+    so neither the list nor the date hierarchy scans the full history.
+    """
+    
+    title = 'window'
+    parameter_name = 'window'
+    date_field = None
+    
+    WINDOWS = {
+        '1h': timedelta(hours=1),
+        '24h': timedelta(hours=24),
+        '7d': timedelta(days=7),
+        '30d': timedelta(days=30),
+    }
+    
+    def lookups(self, request, model_admin):
+        return [
+            ('1h', 'Last hour'),
+            ('24h', 'Last 24 hours'),
+            ('7d', 'Last 7 days'),
+            ('30d', 'Last 30 days'),
+            ('all', 'All time'),
+        ]
+    
+    def selected_window(self):
+        """Return the selected window key, falling back to the configured default"""
+        return self.value() or settings.ADMIN_DEFAULT_WINDOW
+    
+    def queryset(self, request, queryset):
+        window = self.WINDOWS.get(self.selected_window())
+        if window is None:
+            return queryset
+        return queryset.filter(**{f'{self.date_field}__gte': timezone.now() - window})
+    
+    def choices(self, changelist):
+        # No unfiltered "All" entry: the default window applies without a selection
+        for lookup, title in self.lookup_choices:
+            yield {
+                'selected': self.selected_window() == lookup,
+                'query_string': changelist.get_query_string({self.parameter_name: lookup}),
+                'display': title,
+            }
+
+
+class CheckedAtWindowFilter(RecentWindowFilter):
+    date_field = 'checked_at'
+
+
+class SentAtWindowFilter(RecentWindowFilter):
+    date_field = 'sent_at'
+
+
+class WebsiteIdFilter(admin.SimpleListFilter):
+    """
+    Filter by website ID typed into a text box
+    
+    Unlike a plain 'website' list filter this never loads every website
+    as a choice.
+    """
+    
+    title = 'website ID'
+    parameter_name = 'website_id'
+    website_lookup = 'website_id'
+    template = 'admin/monitoring/input_filter.html'
+    
+    def lookups(self, request, model_admin):
+        # A non-empty lookup list is required for the filter to be rendered
+        return [('', '')]
+    
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value and value.isdigit():
+            return queryset.filter(**{self.website_lookup: value})
+        return queryset
+    
+    def choices(self, changelist):
+        yield {
+            'value': self.value() or '',
+            'params': [
+                (key, value) for key, value in changelist.params.items()
+                if key != self.parameter_name
+            ],
+        }
+
+
+class AlertWebsiteIdFilter(WebsiteIdFilter):
+    website_lookup = 'alert__website_id'
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Base admin for tables that grow to millions of rows
+    
+    Uses estimated counts and skips the full result count and facet
+    queries; subclasses pair it with list_select_related and raw ID widgets.
+    """
+    
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
 
 
 @admin.register(Website)
 class WebsiteAdmin(admin.ModelAdmin):
     """Admin interface for Website model"""
     
-    list_display = ['name', 'url', 'user', 'status', 'check_interval', 'created_at']
-    list_filter = ['status', 'created_at', 'check_interval']
-    search_fields = ['name', 'url', 'user__username']
-    readonly_fields = ['created_at', 'updated_at', 'latest_status_check', 'uptime_percentage']
+    list_display = ['name', 'url', 'user', 'status', 'current_status', 'check_interval', 'created_at']
+    list_filter = ['status', 'current_status', 'monitor_type', 'created_at', 'check_interval']
+    search_fields = ['name', 'url', 'host', 'user__username']
+    readonly_fields = [
+        'host', 'current_status', 'created_at', 'updated_at', 'last_heartbeat_at',
+        'latest_status_check', 'uptime_percentage'
+    ]
     
     fieldsets = (
         ('Basic Information', {
-            'fields': ('name', 'url', 'user', 'status')
+            'fields': ('name', 'url', 'host', 'user', 'status')
         }),
         ('Monitoring Settings', {
             'fields': ('check_interval', 'timeout')
         }),
+        ('Heartbeat', {
+            'fields': ('monitor_type', 'heartbeat_grace', 'last_heartbeat_at'),
+            'classes': ('collapse',)
+        }),
         ('Status Information', {
-            'fields': ('latest_status_check', 'uptime_percentage'),
+            'fields': ('current_status', 'latest_status_check', 'uptime_percentage'),
             'classes': ('collapse',)
         }),
         ('Timestamps', {
@@ -38,12 +195,14 @@ class WebsiteAdmin(admin.ModelAdmin):
 
 
 @admin.register(StatusCheck)
-class StatusCheckAdmin(admin.ModelAdmin):
+class StatusCheckAdmin(LargeTableAdmin):
     """Admin interface for StatusCheck model"""
     
     list_display = ['website', 'status', 'status_code', 'response_time', 'checked_at']
-    list_filter = ['status', 'checked_at', 'website']
-    search_fields = ['website__name', 'website__url']
+    list_filter = [CheckedAtWindowFilter, 'status', WebsiteIdFilter]
+    list_select_related = ['website']
+    date_hierarchy = 'checked_at'
+    raw_id_fields = ['website', 'error']
     readonly_fields = ['checked_at']
     
     def has_add_permission(self, request):
@@ -51,24 +210,82 @@ class StatusCheckAdmin(admin.ModelAdmin):
         return False
 
 
+@admin.register(Incident)
+class IncidentAdmin(admin.ModelAdmin):
+    """Admin interface for Incident model"""
+    
+    list_display = ['website', 'started_at', 'ended_at', 'check_count', 'cause']
+    list_filter = ['started_at']
+    list_select_related = ['website']
+    raw_id_fields = ['website']
+    date_hierarchy = 'started_at'
+
+
+@admin.register(TLSCertificate)
+class TLSCertificateAdmin(admin.ModelAdmin):
+    """Admin interface for TLSCertificate model"""
+    
+    list_display = ['host', 'port', 'issuer', 'not_after', 'error', 'checked_at']
+    search_fields = ['host']
+    readonly_fields = ['checked_at']
+
+
 @admin.register(UptimeAlert)
 class UptimeAlertAdmin(admin.ModelAdmin):
     """Admin interface for UptimeAlert model"""
     
     list_display = ['website', 'alert_type', 'threshold', 'is_active', 'created_at']
     list_filter = ['alert_type', 'is_active', 'created_at']
+    list_select_related = ['website']
     search_fields = ['website__name', 'website__url']
+    autocomplete_fields = ['website']
 
 
 @admin.register(AlertNotification)
-class AlertNotificationAdmin(admin.ModelAdmin):
+class AlertNotificationAdmin(LargeTableAdmin):
     """Admin interface for AlertNotification model"""
     
     list_display = ['alert', 'status_check', 'sent_at']
-    list_filter = ['sent_at', 'alert__alert_type']
-    search_fields = ['alert__website__name', 'message']
+    list_filter = [SentAtWindowFilter, 'alert__alert_type', AlertWebsiteIdFilter]
+    list_select_related = ['alert__website', 'status_check__website']
+    date_hierarchy = 'sent_at'
+    raw_id_fields = ['alert', 'status_check']
+    search_fields = ['message']
     readonly_fields = ['sent_at']
     
     def has_add_permission(self, request):
         """Disable manual creation of alert notifications"""
-        return False
\ No newline at end of file
+        return False
+
+
+@admin.register(NotificationChannel)
+class NotificationChannelAdmin(admin.ModelAdmin):
+    """Admin interface for NotificationChannel model"""
+    
+    list_display = ['user', 'channel_type', 'target', 'is_active', 'created_at']
+    list_filter = ['channel_type', 'is_active']
+    list_select_related = ['user']
+    search_fields = ['user__username', 'target']
+    raw_id_fields = ['user']
+
+
+@admin.register(StatusPage)
+class StatusPageAdmin(admin.ModelAdmin):
+    """Admin interface for StatusPage model"""
+    
+    list_display = ['title', 'slug', 'user', 'is_public', 'updated_at']
+    list_filter = ['is_public']
+    list_select_related = ['user']
+    search_fields = ['title', 'slug', 'user__username']
+    raw_id_fields = ['user', 'websites']
+
+
+@admin.register(NotificationDelivery)
+class NotificationDeliveryAdmin(LargeTableAdmin):
+    """Admin interface for NotificationDelivery model"""
+    
+    list_display = ['notification', 'channel_type', 'target', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status', 'channel_type']
+    list_select_related = ['notification__alert__website']
+    raw_id_fields = ['notification']
+    readonly_fields = ['sent_at']
@@ -0,0 +1,156 @@
+import warnings
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .dashboard import record_alerts
+from .models import AlertNotification, StatusCheck, UptimeAlert
+from .notifications import create_deliveries
+
+
+# Scales MAD to the standard deviation of a normal distribution
+MAD_SCALE = 0.6745
+
+# Offline and error checks carry the timeout as their response time, and
+# outages already have 'down' alerts
+SCORED_STATUSES = ('online', 'slow')
+
+
+def build_matrix(site_index, values, n_sites, width):
+    """
+    Pack per-site series into a right-aligned (n_sites, width) float matrix
+
+    `site_index` and `values` must be sorted by site, then time. Each row
+    holds the site's latest `width` values with NaN padding on the left.
+    """
+    matrix = np.full((n_sites, width), np.nan)
+    if not len(values):
+        return matrix
+
+    counts = np.bincount(site_index, minlength=n_sites)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    position = np.arange(len(values)) - starts[site_index]
+    column = width - counts[site_index] + position
+
+    keep = column >= 0
+    matrix[site_index[keep], column[keep]] = values[keep]
+    return matrix
+
+
+def robust_scores(matrix, recent):
+    """
+    Score the last `recent` columns of every row against the rest
+
+    Returns (recent_median, baseline_median, score, samples) arrays, where
+    score is the robust z-score of the recent median against the baseline
+    median and MAD. All rows are processed in one vectorized pass.
+    """
+    baseline = matrix[:, :-recent]
+    latest = matrix[:, -recent:]
+
+    # Rows without any samples yet come out as NaN
+    with np.errstate(all='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        median = np.nanmedian(baseline, axis=1)
+        mad = np.nanmedian(np.abs(baseline - median[:, None]), axis=1)
+        recent_median = np.nanmedian(latest, axis=1)
+        # A perfectly flat baseline would make every change infinitely anomalous
+        mad = np.maximum(mad, settings.ANOMALY_MIN_MAD)
+        score = MAD_SCALE * (recent_median - median) / mad
+
+    samples = np.sum(~np.isnan(baseline), axis=1)
+    return recent_median, median, score, samples
+
+
+def detect_anomalies():
+    """
+    Flag websites whose recent response times are far above their baseline
+
+    Loads the last ANOMALY_WINDOW online or slow checks of every website
+    with an active 'anomaly' alert in batches of ANOMALY_BATCH_SIZE sites, scores them with
+    median + MAD and creates notifications (at most one per alert within
+    ANOMALY_COOLDOWN). The alert threshold is the minimum recent response
+    time in milliseconds worth alerting on. Returns the number of
+    notifications created.
+    """
+    alerts = list(
+        UptimeAlert.objects.filter(
+            alert_type='anomaly',
+            is_active=True,
+            website__status='active'
+        ).select_related('website__user').order_by('website_id')
+    )
+    if not alerts:
+        return 0
+
+    now = timezone.now()
+    cooling_down = set(
+        AlertNotification.objects.filter(
+            alert__in=alerts,
+            sent_at__gte=now - timedelta(seconds=settings.ANOMALY_COOLDOWN)
+        ).values_list('alert_id', flat=True)
+    )
+    alerts = [alert for alert in alerts if alert.id not in cooling_down]
+
+    width = settings.ANOMALY_WINDOW
+    recent = settings.ANOMALY_RECENT_CHECKS
+    since = now - timedelta(seconds=settings.ANOMALY_LOOKBACK)
+    created = 0
+
+    batch_size = settings.ANOMALY_BATCH_SIZE
+    for offset in range(0, len(alerts), batch_size):
+        batch = alerts[offset:offset + batch_size]
+        website_ids = np.array([alert.website_id for alert in batch], dtype=np.int64)
+
+        rows = StatusCheck.objects.filter(
+            website_id__in=website_ids.tolist(),
+            checked_at__gte=since,
+            status__in=SCORED_STATUSES,
+            response_time__isnull=False
+        ).annotate(
+            # Only the latest `width` checks per site are scored
+            position=Window(RowNumber(), partition_by=F('website_id'), order_by=F('checked_at').desc())
+        ).filter(position__lte=width).order_by('website_id', 'checked_at').values_list(
+            'website_id', 'response_time', 'id'
+        )
+        rows = np.array(list(rows), dtype=np.int64).reshape(-1, 3)
+
+        site_index = np.searchsorted(website_ids, rows[:, 0])
+        matrix = build_matrix(site_index, rows[:, 1].astype(float), len(batch), width)
+        recent_median, median, score, samples = robust_scores(matrix, recent)
+
+        flagged = np.flatnonzero(
+            (samples >= settings.ANOMALY_MIN_SAMPLES)
+            & (score >= settings.ANOMALY_SCORE_THRESHOLD)
+        )
+
+        # Latest check of each site, to attach to the notification
+        latest_check = {}
+        if len(rows):
+            last_rows = np.flatnonzero(np.diff(rows[:, 0], append=-1) != 0)
+            latest_check = dict(zip(rows[last_rows, 0].tolist(), rows[last_rows, 2].tolist()))
+
+        for index in flagged.tolist():
+            alert = batch[index]
+            if recent_median[index] < alert.threshold:
+                continue
+
+            website = alert.website
+            message = (
+                f"Alert for {website.name}: {alert.get_alert_type_display()} - "
+                f"Recent response time {recent_median[index]:.0f}ms vs usual {median[index]:.0f}ms"
+            )
+            notification = AlertNotification.objects.create(
+                alert=alert,
+                status_check_id=latest_check.get(website.id),
+                message=message
+            )
+            create_deliveries(website.user, [notification])
+            record_alerts(website.user_id, [notification])
+            created += 1
+
+    return created
@@ -1,6 +1,25 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def reinstall_search_index(sender, using, **kwargs):
+    """Restore the SQLite search triggers dropped when a migration rebuilds the website table"""
+    from .search import install_search_index
+    
+    connection = connections[using]
+    # post_migrate fires for every app, even when monitoring has not been migrated yet
+    if connection.vendor != 'sqlite' or 'monitoring_website' not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        columns = {column.name for column in connection.introspection.get_table_description(cursor, 'monitoring_website')}
+    if 'host' in columns:
+        install_search_index(connection)
 
 
 class MonitoringConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'monitoring'
+    
+    def ready(self):
+        post_migrate.connect(reinstall_search_index, sender=self)
@@ -0,0 +1,221 @@
+"""
+Synthetic dataset generator and API benchmark runner
+
+`manage.py generate_benchmark_data` bulk-creates users, websites, status
+checks and alert notifications that look like production data (mostly
+healthy checks with log-normal response times, occasional failures that
+trigger notifications). `manage.py run_benchmarks` then replays the main
+read endpoints as those users and reports latency and query counts,
+failing when an endpoint goes over its query budget.
+
+All generated users share the BENCHMARK_USER_PREFIX username prefix, so a
+dataset can be removed again without touching real accounts.
+"""
+import random
+import statistics
+import time
+from contextlib import ExitStack
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connections, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import AlertNotification, StatusCheck, UptimeAlert, Website, normalize_host
+
+
+BENCHMARK_USER_PREFIX = 'bench-'
+
+# Share of generated checks per status; the rest are 'online'
+FAILURE_RATES = {'offline': 0.01, 'error': 0.005, 'slow': 0.02}
+
+# (name, path, query budget); {website_id} is filled with one of the user's websites
+ENDPOINTS = [
+    ('dashboard_stats', '/api/websites/dashboard_stats/', 6),
+    ('website_list', '/api/websites/', 6),
+    ('website_search', '/api/websites/?search=site-1', 6),
+    ('websites_down', '/api/websites/?current_status=offline', 6),
+    ('history', '/api/websites/{website_id}/history/?period=30d&limit=500', 4),
+    ('status_checks', '/api/status-checks/', 4),
+    ('notifications', '/api/notifications/', 4),
+]
+
+
+def clear_dataset():
+    """Delete every benchmark user; their websites and checks cascade"""
+    return User.objects.filter(username__startswith=BENCHMARK_USER_PREFIX).delete()[0]
+
+
+def generate_dataset(users, websites_per_user, checks_per_website, notifications_per_website,
+                     batch_size=10000, seed=0, log=None):
+    """
+    Bulk-create a benchmark dataset and return the number of rows per model
+
+    Checks are generated website by website going back from now at the
+    website's check interval, and flushed every `batch_size` rows, so
+    memory stays flat however many millions of rows are requested.
+    """
+    rng = random.Random(seed)
+    log = log or (lambda message: None)
+    now = timezone.now()
+    offset = User.objects.filter(username__startswith=BENCHMARK_USER_PREFIX).count()
+
+    user_objs = User.objects.bulk_create(
+        [
+            User(username=f'{BENCHMARK_USER_PREFIX}{offset + index:07d}', password='!')
+            for index in range(users)
+        ],
+        batch_size=batch_size
+    )
+    user_objs = list(User.objects.filter(username__in=[user.username for user in user_objs]))
+    log(f"Created {len(user_objs)} users")
+
+    Website.objects.bulk_create(
+        [
+            Website(
+                user=user,
+                name=f'Site {index} of {user.username}',
+                url=url,
+                host=normalize_host(url),
+                check_interval=rng.choice([60, 60, 300, 600])
+            )
+            for user in user_objs
+            for index in range(websites_per_user)
+            for url in [f'https://site-{index}.{user.username}.bench.example.com']
+        ],
+        batch_size=batch_size
+    )
+    websites = list(Website.objects.filter(user__in=user_objs))
+    log(f"Created {len(websites)} websites")
+
+    UptimeAlert.objects.bulk_create(
+        [UptimeAlert(website=website, alert_type='down', threshold=1) for website in websites],
+        batch_size=batch_size
+    )
+    alerts = {alert.website_id: alert for alert in UptimeAlert.objects.filter(website__user__in=user_objs)}
+
+    counts = {'users': len(user_objs), 'websites': len(websites), 'status_checks': 0, 'notifications': 0}
+    pending = []
+
+    def flush():
+        with transaction.atomic():
+            StatusCheck.objects.bulk_create(pending)
+            notifications = [
+                AlertNotification(
+                    alert=alerts[check.website_id],
+                    status_check=check,
+                    message=f"Alert for {check.website.name}: Website Down - {check.error_message}"
+                )
+                for check in pending
+                if getattr(check, 'notify', False)
+            ]
+            AlertNotification.objects.bulk_create(notifications)
+        counts['status_checks'] += len(pending)
+        counts['notifications'] += len(notifications)
+        log(f"Created {counts['status_checks']} status checks")
+        pending.clear()
+
+    for website in websites:
+        notify_quota = notifications_per_website
+        for check in generate_checks(rng, website, now, checks_per_website):
+            # Checks come newest first
+            website.current_status = website.current_status or check.status
+            if notify_quota and check.status in ('offline', 'error'):
+                check.notify = True
+                notify_quota -= 1
+            pending.append(check)
+            if len(pending) >= batch_size:
+                flush()
+    if pending:
+        flush()
+    Website.objects.bulk_update(websites, ['current_status'], batch_size=batch_size)
+
+    return counts
+
+
+def generate_checks(rng, website, now, count):
+    """Yield `count` plausible checks for a website, newest first"""
+    thresholds = []
+    cumulative = 0
+    for status, rate in FAILURE_RATES.items():
+        cumulative += rate
+        thresholds.append((cumulative, status))
+
+    for index in range(count):
+        roll = rng.random()
+        status = next((status for threshold, status in thresholds if roll < threshold), 'online')
+        checked_at = now - timedelta(seconds=index * website.check_interval + rng.random())
+
+        if status == 'offline':
+            check = StatusCheck(website=website, status=status, error_message='Connection timeout')
+        elif status == 'error':
+            check = StatusCheck(website=website, status=status, status_code=503, error_message='HTTP 503')
+        else:
+            response_time = int(rng.lognormvariate(5.3, 0.45))
+            if status == 'slow':
+                response_time += 5000
+            check = StatusCheck(website=website, status=status, status_code=200, response_time=response_time)
+        check.checked_at = checked_at
+        yield check
+
+
+def run_benchmarks(sample_users=5, repeat=3, budgets=None, endpoints=None):
+    """
+    Request every endpoint `repeat` times as each sampled benchmark user
+
+    Queries are counted on all database aliases (replica reads included).
+    Returns one result dict per endpoint with latency percentiles in
+    milliseconds, the highest query count seen and whether it stayed
+    within budget.
+    """
+    budgets = {**{name: budget for name, _, budget in ENDPOINTS}, **(budgets or {})}
+    users = list(
+        User.objects.filter(
+            username__startswith=BENCHMARK_USER_PREFIX, websites__isnull=False
+        ).distinct().order_by('?')[:sample_users]
+    )
+    if not users:
+        return []
+
+    client = APIClient()
+    results = []
+    for name, path, _ in ENDPOINTS:
+        if endpoints and name not in endpoints:
+            continue
+
+        timings = []
+        query_counts = []
+        failures = 0
+        for user in users:
+            client.force_authenticate(user)
+            website_id = Website.objects.filter(user=user).values_list('id', flat=True).first()
+            url = path.format(website_id=website_id)
+            for _ in range(repeat):
+                with ExitStack() as stack:
+                    contexts = [
+                        stack.enter_context(CaptureQueriesContext(connection))
+                        for connection in connections.all()
+                    ]
+                    started = time.perf_counter()
+                    response = client.get(url)
+                    timings.append((time.perf_counter() - started) * 1000)
+                query_counts.append(sum(len(context) for context in contexts))
+                if response.status_code != 200:
+                    failures += 1
+        client.force_authenticate(None)
+
+        timings.sort()
+        results.append({
+            'endpoint': name,
+            'requests': len(timings),
+            'errors': failures,
+            'p50_ms': statistics.median(timings),
+            'p95_ms': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+            'max_ms': timings[-1],
+            'queries': max(query_counts),
+            'budget': budgets[name],
+            'within_budget': max(query_counts) <= budgets[name] and not failures,
+        })
+    return results
@@ -0,0 +1,125 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.utils import timezone
+
+from .dashboard import record_alerts
+from .models import AlertNotification, TLSCertificate, UptimeAlert, Website
+from .notifications import create_deliveries
+from .probes import inspect_certificate
+
+
+def certificate_endpoint(url):
+    """Return the (host, port) serving TLS for a URL, or None for plain HTTP"""
+    parts = urlsplit(url)
+    if parts.scheme != 'https' or not parts.hostname:
+        return None
+    return parts.hostname.lower(), parts.port or 443
+
+
+def refresh_certificates():
+    """
+    Inspect certificates of active websites that are due for a check
+
+    Endpoints are deduplicated per host:port, so websites sharing a host
+    cost one handshake. Results are kept in TLSCertificate and only
+    refreshed every TLS_CHECK_INTERVAL seconds. Returns the number of
+    endpoints inspected.
+    """
+    endpoints = {
+        endpoint
+        for endpoint in map(certificate_endpoint, Website.objects.filter(status='active', monitor_type='http').values_list('url', flat=True))
+        if endpoint
+    }
+
+    fresh_after = timezone.now() - timedelta(seconds=settings.TLS_CHECK_INTERVAL)
+    fresh = set(
+        TLSCertificate.objects.filter(checked_at__gte=fresh_after).values_list('host', 'port')
+    )
+    due = sorted(endpoints - fresh)
+    if not due:
+        return 0
+
+    def inspect(endpoint):
+        host, port = endpoint
+        try:
+            return endpoint, inspect_certificate(host, port, timeout=settings.TLS_CHECK_TIMEOUT), ''
+        except (OSError, ValueError) as exc:
+            return endpoint, {}, str(exc) or exc.__class__.__name__
+
+    with ThreadPoolExecutor(max_workers=settings.TLS_CHECK_CONCURRENCY) as executor:
+        results = list(executor.map(inspect, due))
+
+    now = timezone.now()
+    for (host, port), cert, error in results:
+        TLSCertificate.objects.update_or_create(
+            host=host,
+            port=port,
+            defaults={
+                'subject': cert.get('subject', ''),
+                'issuer': cert.get('issuer', ''),
+                'not_before': cert.get('not_before'),
+                'not_after': cert.get('not_after'),
+                'error': error,
+                'checked_at': now,
+            }
+        )
+    return len(results)
+
+
+def send_certificate_alerts():
+    """
+    Create notifications for active 'cert' alerts whose certificate expires
+    within the alert threshold (in days) or failed verification
+
+    Each alert fires at most once a day. Returns the number of
+    notifications created.
+    """
+    alerts = list(
+        UptimeAlert.objects.filter(
+            alert_type='cert',
+            is_active=True,
+            website__status='active'
+        ).select_related('website__user')
+    )
+    if not alerts:
+        return 0
+
+    recently_notified = set(
+        AlertNotification.objects.filter(
+            alert__in=alerts,
+            sent_at__gte=timezone.now() - timedelta(days=1)
+        ).values_list('alert_id', flat=True)
+    )
+
+    endpoints = {alert.id: certificate_endpoint(alert.website.url) for alert in alerts}
+    certificates = {
+        (cert.host, cert.port): cert
+        for cert in TLSCertificate.objects.filter(host__in={endpoint[0] for endpoint in endpoints.values() if endpoint})
+    }
+
+    created = 0
+    for alert in alerts:
+        cert = certificates.get(endpoints[alert.id])
+        if cert is None or alert.id in recently_notified:
+            continue
+
+        website = alert.website
+        if cert.error:
+            message = f"Alert for {website.name}: {alert.get_alert_type_display()} - Certificate error: {cert.error}"
+        elif cert.days_remaining is not None and cert.days_remaining < alert.threshold:
+            message = (
+                f"Alert for {website.name}: {alert.get_alert_type_display()} - "
+                f"Certificate expires in {cert.days_remaining} days ({cert.not_after:%Y-%m-%d})"
+            )
+        else:
+            continue
+
+        notification = AlertNotification.objects.create(alert=alert, message=message)
+        create_deliveries(website.user, [notification])
+        record_alerts(website.user_id, [notification])
+        created += 1
+
+    return created
@@ -0,0 +1,282 @@
+"""
+Write-through per-user dashboard aggregate
+
+Each user's dashboard figures live in a Redis hash, `dashboard:<user id>`:
+website, online and offline counts, the sum and count of the latest
+response times, the sum of per-website uptimes and alert counts in
+DASHBOARD_ALERT_BUCKET-second buckets (`alerts:<bucket>` fields). A
+companion hash, `dashboard:<user id>:sites`, remembers each website's
+latest status, response time, uptime and number of checks in the uptime
+window so a new check can be applied as a delta.
+
+Check writers and alert creators apply their deltas with Lua scripts,
+after commit, and only to aggregates that already exist; reading the
+dashboard is then one HGETALL. A missing aggregate is built from the
+database on first read. Uptime is tracked incrementally as a running
+mean until a website has RECENT_CHECKS_SIZE checks and as an
+exponentially weighted average after that, an approximation of the
+last-N-checks figure that the reconcile_dashboards task restores,
+together with anything lost to races or Redis errors.
+Aggregates not read for DASHBOARD_TTL seconds expire.
+"""
+import logging
+from collections import Counter
+from datetime import timedelta
+
+import redis
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .hot_store import get_client, load_recent_checks
+from .models import AlertNotification, Website
+
+
+KEY_PREFIX = 'dashboard:'
+USERS_KEY = 'dashboard:users'
+
+ALERT_WINDOW = 24 * 3600
+
+logger = logging.getLogger(__name__)
+
+# KEYS: aggregate, sites; ARGV: website id, status, response time ('' when
+# there is none), uptime window
+APPLY_CHECK = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+local previous = redis.call('HGET', KEYS[2], ARGV[1])
+local uptime = 0
+local checks = 0
+if previous then
+    local status, response_time, previous_uptime, previous_checks = string.match(
+        previous, '^([^,]*),([^,]*),([^,]*),(.*)$'
+    )
+    redis.call('HINCRBY', KEYS[1], status == 'online' and 'online' or 'offline', -1)
+    if response_time ~= '' then
+        redis.call('HINCRBY', KEYS[1], 'rt_sum', -tonumber(response_time))
+        redis.call('HINCRBY', KEYS[1], 'rt_count', -1)
+    end
+    uptime = tonumber(previous_uptime)
+    checks = tonumber(previous_checks)
+end
+redis.call('HINCRBY', KEYS[1], ARGV[2] == 'online' and 'online' or 'offline', 1)
+if ARGV[3] ~= '' then
+    redis.call('HINCRBY', KEYS[1], 'rt_sum', tonumber(ARGV[3]))
+    redis.call('HINCRBY', KEYS[1], 'rt_count', 1)
+end
+local sample = ARGV[2] == 'online' and 100 or 0
+checks = math.min(checks + 1, tonumber(ARGV[4]))
+local new_uptime = uptime + (sample - uptime) / checks
+redis.call('HINCRBYFLOAT', KEYS[1], 'uptime_sum', tostring(new_uptime - uptime))
+redis.call('HSET', KEYS[2], ARGV[1], table.concat({ARGV[2], ARGV[3], tostring(new_uptime), checks}, ','))
+local ttl = redis.call('PTTL', KEYS[1])
+if ttl > 0 then
+    redis.call('PEXPIRE', KEYS[2], ttl)
+end
+return 1
+"""
+
+# KEYS: aggregate; ARGV: alert bucket per notification
+COUNT_ALERTS = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+for _, bucket in ipairs(ARGV) do
+    redis.call('HINCRBY', KEYS[1], 'alerts:' .. bucket, 1)
+end
+return 1
+"""
+
+_scripts = {}
+
+
+def get_script(source):
+    if source not in _scripts:
+        _scripts[source] = get_client().register_script(source)
+    return _scripts[source]
+
+
+def aggregate_key(user_id):
+    return f'{KEY_PREFIX}{user_id}'
+
+
+def sites_key(user_id):
+    return f'{KEY_PREFIX}{user_id}:sites'
+
+
+def alert_bucket(moment):
+    return int(moment.timestamp()) // settings.DASHBOARD_ALERT_BUCKET
+
+
+def site_state(status, response_time, uptime, checks):
+    return f"{status},{response_time or ''},{uptime!r},{checks}"
+
+
+def build_aggregate(user_id):
+    """Compute a user's (aggregate, sites) hashes from the database"""
+    websites = list(Website.objects.filter(user_id=user_id, status='active'))
+    load_recent_checks(websites)
+
+    aggregate = {'total': len(websites), 'online': 0, 'offline': 0, 'rt_sum': 0, 'rt_count': 0, 'uptime_sum': 0.0}
+    sites = {}
+    for website in websites:
+        uptime = website.uptime_percentage
+        aggregate['uptime_sum'] += uptime
+        latest_check = website.latest_status_check
+        if latest_check is None:
+            continue
+        aggregate['online' if latest_check.status == 'online' else 'offline'] += 1
+        if latest_check.response_time:
+            aggregate['rt_sum'] += latest_check.response_time
+            aggregate['rt_count'] += 1
+        sites[website.id] = site_state(
+            latest_check.status, latest_check.response_time, float(uptime), len(website.recent_status_checks)
+        )
+
+    sent_at = AlertNotification.objects.filter(
+        alert__website__user_id=user_id,
+        sent_at__gte=timezone.now() - timedelta(seconds=ALERT_WINDOW)
+    ).values_list('sent_at', flat=True)
+    for bucket, count in Counter(alert_bucket(moment) for moment in sent_at).items():
+        aggregate[f'alerts:{bucket}'] = count
+
+    return aggregate, sites
+
+
+def store_aggregate(user_id, aggregate, sites, ttl=None):
+    pipe = get_client().pipeline()
+    pipe.delete(aggregate_key(user_id), sites_key(user_id))
+    pipe.hset(aggregate_key(user_id), mapping=aggregate)
+    if sites:
+        pipe.hset(sites_key(user_id), mapping=sites)
+    pipe.expire(aggregate_key(user_id), ttl or settings.DASHBOARD_TTL)
+    pipe.expire(sites_key(user_id), ttl or settings.DASHBOARD_TTL)
+    pipe.sadd(USERS_KEY, user_id)
+    pipe.execute()
+
+
+def dashboard_stats(aggregate, now=None):
+    """Turn an aggregate hash into the dashboard_stats payload"""
+    now = now or timezone.now()
+    values = {
+        (key.decode() if isinstance(key, bytes) else key): float(value)
+        for key, value in aggregate.items()
+    }
+    oldest_bucket = alert_bucket(now - timedelta(seconds=ALERT_WINDOW))
+
+    total = int(values['total'])
+    rt_count = int(values['rt_count'])
+    return {
+        'total_websites': total,
+        'online_websites': int(values['online']),
+        'offline_websites': int(values['offline']),
+        'average_response_time': round(values['rt_sum'] / rt_count, 2) if rt_count > 0 else 0,
+        'average_uptime': round(values['uptime_sum'] / total, 2) if total > 0 else 0,
+        'alerts_last_24h': sum(
+            int(count) for key, count in values.items()
+            if key.startswith('alerts:') and int(key[len('alerts:'):]) >= oldest_bucket
+        ),
+    }
+
+
+def get_dashboard_stats(user_id):
+    """
+    Return a user's dashboard figures with a single Redis round trip,
+    building the aggregate on first read; computes them from the database
+    when the aggregate is disabled or Redis is unavailable
+    """
+    if not settings.DASHBOARD_AGGREGATE:
+        return dashboard_stats(build_aggregate(user_id)[0])
+
+    try:
+        pipe = get_client().pipeline(transaction=False)
+        pipe.hgetall(aggregate_key(user_id))
+        pipe.expire(aggregate_key(user_id), settings.DASHBOARD_TTL)
+        pipe.expire(sites_key(user_id), settings.DASHBOARD_TTL)
+        aggregate = pipe.execute()[0]
+    except redis.RedisError as exc:
+        logger.warning("Could not read dashboard aggregate: %s", exc)
+        return dashboard_stats(build_aggregate(user_id)[0])
+
+    if not aggregate:
+        aggregate, sites = build_aggregate(user_id)
+        try:
+            store_aggregate(user_id, aggregate, sites)
+        except redis.RedisError as exc:
+            logger.warning("Could not store dashboard aggregate: %s", exc)
+    return dashboard_stats(aggregate)
+
+
+def record_checks(checks):
+    """Apply saved checks to their owners' aggregates once the transaction commits"""
+    if not settings.DASHBOARD_AGGREGATE or not checks:
+        return
+    updates = [
+        (check.website.user_id, check.website_id, check.status, check.response_time or '')
+        for check in sorted(checks, key=lambda check: check.checked_at)
+    ]
+    transaction.on_commit(lambda: _apply_checks(updates))
+
+
+def _apply_checks(updates):
+    script = get_script(APPLY_CHECK)
+    pipe = get_client().pipeline(transaction=False)
+    for user_id, website_id, status, response_time in updates:
+        script(
+            keys=[aggregate_key(user_id), sites_key(user_id)],
+            args=[website_id, status, response_time, settings.RECENT_CHECKS_SIZE],
+            client=pipe
+        )
+    try:
+        pipe.execute()
+    except redis.RedisError as exc:
+        logger.warning("Could not update dashboard aggregates: %s", exc)
+
+
+def record_alerts(user_id, notifications):
+    """Count new notifications in the user's aggregate once the transaction commits"""
+    if not settings.DASHBOARD_AGGREGATE or not notifications:
+        return
+    buckets = [alert_bucket(notification.sent_at) for notification in notifications]
+    transaction.on_commit(lambda: _count_alerts(user_id, buckets))
+
+
+def _count_alerts(user_id, buckets):
+    try:
+        get_script(COUNT_ALERTS)(keys=[aggregate_key(user_id)], args=buckets)
+    except redis.RedisError as exc:
+        logger.warning("Could not count dashboard alerts: %s", exc)
+
+
+def forget(user_id):
+    """Drop a user's aggregate after their set of websites changed; the next read rebuilds it"""
+    if not settings.DASHBOARD_AGGREGATE:
+        return
+
+    def drop():
+        try:
+            get_client().delete(aggregate_key(user_id), sites_key(user_id))
+        except redis.RedisError as exc:
+            logger.warning("Could not drop dashboard aggregate: %s", exc)
+
+    transaction.on_commit(drop)
+
+
+def reconcile_aggregates():
+    """
+    Rebuild every live aggregate from the database, keeping its expiry;
+    returns the number of aggregates rebuilt
+    """
+    client = get_client()
+    rebuilt = 0
+    for user_id in client.smembers(USERS_KEY):
+        user_id = int(user_id)
+        ttl = client.ttl(aggregate_key(user_id))
+        if ttl <= 0:
+            client.srem(USERS_KEY, user_id)
+            continue
+        aggregate, sites = build_aggregate(user_id)
+        store_aggregate(user_id, aggregate, sites, ttl=ttl)
+        rebuilt += 1
+    return rebuilt
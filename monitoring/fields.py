@@ -0,0 +1,47 @@
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.utils.functional import cached_property
+
+
+class ChoiceIndexField(models.PositiveSmallIntegerField):
+    """
+    String choice field stored as the choice's position in a smallint column
+
+    Python code, querysets and serializers keep using the string values
+    (`status='online'`, `status__in=[...]`, values_list() results); only the
+    column holds the 2-byte index. Choices may only ever be appended:
+    reordering them would change the meaning of stored rows.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values = [value for value, _ in self.choices or []]
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return self.values[value]
+
+    def to_python(self, value):
+        if value is None or value in self.values:
+            return value
+        try:
+            return self.values[int(value)]
+        except (ValueError, TypeError, IndexError):
+            raise ValidationError(f"'{value}' is not a valid choice.", code='invalid_choice')
+
+    def get_prep_value(self, value):
+        if value is None or isinstance(value, int):
+            return value
+        try:
+            return self.values.index(value)
+        except ValueError:
+            raise ValueError(f"'{value}' is not a valid choice for {self.name}")
+
+    @cached_property
+    def validators(self):
+        # The integer range validators would compare against string values
+        return [*self.default_validators, *self._validators]
+
+    def get_internal_type(self):
+        return 'PositiveSmallIntegerField'
@@ -0,0 +1,105 @@
+"""
+Heartbeat (push) monitors
+
+A heartbeat monitor is a Website with monitor_type 'heartbeat' that the
+monitored job pings at /api/heartbeats/<token>/. The ping path never
+touches the database: tokens resolve to website IDs through the cache,
+and the ping time is written to a Redis hash. The sweep_heartbeats task
+flushes that hash into Website.last_heartbeat_at in bulk and records a
+StatusCheck per monitor every check_interval, so missed heartbeats flow
+through the usual incident and UptimeAlert handling.
+"""
+import secrets
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import redis
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Website
+
+
+TOKEN_CACHE_PREFIX = 'heartbeat:token:'
+SEEN_KEY = 'heartbeat:seen'
+FLUSHING_KEY = 'heartbeat:seen:flushing'
+
+_client = None
+
+
+def get_client():
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.REDIS_URL)
+    return _client
+
+
+def generate_token():
+    return secrets.token_urlsafe(24)
+
+
+def resolve_token(token):
+    """Return the active heartbeat website ID for a ping token, or None"""
+    key = f'{TOKEN_CACHE_PREFIX}{token}'
+    website_id = cache.get(key)
+    if website_id is None:
+        website_id = Website.objects.filter(
+            heartbeat_token=token, monitor_type='heartbeat', status='active'
+        ).values_list('id', flat=True).first() or 0
+        # Unknown tokens are cached briefly so floods of bad pings stay off the database
+        cache.set(key, website_id, settings.HEARTBEAT_TOKEN_CACHE_TTL if website_id else 60)
+    return website_id or None
+
+
+def record_ping(website_id):
+    get_client().hset(SEEN_KEY, website_id, time.time())
+
+
+def flush_pings():
+    """
+    Move buffered ping times into Website.last_heartbeat_at
+
+    The hash is renamed before reading, so pings arriving during the flush
+    land in a fresh hash for the next run. Returns the number of websites
+    updated.
+    """
+    client = get_client()
+    try:
+        client.rename(SEEN_KEY, FLUSHING_KEY)
+    except redis.ResponseError:
+        # No pings since the last flush
+        return 0
+    seen = client.hgetall(FLUSHING_KEY)
+    client.delete(FLUSHING_KEY)
+
+    last_seen = {
+        int(website_id): datetime.fromtimestamp(float(timestamp), tz=dt_timezone.utc)
+        for website_id, timestamp in seen.items()
+    }
+    websites = list(
+        Website.objects.filter(
+            pk__in=list(last_seen), monitor_type='heartbeat', status='active'
+        ).only('id', 'last_heartbeat_at')
+    )
+    for website in websites:
+        if website.last_heartbeat_at is None or website.last_heartbeat_at < last_seen[website.id]:
+            website.last_heartbeat_at = last_seen[website.id]
+    Website.objects.bulk_update(websites, ['last_heartbeat_at'], batch_size=1000)
+    return len(websites)
+
+
+def heartbeat_result(website, now):
+    """
+    Return a probe-style result for a heartbeat monitor, or None while a
+    monitor that has never been pinged is still within its first interval
+    """
+    allowed = timedelta(seconds=website.check_interval + website.heartbeat_grace)
+    if website.last_heartbeat_at is None:
+        if now - website.created_at < allowed:
+            return None
+        message = "No heartbeat received yet"
+    elif now - website.last_heartbeat_at <= allowed:
+        return {'status': 'online', 'status_code': None, 'response_time': None, 'error_message': None}
+    else:
+        message = f"No heartbeat since {website.last_heartbeat_at:%Y-%m-%d %H:%M:%S} UTC"
+    return {'status': 'offline', 'status_code': None, 'response_time': None, 'error_message': message}
@@ -0,0 +1,183 @@
+"""
+Redis hot store of the most recent checks per website
+
+Every website that has been read recently owns a capped Redis list with
+its latest RECENT_CHECKS_SIZE status checks, newest first, each packed
+into a compact binary record. Writers only extend rings that already
+exist (LPUSHX); a read that finds no ring loads the checks from the
+database and warms it, so the hottest reads (website list, uptime,
+dashboard) are answered without SQL once warm.
+
+Rings expire after RECENT_CHECKS_TTL seconds without writes, which also
+bounds how long a ring can stay out of step with the database after a
+lost update. Redis errors are logged and reads fall back to the database.
+"""
+import logging
+import struct
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import redis
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from .models import StatusCheck
+from .probes import TIMING_FIELDS
+
+
+KEY_PREFIX = 'checks:recent:v2:'
+
+# id, checked_at (epoch microseconds), status, HTTP status code, response
+# time and the TIMING_FIELDS phase timings (ms); the UTF-8 error message
+# fills the rest of the record
+RECORD = struct.Struct('<QqBHI6H')
+NULL_STATUS_CODE = 0xFFFF
+NULL_RESPONSE_TIME = 0xFFFFFFFF
+NULL_TIMING = 0xFFFF
+
+STATUSES = [status for status, _ in StatusCheck.STATUS_CHOICES]
+STATUS_INDEX = {status: index for index, status in enumerate(STATUSES)}
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+logger = logging.getLogger(__name__)
+
+_client = None
+
+
+def get_client():
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.RECENT_CHECKS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.RECENT_CHECKS_SOCKET_TIMEOUT
+        )
+    return _client
+
+
+def ring_key(website_id):
+    return f'{KEY_PREFIX}{website_id}'
+
+
+def encode_check(check):
+    delta = check.checked_at - EPOCH
+    header = RECORD.pack(
+        check.pk,
+        (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds,
+        STATUS_INDEX[check.status],
+        NULL_STATUS_CODE if check.status_code is None else check.status_code,
+        NULL_RESPONSE_TIME if check.response_time is None else check.response_time,
+        *(NULL_TIMING if value is None else value for value in (getattr(check, field) for field in TIMING_FIELDS))
+    )
+    return header + (check.error_message or '').encode()
+
+
+def decode_check(data, website_id):
+    pk, checked_at, status, status_code, response_time, *timings = RECORD.unpack_from(data)
+    error_message = data[RECORD.size:].decode()
+    return StatusCheck(
+        pk=pk,
+        website_id=website_id,
+        checked_at=EPOCH + timedelta(microseconds=checked_at),
+        status=STATUSES[status],
+        status_code=None if status_code == NULL_STATUS_CODE else status_code,
+        response_time=None if response_time == NULL_RESPONSE_TIME else response_time,
+        error_message=error_message or None,
+        **{field: None if value == NULL_TIMING else value for field, value in zip(TIMING_FIELDS, timings)}
+    )
+
+
+def remember(checks):
+    """Prepend saved checks to their websites' rings once the transaction commits"""
+    if not settings.RECENT_CHECKS_STORE or not checks:
+        return
+    records = [(check.website_id, encode_check(check)) for check in checks]
+    transaction.on_commit(lambda: _push(records))
+
+
+def _push(records):
+    pipe = get_client().pipeline(transaction=False)
+    for website_id, record in records:
+        pipe.lpushx(ring_key(website_id), record)
+    for website_id in {website_id for website_id, _ in records}:
+        pipe.ltrim(ring_key(website_id), 0, settings.RECENT_CHECKS_SIZE - 1)
+        pipe.expire(ring_key(website_id), settings.RECENT_CHECKS_TTL)
+    try:
+        pipe.execute()
+    except redis.RedisError as exc:
+        logger.warning("Could not update recent check rings: %s", exc)
+
+
+def load_recent_checks(websites):
+    """
+    Attach the latest RECENT_CHECKS_SIZE checks, newest first, to each
+    website as `_recent_status_checks`
+
+    All rings are read in one round trip; websites without a ring are
+    loaded with a single windowed query and their rings are warmed.
+    """
+    websites = [website for website in websites if not hasattr(website, '_recent_status_checks')]
+    if not websites:
+        return
+
+    website_ids = [website.id for website in websites]
+    found = _read_rings(website_ids) if settings.RECENT_CHECKS_STORE else None
+    # Only warm rings when Redis answered; otherwise just serve from the database
+    warm = found is not None
+    found = found or {}
+
+    missing = [website_id for website_id in website_ids if website_id not in found]
+    if missing:
+        loaded = _query_recent_checks(missing)
+        found.update(loaded)
+        if warm:
+            _warm({website_id: loaded[website_id] for website_id in missing if loaded[website_id]})
+
+    for website in websites:
+        website._recent_status_checks = found[website.id]
+
+
+def _read_rings(website_ids):
+    pipe = get_client().pipeline(transaction=False)
+    for website_id in website_ids:
+        pipe.lrange(ring_key(website_id), 0, settings.RECENT_CHECKS_SIZE - 1)
+    try:
+        rings = pipe.execute()
+    except redis.RedisError as exc:
+        logger.warning("Could not read recent check rings: %s", exc)
+        return None
+
+    found = {}
+    for website_id, records in zip(website_ids, rings):
+        if records:
+            checks = [decode_check(record, website_id) for record in records]
+            # Concurrent writers may push slightly out of order
+            checks.sort(key=lambda check: check.checked_at, reverse=True)
+            found[website_id] = checks
+    return found
+
+
+def _query_recent_checks(website_ids):
+    rows = StatusCheck.objects.filter(website_id__in=website_ids).annotate(
+        position=Window(RowNumber(), partition_by=F('website_id'), order_by=F('checked_at').desc())
+    ).filter(position__lte=settings.RECENT_CHECKS_SIZE).select_related('error').order_by('website_id', '-checked_at')
+
+    loaded = {website_id: [] for website_id in website_ids}
+    for check in rows:
+        loaded[check.website_id].append(check)
+    return loaded
+
+
+def _warm(checks_by_website):
+    pipe = get_client().pipeline(transaction=False)
+    for website_id, checks in checks_by_website.items():
+        key = ring_key(website_id)
+        pipe.delete(key)
+        pipe.rpush(key, *[encode_check(check) for check in checks])
+        pipe.expire(key, settings.RECENT_CHECKS_TTL)
+    try:
+        pipe.execute()
+    except redis.RedisError as exc:
+        logger.warning("Could not warm recent check rings: %s", exc)
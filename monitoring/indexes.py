@@ -0,0 +1,16 @@
+from django.db import models
+
+
+class TimeRangeIndex(models.Index):
+    """
+    Index for range scans over an append-only timestamp column
+
+    PostgreSQL gets a BRIN index, a few pages in size however large the table
+    grows, since rows are inserted roughly in timestamp order. Other databases
+    get a regular B-tree index.
+    """
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        if schema_editor.connection.vendor == 'postgresql':
+            using = ' USING brin'
+        return super().create_sql(model, schema_editor, using=using, **kwargs)
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from monitoring.benchmarks import BENCHMARK_USER_PREFIX, clear_dataset, generate_dataset
+
+
+class Command(BaseCommand):
+    help = "Bulk-create a synthetic dataset of users, websites, status checks and notifications for benchmarks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--websites-per-user', type=int, default=5)
+        parser.add_argument('--checks-per-website', type=int, default=1000)
+        parser.add_argument('--notifications-per-website', type=int, default=5)
+        parser.add_argument('--batch-size', type=int, default=10000, help="Rows per bulk insert")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--clear', action='store_true',
+                            help=f"Delete existing '{BENCHMARK_USER_PREFIX}*' users and their data first")
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            deleted = clear_dataset()
+            self.stdout.write(f"Deleted {deleted} rows of previous benchmark data")
+
+        counts = generate_dataset(
+            options['users'],
+            options['websites_per_user'],
+            options['checks_per_website'],
+            options['notifications_per_website'],
+            batch_size=options['batch_size'],
+            seed=options['seed'],
+            log=self.stdout.write if options['verbosity'] > 1 else None
+        )
+        self.stdout.write(self.style.SUCCESS(
+            ', '.join(f"{count} {name.replace('_', ' ')}" for name, count in counts.items())
+        ))
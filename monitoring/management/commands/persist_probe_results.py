@@ -0,0 +1,30 @@
+import os
+import socket
+
+from django.core.management.base import BaseCommand
+
+from monitoring.result_writer import ResultWriter
+from monitoring.tasks import get_redis
+
+
+class Command(BaseCommand):
+    help = "Store probe results from the Redis result stream (run one or more writers)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--consumer', default=f'{socket.gethostname()}-{os.getpid()}',
+                            help="Consumer name within the writer group")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--block', type=int, default=5000, help="Milliseconds to wait for new results")
+        parser.add_argument('--claim-idle', type=int, default=60000,
+                            help="Milliseconds before another writer's unacknowledged results are taken over")
+
+    def handle(self, *args, **options):
+        writer = ResultWriter(
+            get_redis(),
+            options['consumer'],
+            batch_size=options['batch_size'],
+            block=options['block'],
+            claim_idle=options['claim_idle']
+        )
+        self.stdout.write(f"Writer {options['consumer']} consuming probe results")
+        writer.run()
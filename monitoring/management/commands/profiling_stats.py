@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from backend.profiling import reset_stats, view_stats
+
+
+class Command(BaseCommand):
+    help = "Show per-view request profiling stats collected by ProfilingMiddleware"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Clear the collected stats")
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            reset_stats()
+            self.stdout.write("Profiling stats cleared")
+            return
+
+        rows = view_stats()
+        if not rows:
+            self.stdout.write("No profiled requests yet (is PROFILING_SAMPLE_RATE above 0?)")
+            return
+
+        width = max(len(row['view']) for row in rows) + 2
+        self.stdout.write(
+            f"{'view':<{width}}{'requests':>9}{'avg ms':>9}{'db ms':>8}{'render ms':>10}{'queries':>9}{'dups':>7}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['view']:<{width}}{row['requests']:>9}{row['avg_ms']:>9.1f}{row['avg_db_ms']:>8.1f}"
+                f"{row['avg_render_ms']:>10.1f}{row['avg_queries']:>9.1f}{row['avg_duplicates']:>7.1f}"
+            )
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from monitoring.benchmarks import ENDPOINTS, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = "Measure latency and query counts of the main API endpoints against benchmark data"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sample-users', type=int, default=5, help="Benchmark users to request as")
+        parser.add_argument('--repeat', type=int, default=3, help="Requests per endpoint and user")
+        parser.add_argument('--endpoint', action='append', choices=[name for name, _, _ in ENDPOINTS],
+                            help="Only run this endpoint (repeatable)")
+        parser.add_argument('--budget', action='append', default=[], metavar='ENDPOINT=QUERIES',
+                            help="Override an endpoint's query budget")
+
+    def handle(self, *args, **options):
+        budgets = {}
+        for item in options['budget']:
+            name, _, value = item.partition('=')
+            if not value.isdigit():
+                raise CommandError(f"Invalid budget '{item}', expected ENDPOINT=QUERIES")
+            budgets[name] = int(value)
+
+        results = run_benchmarks(
+            sample_users=options['sample_users'],
+            repeat=options['repeat'],
+            budgets=budgets,
+            endpoints=options['endpoint']
+        )
+        if not results:
+            raise CommandError("No benchmark data found, run generate_benchmark_data first")
+
+        self.stdout.write(
+            f"{'endpoint':<18}{'requests':>9}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'queries':>9}{'budget':>8}"
+        )
+        for result in results:
+            line = (
+                f"{result['endpoint']:<18}{result['requests']:>9}{result['p50_ms']:>10.1f}"
+                f"{result['p95_ms']:>10.1f}{result['max_ms']:>10.1f}{result['queries']:>9}{result['budget']:>8}"
+            )
+            if result['errors']:
+                line += f"  {result['errors']} non-200 responses"
+            self.stdout.write(line if result['within_budget'] else self.style.ERROR(line))
+
+        over = [result['endpoint'] for result in results if not result['within_budget']]
+        if over:
+            raise CommandError(f"Over budget or failing: {', '.join(over)}")
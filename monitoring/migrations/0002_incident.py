@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-19 07:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Incident',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(help_text='Time of the first failed check')),
+                ('ended_at', models.DateTimeField(blank=True, help_text='Time of the first successful check after the outage', null=True)),
+                ('cause', models.TextField(blank=True, help_text='Status or error of the check that opened the incident')),
+                ('check_count', models.PositiveIntegerField(default=1, help_text='Number of failed checks during the incident')),
+                ('website', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='incidents', to='monitoring.website')),
+            ],
+            options={
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['website', '-started_at'], name='monitoring__website_c3124b_idx'), models.Index(fields=['website', 'ended_at'], name='monitoring__website_f6a590_idx')],
+            },
+        ),
+    ]
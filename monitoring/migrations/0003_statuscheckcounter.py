@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-19 07:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0002_incident'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusCheckCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('boundary', models.DateTimeField(help_text='Totals cover all checks before this time')),
+                ('checks', models.BigIntegerField(default=0)),
+                ('up_checks', models.BigIntegerField(default=0, help_text='Checks that were not offline or error')),
+                ('response_time_total', models.BigIntegerField(default=0, help_text='Sum of response times in milliseconds')),
+                ('response_time_count', models.BigIntegerField(default=0)),
+                ('website', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='check_counters', to='monitoring.website')),
+            ],
+            options={
+                'ordering': ['website', '-boundary'],
+                'unique_together': {('website', 'boundary')},
+            },
+        ),
+    ]
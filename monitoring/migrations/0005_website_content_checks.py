@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-19 07:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0004_notificationchannel_notificationdelivery'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='website',
+            name='check_method',
+            field=models.CharField(choices=[('head', 'HEAD'), ('get', 'GET')], default='head', help_text='HEAD falls back to GET when the server rejects it', max_length=4),
+        ),
+        migrations.AddField(
+            model_name='website',
+            name='content_match_type',
+            field=models.CharField(choices=[('keyword', 'Keyword'), ('regex', 'Regular expression')], default='keyword', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='website',
+            name='expected_content',
+            field=models.CharField(blank=True, help_text='Keyword or regex the response body must contain (GET only)', max_length=500),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.4 on 2026-10-19 07:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0005_website_content_checks'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='alertnotification',
+            name='status_check',
+            field=models.ForeignKey(blank=True, help_text='Check that triggered the alert (empty for certificate alerts)', null=True, on_delete=django.db.models.deletion.CASCADE, to='monitoring.statuscheck'),
+        ),
+        migrations.AlterField(
+            model_name='uptimealert',
+            name='alert_type',
+            field=models.CharField(choices=[('down', 'Website Down'), ('slow', 'Slow Response'), ('up', 'Website Back Up'), ('cert', 'Certificate Expiring')], max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='uptimealert',
+            name='threshold',
+            field=models.PositiveIntegerField(help_text='Threshold value (e.g., response time in ms, days before certificate expiry)'),
+        ),
+        migrations.CreateModel(
+            name='TLSCertificate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('host', models.CharField(max_length=255)),
+                ('port', models.PositiveIntegerField(default=443)),
+                ('subject', models.TextField(blank=True)),
+                ('issuer', models.TextField(blank=True)),
+                ('not_before', models.DateTimeField(blank=True, null=True)),
+                ('not_after', models.DateTimeField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, help_text='Handshake or verification error of the last inspection')),
+                ('checked_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['checked_at'], name='monitoring__checked_3cf36b_idx')],
+                'unique_together': {('host', 'port')},
+            },
+        ),
+    ]
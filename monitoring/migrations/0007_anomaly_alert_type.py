@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 07:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0006_tls_certificates'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='uptimealert',
+            name='alert_type',
+            field=models.CharField(choices=[('down', 'Website Down'), ('slow', 'Slow Response'), ('up', 'Website Back Up'), ('cert', 'Certificate Expiring'), ('anomaly', 'Response Time Anomaly')], max_length=10),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-19 07:38
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0007_anomaly_alert_type'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='statuscheck',
+            name='checked_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='Time the probe ran'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 07:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0008_statuscheck_checked_at_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='statuscheck',
+            name='result_key',
+            field=models.CharField(blank=True, editable=False, help_text='Idempotency key of a streamed probe result', max_length=32, null=True, unique=True),
+        ),
+    ]
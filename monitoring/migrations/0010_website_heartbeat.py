@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-19 07:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0009_statuscheck_result_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='website',
+            name='heartbeat_grace',
+            field=models.PositiveIntegerField(default=60, help_text='Seconds a heartbeat may be late before the monitor is down'),
+        ),
+        migrations.AddField(
+            model_name='website',
+            name='heartbeat_token',
+            field=models.CharField(blank=True, editable=False, help_text='Secret part of the heartbeat ping URL', max_length=64, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='website',
+            name='last_heartbeat_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='website',
+            name='monitor_type',
+            field=models.CharField(choices=[('http', 'HTTP probe'), ('heartbeat', 'Heartbeat')], default='http', max_length=10),
+        ),
+    ]
@@ -0,0 +1,147 @@
+from hashlib import blake2b
+
+import django.db.models.deletion
+from django.db import migrations, models, transaction
+from django.db.models import Case, OuterRef, Subquery, Value, When
+
+import monitoring.fields
+
+
+# Rows converted per transaction, so the table is never locked for long
+CHUNK_SIZE = 10000
+
+STATUSES = ['online', 'offline', 'slow', 'error']
+
+
+def digest(text):
+    return int.from_bytes(blake2b(text.encode(), digest_size=8).digest(), 'big', signed=True)
+
+
+def chunks(StatusCheck):
+    """Yield querysets covering the status checks in PK-ordered chunks"""
+    last_pk = 0
+    while True:
+        pks = list(
+            StatusCheck.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:CHUNK_SIZE]
+        )
+        if not pks:
+            break
+        yield StatusCheck.objects.filter(pk__gte=pks[0], pk__lte=pks[-1])
+        last_pk = pks[-1]
+
+
+def compact_status_checks(apps, schema_editor):
+    """
+    Fill the smallint status and interned error columns in PK-ordered chunks
+
+    Empty error messages become NULL, as StatusCheck.error_message's setter
+    does for new checks; both meant "no error".
+    """
+    StatusCheck = apps.get_model('monitoring', 'StatusCheck')
+    ErrorMessage = apps.get_model('monitoring', 'ErrorMessage')
+
+    status_index = Case(
+        *[When(status=status, then=Value(index)) for index, status in enumerate(STATUSES)],
+        output_field=models.PositiveSmallIntegerField()
+    )
+
+    for chunk in chunks(StatusCheck):
+        with transaction.atomic():
+            chunk.update(status_index=status_index)
+
+            messages = set(
+                chunk.exclude(error_message__isnull=True).exclude(error_message='')
+                .values_list('error_message', flat=True).distinct()
+            )
+            ErrorMessage.objects.bulk_create(
+                [ErrorMessage(id=digest(message), text=message) for message in messages],
+                ignore_conflicts=True
+            )
+            for message in messages:
+                chunk.filter(error_message=message).update(error_id=digest(message))
+
+
+def expand_status_checks(apps, schema_editor):
+    """Copy statuses and interned error texts back into the string columns"""
+    StatusCheck = apps.get_model('monitoring', 'StatusCheck')
+    ErrorMessage = apps.get_model('monitoring', 'ErrorMessage')
+
+    status = Case(
+        *[When(status_index=index, then=Value(status)) for index, status in enumerate(STATUSES)],
+        output_field=models.CharField()
+    )
+    error_text = Subquery(ErrorMessage.objects.filter(pk=OuterRef('error_id')).values('text')[:1])
+
+    for chunk in chunks(StatusCheck):
+        with transaction.atomic():
+            chunk.update(status=status)
+            chunk.filter(error__isnull=False).update(error_message=error_text)
+
+
+class Migration(migrations.Migration):
+
+    # Each conversion chunk commits on its own
+    atomic = False
+
+    dependencies = [
+        ('monitoring', '0010_website_heartbeat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ErrorMessage',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('text', models.TextField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='statuscheck',
+            name='status_index',
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='statuscheck',
+            name='error',
+            field=models.ForeignKey(blank=True, help_text='Error message if check failed', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='monitoring.errormessage'),
+        ),
+        # Lets a rollback re-add the string status column to a populated
+        # table; it is NOT NULL again once expand_status_checks has filled it
+        migrations.AlterField(
+            model_name='statuscheck',
+            name='status',
+            field=models.CharField(choices=[('online', 'Online'), ('offline', 'Offline'), ('slow', 'Slow'), ('error', 'Error')], max_length=10, null=True),
+        ),
+        migrations.RunPython(compact_status_checks, expand_status_checks),
+        migrations.RemoveIndex(
+            model_name='statuscheck',
+            name='monitoring__status_50666c_idx',
+        ),
+        migrations.RemoveField(
+            model_name='statuscheck',
+            name='status',
+        ),
+        migrations.RemoveField(
+            model_name='statuscheck',
+            name='error_message',
+        ),
+        migrations.RenameField(
+            model_name='statuscheck',
+            old_name='status_index',
+            new_name='status',
+        ),
+        migrations.AlterField(
+            model_name='statuscheck',
+            name='status',
+            field=monitoring.fields.ChoiceIndexField(choices=[('online', 'Online'), ('offline', 'Offline'), ('slow', 'Slow'), ('error', 'Error')]),
+        ),
+        migrations.AlterField(
+            model_name='statuscheck',
+            name='status_code',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='HTTP status code', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='statuscheck',
+            index=models.Index(fields=['status', '-checked_at'], name='monitoring__status_50666c_idx'),
+        ),
+    ]
@@ -0,0 +1,122 @@
+# Generated by Django 5.2.4 on 2026-10-19 07:54
+
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+CHUNK_SIZE = 1000
+
+# Frozen copies of the search index DDL at the time of this migration;
+# later changes to monitoring.search get migrations of their own
+SQLITE_INSTALL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS monitoring_website_fts USING fts5(
+        name, url, host, content='monitoring_website', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS monitoring_website_fts_ai AFTER INSERT ON monitoring_website BEGIN
+        INSERT INTO monitoring_website_fts(rowid, name, url, host) VALUES (new.id, new.name, new.url, new.host);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS monitoring_website_fts_ad AFTER DELETE ON monitoring_website BEGIN
+        INSERT INTO monitoring_website_fts(monitoring_website_fts, rowid, name, url, host)
+        VALUES ('delete', old.id, old.name, old.url, old.host);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS monitoring_website_fts_au AFTER UPDATE OF name, url, host ON monitoring_website BEGIN
+        INSERT INTO monitoring_website_fts(monitoring_website_fts, rowid, name, url, host)
+        VALUES ('delete', old.id, old.name, old.url, old.host);
+        INSERT INTO monitoring_website_fts(rowid, name, url, host) VALUES (new.id, new.name, new.url, new.host);
+    END""",
+    "INSERT INTO monitoring_website_fts(monitoring_website_fts) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS monitoring_website_fts_ai",
+    "DROP TRIGGER IF EXISTS monitoring_website_fts_ad",
+    "DROP TRIGGER IF EXISTS monitoring_website_fts_au",
+    "DROP TABLE IF EXISTS monitoring_website_fts",
+]
+
+POSTGRESQL_INSTALL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """CREATE INDEX IF NOT EXISTS monitoring_website_search_trgm ON monitoring_website
+        USING gin (name gin_trgm_ops, url gin_trgm_ops, host gin_trgm_ops)""",
+]
+
+POSTGRESQL_UNINSTALL = [
+    "DROP INDEX IF EXISTS monitoring_website_search_trgm",
+]
+
+
+def normalize_host(url):
+    try:
+        return (urlsplit(url).hostname or '').rstrip('.')
+    except ValueError:
+        return ''
+
+
+def fill_search_columns(apps, schema_editor):
+    """Fill host and current_status (from the latest check) in PK-ordered chunks"""
+    Website = apps.get_model('monitoring', 'Website')
+    StatusCheck = apps.get_model('monitoring', 'StatusCheck')
+
+    latest_status = StatusCheck.objects.filter(website=OuterRef('pk')).order_by('-checked_at').values('status')[:1]
+    last_pk = 0
+    while True:
+        websites = list(
+            Website.objects.filter(pk__gt=last_pk).order_by('pk')
+            .annotate(latest_status=Subquery(latest_status)).only('pk', 'url')[:CHUNK_SIZE]
+        )
+        if not websites:
+            break
+        for website in websites:
+            website.host = normalize_host(website.url)
+            website.current_status = website.latest_status or ''
+        Website.objects.bulk_update(websites, ['host', 'current_status'])
+        last_pk = websites[-1].pk
+
+
+def execute(schema_editor, sqlite, postgresql):
+    vendor = schema_editor.connection.vendor
+    statements = sqlite if vendor == 'sqlite' else postgresql if vendor == 'postgresql' else []
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def install_index(apps, schema_editor):
+    execute(schema_editor, SQLITE_INSTALL, POSTGRESQL_INSTALL)
+
+
+def uninstall_index(apps, schema_editor):
+    execute(schema_editor, SQLITE_UNINSTALL, POSTGRESQL_UNINSTALL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0012_status_pages'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='website',
+            name='current_status',
+            field=models.CharField(blank=True, choices=[('online', 'Online'), ('offline', 'Offline'), ('slow', 'Slow'), ('error', 'Error')], editable=False, help_text='Status of the latest check (empty until first checked)', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='website',
+            name='host',
+            field=models.CharField(blank=True, editable=False, help_text='Normalized host name of the URL', max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='website',
+            index=models.Index(fields=['user', 'current_status'], name='monitoring__user_id_fff4d9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='website',
+            index=models.Index(fields=['user', 'host'], name='monitoring__user_id_53934b_idx'),
+        ),
+        migrations.RunPython(fill_search_columns, migrations.RunPython.noop),
+        migrations.RunPython(install_index, uninstall_index),
+    ]
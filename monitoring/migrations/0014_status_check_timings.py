@@ -0,0 +1,43 @@
+# Generated by Django 5.2.4 on 2026-10-19 08:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0013_website_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='statuscheck',
+            name='connect_time',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='TCP connect time in milliseconds', null=True),
+        ),
+        migrations.AddField(
+            model_name='statuscheck',
+            name='dns_time',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='DNS resolution time in milliseconds', null=True),
+        ),
+        migrations.AddField(
+            model_name='statuscheck',
+            name='redirect_count',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Redirects followed', null=True),
+        ),
+        migrations.AddField(
+            model_name='statuscheck',
+            name='redirect_time',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Time spent on redirects before the last request, in milliseconds', null=True),
+        ),
+        migrations.AddField(
+            model_name='statuscheck',
+            name='tls_time',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='TLS handshake time in milliseconds', null=True),
+        ),
+        migrations.AddField(
+            model_name='statuscheck',
+            name='ttfb',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Time from sending the request to the response headers, in milliseconds', null=True),
+        ),
+    ]
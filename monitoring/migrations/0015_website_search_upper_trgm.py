@@ -0,0 +1,44 @@
+from django.db import migrations
+
+
+# icontains compiles to UPPER(column::text) LIKE UPPER(...) on PostgreSQL,
+# which the bare-column trigram index from 0013 never matched
+INSTALL = [
+    "DROP INDEX IF EXISTS monitoring_website_search_trgm",
+    """CREATE INDEX IF NOT EXISTS monitoring_website_search_upper_trgm ON monitoring_website USING gin (
+        (UPPER(name::text)) gin_trgm_ops, (UPPER(url::text)) gin_trgm_ops, (UPPER(host::text)) gin_trgm_ops
+    )""",
+]
+
+UNINSTALL = [
+    "DROP INDEX IF EXISTS monitoring_website_search_upper_trgm",
+    """CREATE INDEX IF NOT EXISTS monitoring_website_search_trgm ON monitoring_website
+        USING gin (name gin_trgm_ops, url gin_trgm_ops, host gin_trgm_ops)""",
+]
+
+
+def execute(schema_editor, statements):
+    # SQLite searches through FTS5 (0013) and needs no change
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def install_index(apps, schema_editor):
+    execute(schema_editor, INSTALL)
+
+
+def uninstall_index(apps, schema_editor):
+    execute(schema_editor, UNINSTALL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0014_status_check_timings'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_index, uninstall_index),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-19 08:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0015_website_search_upper_trgm'),
+    ]
+
+    operations = [
+        # Added before the old unique index is dropped, so keys are never unchecked
+        migrations.AddConstraint(
+            model_name='statuscheck',
+            constraint=models.UniqueConstraint(condition=models.Q(('result_key__isnull', False)), fields=('result_key',), name='monitoring_statuscheck_result_key_uniq'),
+        ),
+        migrations.AlterField(
+            model_name='statuscheck',
+            name='result_key',
+            field=models.CharField(blank=True, editable=False, help_text='Idempotency key of a streamed probe result', max_length=32, null=True),
+        ),
+    ]
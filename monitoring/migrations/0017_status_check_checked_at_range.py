@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 08:30
+
+import monitoring.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0016_status_check_result_key_partial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='statuscheck',
+            index=monitoring.indexes.TimeRangeIndex(fields=['checked_at'], name='monitoring_statuscheck_range'),
+        ),
+    ]
@@ -1,8 +1,23 @@
+from datetime import timedelta
+from hashlib import blake2b
+from urllib.parse import urlsplit
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import URLValidator
 from django.utils import timezone
 
+from .fields import ChoiceIndexField
+from .indexes import TimeRangeIndex
+
+
+def normalize_host(url):
+    """Lowercase host name of a URL, without port, credentials or trailing dot"""
+    try:
+        return (urlsplit(url).hostname or '').rstrip('.')
+    except ValueError:
+        return ''
+
 
 class Website(models.Model):
     """Model to store websites to be monitored"""
@@ -20,35 +35,186 @@ class Website(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    MONITOR_TYPES = [
+        ('http', 'HTTP probe'),
+        ('heartbeat', 'Heartbeat'),
+    ]
+    
+    CHECK_METHODS = [
+        ('head', 'HEAD'),
+        ('get', 'GET'),
+    ]
+    
+    CONTENT_MATCH_TYPES = [
+        ('keyword', 'Keyword'),
+        ('regex', 'Regular expression'),
+    ]
+    
     # Monitoring settings
     check_interval = models.PositiveIntegerField(default=60, help_text="Check interval in seconds")
     timeout = models.PositiveIntegerField(default=10, help_text="Request timeout in seconds")
+    check_method = models.CharField(
+        max_length=4, choices=CHECK_METHODS, default='head',
+        help_text="HEAD falls back to GET when the server rejects it"
+    )
+    expected_content = models.CharField(
+        max_length=500, blank=True,
+        help_text="Keyword or regex the response body must contain (GET only)"
+    )
+    content_match_type = models.CharField(max_length=10, choices=CONTENT_MATCH_TYPES, default='keyword')
+    
+    # Heartbeat (push) monitors are pinged by the monitored job instead of probed;
+    # check_interval is the expected time between pings
+    monitor_type = models.CharField(max_length=10, choices=MONITOR_TYPES, default='http')
+    heartbeat_token = models.CharField(
+        max_length=64, unique=True, null=True, blank=True, editable=False,
+        help_text="Secret part of the heartbeat ping URL"
+    )
+    heartbeat_grace = models.PositiveIntegerField(
+        default=60, help_text="Seconds a heartbeat may be late before the monitor is down"
+    )
+    last_heartbeat_at = models.DateTimeField(null=True, blank=True, editable=False)
+    
+    CHECK_STATUS_CHOICES = [
+        ('online', 'Online'),
+        ('offline', 'Offline'),
+        ('slow', 'Slow'),
+        ('error', 'Error'),
+    ]
+    
+    # Denormalized for indexed search and filtering
+    host = models.CharField(max_length=255, blank=True, editable=False, help_text="Normalized host name of the URL")
+    current_status = models.CharField(
+        max_length=10, choices=CHECK_STATUS_CHOICES, blank=True, editable=False,
+        help_text="Status of the latest check (empty until first checked)"
+    )
     
     class Meta:
         unique_together = ['user', 'url']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'current_status']),
+            models.Index(fields=['user', 'host']),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.url})"
     
+    def save(self, *args, **kwargs):
+        self.host = normalize_host(self.url)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'url' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'host'}
+        super().save(*args, **kwargs)
+    
+    @property
+    def recent_status_checks(self):
+        """Latest RECENT_CHECKS_SIZE status checks, newest first (served from the Redis hot store)"""
+        if not hasattr(self, '_recent_status_checks'):
+            from .hot_store import load_recent_checks
+            load_recent_checks([self])
+        return self._recent_status_checks
+    
     @property
     def latest_status_check(self):
         """Get the most recent status check for this website"""
-        return self.status_checks.order_by('-checked_at').first()
+        recent_checks = self.recent_status_checks
+        return recent_checks[0] if recent_checks else None
     
     @property
     def uptime_percentage(self):
         """Calculate uptime percentage from recent status checks"""
-        recent_checks = self.status_checks.order_by('-checked_at')[:100]  # Last 100 checks
+        recent_checks = self.recent_status_checks  # Last RECENT_CHECKS_SIZE (100) checks
         if not recent_checks:
             return 0
         
-        successful_checks = recent_checks.filter(status='online').count()
+        successful_checks = sum(1 for check in recent_checks if check.status == 'online')
         return (successful_checks / len(recent_checks)) * 100
+    
+    def uptime_between(self, start, end):
+        """Calculate uptime percentage for [start, end) from incident intervals"""
+        if end <= start:
+            return 100.0
+        
+        incidents = self.incidents.filter(
+            started_at__lt=end
+        ).filter(
+            models.Q(ended_at__isnull=True) | models.Q(ended_at__gt=start)
+        ).values_list('started_at', 'ended_at')
+        
+        downtime = timedelta(0)
+        for started_at, ended_at in incidents:
+            downtime += min(ended_at or end, end) - max(started_at, start)
+        
+        return max(0.0, 1 - downtime / (end - start)) * 100
+
+
+class ErrorMessageManager(models.Manager):
+    
+    # Texts and known IDs cached per process; the set of distinct messages is small
+    CACHE_LIMIT = 10000
+    
+    def __init__(self):
+        super().__init__()
+        self.texts = {}
+    
+    def intern(self, messages):
+        """Make sure rows exist for unsaved ErrorMessage instances"""
+        new = {message.id: message for message in messages if message.id not in self.texts}
+        if new:
+            self.bulk_create(new.values(), ignore_conflicts=True)
+            self.remember(new.values())
+    
+    def text(self, message_id):
+        if message_id not in self.texts:
+            self.remember([self.get(pk=message_id)])
+        return self.texts[message_id]
+    
+    def remember(self, messages):
+        if len(self.texts) > self.CACHE_LIMIT:
+            self.texts.clear()
+        self.texts.update((message.id, message.text) for message in messages)
+
+
+class ErrorMessage(models.Model):
+    """
+    Interned status check error text, keyed by a 64-bit hash of the text
+    
+    Writers derive the key locally, so storing a check never needs a
+    lookup round trip; rows are created on first use and never change.
+    """
+    
+    id = models.BigIntegerField(primary_key=True)
+    text = models.TextField()
+    
+    objects = ErrorMessageManager()
+    
+    def __str__(self):
+        return self.text
+    
+    @staticmethod
+    def digest(text):
+        return int.from_bytes(blake2b(text.encode(), digest_size=8).digest(), 'big', signed=True)
+
+
+class StatusCheckQuerySet(models.QuerySet):
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        ErrorMessage.objects.intern(
+            check.error for check in objs if check.error_id is not None and StatusCheck.error.is_cached(check)
+        )
+        return super().bulk_create(objs, *args, **kwargs)
 
 
 class StatusCheck(models.Model):
-    """Model to store individual status check results"""
+    """
+    Model to store individual status check results
+    
+    Rows are kept compact: the status is a smallint index into
+    STATUS_CHOICES (still read and queried as its string value) and the
+    error message is a reference to an interned ErrorMessage.
+    """
     
     STATUS_CHOICES = [
         ('online', 'Online'),
@@ -58,21 +224,152 @@ class StatusCheck(models.Model):
     ]
     
     website = models.ForeignKey(Website, on_delete=models.CASCADE, related_name='status_checks')
-    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
-    status_code = models.PositiveIntegerField(null=True, blank=True, help_text="HTTP status code")
+    status = ChoiceIndexField(choices=STATUS_CHOICES)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True, help_text="HTTP status code")
     response_time = models.PositiveIntegerField(null=True, blank=True, help_text="Response time in milliseconds")
-    error_message = models.TextField(null=True, blank=True, help_text="Error message if check failed")
-    checked_at = models.DateTimeField(auto_now_add=True)
+    # Phase breakdown of the probe's last request (ms, see probes.ProbeTimings);
+    # connection phases are null when a kept-alive connection was reused
+    dns_time = models.PositiveSmallIntegerField(null=True, blank=True, help_text="DNS resolution time in milliseconds")
+    connect_time = models.PositiveSmallIntegerField(null=True, blank=True, help_text="TCP connect time in milliseconds")
+    tls_time = models.PositiveSmallIntegerField(null=True, blank=True, help_text="TLS handshake time in milliseconds")
+    ttfb = models.PositiveSmallIntegerField(
+        null=True, blank=True, help_text="Time from sending the request to the response headers, in milliseconds"
+    )
+    redirect_count = models.PositiveSmallIntegerField(null=True, blank=True, help_text="Redirects followed")
+    redirect_time = models.PositiveSmallIntegerField(
+        null=True, blank=True, help_text="Time spent on redirects before the last request, in milliseconds"
+    )
+    error = models.ForeignKey(
+        ErrorMessage, on_delete=models.PROTECT, null=True, blank=True, related_name='+',
+        help_text="Error message if check failed"
+    )
+    checked_at = models.DateTimeField(default=timezone.now, help_text="Time the probe ran")
+    result_key = models.CharField(
+        max_length=32, null=True, blank=True, editable=False,
+        help_text="Idempotency key of a streamed probe result"
+    )
     
     class Meta:
         ordering = ['-checked_at']
         indexes = [
             models.Index(fields=['website', '-checked_at']),
             models.Index(fields=['status', '-checked_at']),
+            # Counter rollups scan a checked_at range across all websites
+            TimeRangeIndex(fields=['checked_at'], name='monitoring_statuscheck_range'),
+        ]
+        constraints = [
+            # Only streamed results carry a key; leave the NULL rows out of the index
+            models.UniqueConstraint(
+                fields=['result_key'], condition=models.Q(result_key__isnull=False),
+                name='monitoring_statuscheck_result_key_uniq'
+            ),
         ]
     
+    objects = StatusCheckQuerySet.as_manager()
+    
     def __str__(self):
         return f"{self.website.name} - {self.status} at {self.checked_at}"
+    
+    @property
+    def error_message(self):
+        if self.error_id is None:
+            return None
+        if StatusCheck.error.is_cached(self):
+            return self.error.text
+        return ErrorMessage.objects.text(self.error_id)
+    
+    @error_message.setter
+    def error_message(self, text):
+        self.error = ErrorMessage(id=ErrorMessage.digest(text), text=text) if text else None
+    
+    def save(self, *args, **kwargs):
+        if self.error_id is not None and StatusCheck.error.is_cached(self):
+            ErrorMessage.objects.intern([self.error])
+        super().save(*args, **kwargs)
+
+
+class Incident(models.Model):
+    """Model to store outage intervals built from consecutive failed checks"""
+    
+    # Check statuses that count as the website being down
+    DOWN_STATUSES = ['offline', 'error']
+    
+    website = models.ForeignKey(Website, on_delete=models.CASCADE, related_name='incidents')
+    started_at = models.DateTimeField(help_text="Time of the first failed check")
+    ended_at = models.DateTimeField(null=True, blank=True, help_text="Time of the first successful check after the outage")
+    cause = models.TextField(blank=True, help_text="Status or error of the check that opened the incident")
+    check_count = models.PositiveIntegerField(default=1, help_text="Number of failed checks during the incident")
+    
+    class Meta:
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['website', '-started_at']),
+            models.Index(fields=['website', 'ended_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.website.name} - down since {self.started_at}"
+    
+    @property
+    def is_open(self):
+        return self.ended_at is None
+    
+    @property
+    def duration(self):
+        """Length of the outage so far (or in total, once resolved)"""
+        return (self.ended_at or timezone.now()) - self.started_at
+
+
+class StatusCheckCounter(models.Model):
+    """
+    Cumulative status check totals for a website at a bucket boundary
+    
+    Each row holds running totals over every check before `boundary`, so
+    totals for any [start, end) window are the difference of two rows.
+    Rows outlive the raw checks removed by cleanup_old_status_checks.
+    """
+    
+    website = models.ForeignKey(Website, on_delete=models.CASCADE, related_name='check_counters')
+    boundary = models.DateTimeField(help_text="Totals cover all checks before this time")
+    checks = models.BigIntegerField(default=0)
+    up_checks = models.BigIntegerField(default=0, help_text="Checks that were not offline or error")
+    response_time_total = models.BigIntegerField(default=0, help_text="Sum of response times in milliseconds")
+    response_time_count = models.BigIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['website', '-boundary']
+        unique_together = ['website', 'boundary']
+    
+    def __str__(self):
+        return f"{self.website_id} - {self.checks} checks before {self.boundary}"
+
+
+class TLSCertificate(models.Model):
+    """Model to cache the TLS certificate served on a host:port"""
+    
+    host = models.CharField(max_length=255)
+    port = models.PositiveIntegerField(default=443)
+    subject = models.TextField(blank=True)
+    issuer = models.TextField(blank=True)
+    not_before = models.DateTimeField(null=True, blank=True)
+    not_after = models.DateTimeField(null=True, blank=True)
+    error = models.TextField(blank=True, help_text="Handshake or verification error of the last inspection")
+    checked_at = models.DateTimeField()
+    
+    class Meta:
+        unique_together = ['host', 'port']
+        indexes = [
+            models.Index(fields=['checked_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.host}:{self.port} (expires {self.not_after})"
+    
+    @property
+    def days_remaining(self):
+        if self.not_after is None:
+            return None
+        return (self.not_after - timezone.now()).days
 
 
 class UptimeAlert(models.Model):
@@ -82,11 +379,13 @@ class UptimeAlert(models.Model):
         ('down', 'Website Down'),
         ('slow', 'Slow Response'),
         ('up', 'Website Back Up'),
+        ('cert', 'Certificate Expiring'),
+        ('anomaly', 'Response Time Anomaly'),
     ]
     
     website = models.ForeignKey(Website, on_delete=models.CASCADE, related_name='alerts')
     alert_type = models.CharField(max_length=10, choices=ALERT_TYPES)
-    threshold = models.PositiveIntegerField(help_text="Threshold value (e.g., response time in ms)")
+    threshold = models.PositiveIntegerField(help_text="Threshold value (e.g., response time in ms, days before certificate expiry)")
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -101,7 +400,10 @@ class AlertNotification(models.Model):
     """Model to store sent alert notifications"""
     
     alert = models.ForeignKey(UptimeAlert, on_delete=models.CASCADE, related_name='notifications')
-    status_check = models.ForeignKey(StatusCheck, on_delete=models.CASCADE)
+    status_check = models.ForeignKey(
+        StatusCheck, on_delete=models.CASCADE, null=True, blank=True,
+        help_text="Check that triggered the alert (empty for certificate alerts)"
+    )
     message = models.TextField()
     sent_at = models.DateTimeField(auto_now_add=True)
     
@@ -109,4 +411,70 @@ class AlertNotification(models.Model):
         ordering = ['-sent_at']
     
     def __str__(self):
-        return f"Alert for {self.alert.website.name} at {self.sent_at}"
\ No newline at end of file
+        return f"Alert for {self.alert.website.name} at {self.sent_at}"
+
+
+class NotificationChannel(models.Model):
+    """Model to store where a user's alert notifications are delivered"""
+    
+    CHANNEL_TYPES = [
+        ('email', 'Email'),
+        ('webhook', 'Webhook'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notification_channels')
+    channel_type = models.CharField(max_length=10, choices=CHANNEL_TYPES)
+    target = models.CharField(max_length=500, help_text="Email address or webhook URL")
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['user', 'channel_type', 'target']
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.get_channel_type_display()} ({self.target})"
+
+
+class NotificationDelivery(models.Model):
+    """Model to store the outbound delivery of a notification to one channel"""
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    
+    notification = models.ForeignKey(AlertNotification, on_delete=models.CASCADE, related_name='deliveries')
+    channel_type = models.CharField(max_length=10, choices=NotificationChannel.CHANNEL_TYPES)
+    target = models.CharField(max_length=500)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.channel_type}:{self.target} - {self.status}"
+
+
+class StatusPage(models.Model):
+    """Model to store a public status page showing a selection of a user's websites"""
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='status_pages')
+    slug = models.SlugField(max_length=100, unique=True, help_text="Public URL name of the page")
+    title = models.CharField(max_length=255)
+    websites = models.ManyToManyField(Website, related_name='status_pages', blank=True)
+    is_public = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['title']
+    
+    def __str__(self):
+        return f"{self.title} ({self.slug})"
@@ -0,0 +1,144 @@
+import requests
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection, EmailMessage
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import NotificationChannel, NotificationDelivery
+
+
+# Deliveries made through LocmemWebhookBackend, like django.core.mail.outbox
+outbox = []
+
+
+class RequestsWebhookBackend:
+    """Post webhook digests over HTTP"""
+
+    def send(self, url, payload):
+        response = requests.post(
+            url,
+            json=payload,
+            timeout=settings.NOTIFICATION_WEBHOOK_TIMEOUT,
+            headers={'User-Agent': 'StatusMonitor/1.0'}
+        )
+        response.raise_for_status()
+
+
+class LocmemWebhookBackend:
+    """Keep webhook digests in `outbox` instead of sending them (for tests)"""
+
+    def send(self, url, payload):
+        outbox.append({'url': url, 'payload': payload})
+
+
+def create_deliveries(user, notifications):
+    """
+    Queue notifications for every active channel of the user
+
+    Falls back to the account email when no channel is configured.
+    """
+    targets = list(
+        NotificationChannel.objects.filter(user=user, is_active=True).values_list('channel_type', 'target')
+    )
+    if not targets and user.email:
+        targets = [('email', user.email)]
+
+    return NotificationDelivery.objects.bulk_create([
+        NotificationDelivery(notification=notification, channel_type=channel_type, target=target)
+        for notification in notifications
+        for channel_type, target in targets
+    ])
+
+
+def build_digest(notifications):
+    """Return (subject, body, payload) for a digest of notifications"""
+    count = len(notifications)
+    subject = f"[Status Monitor] {notifications[0].message}" if count == 1 else f"[Status Monitor] {count} alerts"
+    body = "\n".join(f"{notification.sent_at:%Y-%m-%d %H:%M:%S} {notification.message}" for notification in notifications)
+    payload = {
+        'count': count,
+        'alerts': [
+            {
+                'id': notification.id,
+                'website': notification.alert.website.name,
+                'alert_type': notification.alert.alert_type,
+                'message': notification.message,
+                'sent_at': notification.sent_at.isoformat(),
+            }
+            for notification in notifications
+        ]
+    }
+    return subject, body, payload
+
+
+def send_digest(channel_type, target, notifications):
+    """Send one digest to one channel, raising on failure"""
+    subject, body, payload = build_digest(notifications)
+    if channel_type == 'email':
+        with get_connection() as connection:
+            EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [target], connection=connection).send()
+    else:
+        import_string(settings.NOTIFICATION_WEBHOOK_BACKEND)().send(target, payload)
+
+
+def retry_delay(attempts):
+    """Exponential backoff after the given number of failed attempts"""
+    return timedelta(seconds=settings.NOTIFICATION_RETRY_BACKOFF * 2 ** (attempts - 1))
+
+
+def deliver_pending(limit=None):
+    """
+    Send due deliveries as one digest per channel target
+
+    Digests are sent concurrently with at most NOTIFICATION_MAX_CONCURRENCY
+    in flight. Failed digests are retried with exponential backoff until
+    NOTIFICATION_MAX_ATTEMPTS is reached. Returns (sent, failed) counts of
+    digests.
+    """
+    now = timezone.now()
+    deliveries = NotificationDelivery.objects.filter(
+        status='pending',
+        next_attempt_at__lte=now
+    ).select_related('notification__alert__website').order_by('next_attempt_at')
+    if limit:
+        deliveries = deliveries[:limit]
+
+    digests = defaultdict(list)
+    for delivery in deliveries:
+        digests[(delivery.channel_type, delivery.target)].append(delivery)
+    if not digests:
+        return 0, 0
+
+    def send(item):
+        (channel_type, target), batch = item
+        try:
+            send_digest(channel_type, target, [delivery.notification for delivery in batch])
+        except Exception as exc:
+            return batch, exc
+        return batch, None
+
+    with ThreadPoolExecutor(max_workers=settings.NOTIFICATION_MAX_CONCURRENCY) as executor:
+        outcomes = list(executor.map(send, digests.items()))
+
+    sent = failed = 0
+    for batch, error in outcomes:
+        ids = [delivery.id for delivery in batch]
+        if error is None:
+            NotificationDelivery.objects.filter(id__in=ids).update(status='sent', sent_at=timezone.now())
+            sent += 1
+            continue
+
+        failed += 1
+        attempts = max(delivery.attempts for delivery in batch) + 1
+        NotificationDelivery.objects.filter(id__in=ids).update(
+            attempts=attempts,
+            last_error=str(error)[:1000],
+            status='failed' if attempts >= settings.NOTIFICATION_MAX_ATTEMPTS else 'pending',
+            next_attempt_at=timezone.now() + retry_delay(attempts)
+        )
+
+    return sent, failed
@@ -0,0 +1,33 @@
+import codecs
+import csv
+from itertools import islice
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class CSVParser(BaseParser):
+    """
+    Parser for CSV uploads.
+
+    The upload is decoded line by line from the request stream instead of
+    being read into a single string, and parsing stops one row past
+    WEBSITE_BULK_IMPORT_MAX_ROWS so oversized files are rejected without
+    building every row. The first line must be a header.
+    """
+
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            reader = csv.DictReader(codecs.iterdecode(stream, encoding))
+            return [
+                {key.strip(): (value or '').strip() for key, value in row.items() if key}
+                for row in islice(reader, settings.WEBSITE_BULK_IMPORT_MAX_ROWS + 1)
+            ]
+        except (csv.Error, UnicodeDecodeError) as exc:
+            raise ParseError(f'CSV parse error - {exc}')
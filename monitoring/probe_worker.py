@@ -0,0 +1,210 @@
+"""
+Standalone probe worker
+
+Pulls batches of probe jobs from a Redis list, probes them with a thread
+pool and appends the results to a Redis stream, where Django-side writers
+(`manage.py persist_probe_results`, see monitoring.result_writer) store
+them. It never imports Django, DRF or the ORM, so a probe process stays
+small and starts instantly.
+
+With --processes above 1 (the default is one per CPU) batches are handed
+to a pool of child processes, each running its own thread pool of
+--concurrency probes, and the parent publishes every batch's results as
+it comes back. TLS handshakes and response parsing then spread over all
+cores instead of contending for one interpreter.
+
+Run with:
+
+    python -m monitoring.probe_worker --concurrency 32 --processes 8
+
+Jobs are JSON lists pushed by `monitoring.tasks.dispatch_website_checks`
+when PROBE_BACKEND is 'redis'; each job carries the website ID, URL,
+timeout and content check settings.
+"""
+import argparse
+import json
+import logging
+import os
+import signal
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import redis
+
+from .probes import probe_url
+
+
+WORK_QUEUE = 'probe:work'
+RESULT_STREAM = 'probe:results'
+
+# Approximate cap on the result stream length, in entries
+RESULT_STREAM_MAXLEN = 1_000_000
+
+DEFAULT_MAX_BODY_BYTES = 256 * 1024
+
+logger = logging.getLogger('monitoring.probe_worker')
+
+
+def encode_batch(jobs):
+    return json.dumps(jobs, separators=(',', ':'))
+
+
+def encode_result(result):
+    return {'data': json.dumps(result, separators=(',', ':'))}
+
+
+def decode_result(fields):
+    return json.loads(fields[b'data'])
+
+
+def publish_results(client, results):
+    """Append probe results to the result stream in one round trip"""
+    pipe = client.pipeline(transaction=False)
+    for result in results:
+        pipe.xadd(RESULT_STREAM, encode_result(result), maxlen=RESULT_STREAM_MAXLEN, approximate=True)
+    pipe.execute()
+
+
+def run_job(job, max_body_bytes=DEFAULT_MAX_BODY_BYTES):
+    """Probe one job and return the result to publish"""
+    result = probe_url(
+        job['url'],
+        job['timeout'],
+        method=job.get('method', 'head'),
+        expected_content=job.get('expected_content', ''),
+        content_match_type=job.get('content_match_type', 'keyword'),
+        max_body_bytes=max_body_bytes
+    )
+    return with_result_metadata(result, job['id'])
+
+
+def with_result_metadata(result, website_id):
+    """Add the website ID, probe time and idempotency key to a probe result"""
+    result['website_id'] = website_id
+    result['checked_at'] = time.time()
+    result['key'] = uuid.uuid4().hex
+    return result
+
+
+# Thread pool of a pool process, set up by init_pool_process
+_process_threads = None
+_process_max_body_bytes = DEFAULT_MAX_BODY_BYTES
+
+
+def init_pool_process(concurrency, max_body_bytes):
+    global _process_threads, _process_max_body_bytes
+    # Shutdown is driven by the parent, which finishes in-flight batches
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    _process_threads = ThreadPoolExecutor(max_workers=concurrency)
+    _process_max_body_bytes = max_body_bytes
+
+
+def probe_batch(jobs):
+    """Probe a batch concurrently inside a pool process"""
+    return list(_process_threads.map(lambda job: run_job(job, _process_max_body_bytes), jobs))
+
+
+class ProbeWorker:
+    """Blocking loop moving jobs from the work queue to the result stream"""
+
+    def __init__(self, client, concurrency=16, block_timeout=5, max_body_bytes=DEFAULT_MAX_BODY_BYTES,
+                 processes=1):
+        self.client = client
+        self.block_timeout = block_timeout
+        self.max_body_bytes = max_body_bytes
+        self.processes = processes
+        self.running = True
+
+        if processes > 1:
+            self.executor = ProcessPoolExecutor(
+                max_workers=processes,
+                initializer=init_pool_process,
+                initargs=(concurrency, max_body_bytes)
+            )
+            # Two batches per process keep every core busy while results are published
+            self.slots = threading.BoundedSemaphore(processes * 2)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    def stop(self, *args):
+        self.running = False
+
+    def process_batch(self, jobs):
+        """Probe a batch concurrently and publish all results in one round trip"""
+        results = list(self.executor.map(lambda job: run_job(job, self.max_body_bytes), jobs))
+        publish_results(self.client, results)
+        return len(results)
+
+    def submit_batch(self, jobs):
+        """Hand a batch to the process pool; its results are published when it completes"""
+        future = self.executor.submit(probe_batch, jobs)
+        future.add_done_callback(self.publish_batch)
+
+    def publish_batch(self, future):
+        try:
+            results = future.result()
+            publish_results(self.client, results)
+            logger.info("Probed %d websites", len(results))
+        except Exception:
+            logger.exception("Probe batch failed")
+        finally:
+            self.slots.release()
+
+    def next_batch(self):
+        item = self.client.brpop(WORK_QUEUE, timeout=self.block_timeout)
+        if item is None:
+            return None
+        try:
+            return json.loads(item[1])
+        except ValueError:
+            logger.warning("Dropping malformed probe batch")
+            return None
+
+    def run(self):
+        while self.running:
+            if self.processes > 1:
+                # Wait for a free slot before taking more work off the queue
+                if not self.slots.acquire(timeout=self.block_timeout):
+                    continue
+                jobs = self.next_batch()
+                if jobs is None:
+                    self.slots.release()
+                    continue
+                self.submit_batch(jobs)
+            else:
+                jobs = self.next_batch()
+                if jobs is None:
+                    continue
+                count = self.process_batch(jobs)
+                logger.info("Probed %d websites", count)
+        self.executor.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--redis-url', default=os.environ.get('REDIS_URL', 'redis://localhost:6379/0'))
+    parser.add_argument('--concurrency', type=int, default=16, help="Probes in flight per process")
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                        help="Probe processes (default: one per CPU, 1 probes in this process)")
+    parser.add_argument('--max-body-bytes', type=int, default=DEFAULT_MAX_BODY_BYTES)
+    parser.add_argument('--log-level', default='INFO')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level, format='%(asctime)s %(name)s %(levelname)s %(message)s')
+
+    worker = ProbeWorker(
+        redis.Redis.from_url(args.redis_url),
+        concurrency=args.concurrency,
+        max_body_bytes=args.max_body_bytes,
+        processes=args.processes
+    )
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+
+
+if __name__ == '__main__':
+    main()
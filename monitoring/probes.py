@@ -0,0 +1,365 @@
+"""
+Probe helpers (HTTP and TLS)
+
+This module deliberately has no Django imports so it can be reused by
+probe processes that never load the ORM.
+"""
+import re
+import socket
+import ssl
+import time
+from datetime import datetime, timezone
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import PoolManager
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError
+from urllib3.util.connection import allowed_gai_family
+
+
+USER_AGENT = 'StatusMonitor/1.0'
+
+# Responses to HEAD that mean "try GET instead"
+HEAD_FALLBACK_STATUS_CODES = {405, 501}
+
+# Response time above which a healthy response counts as slow
+SLOW_THRESHOLD_MS = 3000
+
+# Phase timings are stored as smallints
+MAX_PHASE_MS = 32767
+
+TIMING_FIELDS = ('dns_time', 'connect_time', 'tls_time', 'ttfb', 'redirect_count', 'redirect_time')
+
+
+def elapsed_ms(started, finished):
+    return min(int(round((finished - started) * 1000)), MAX_PHASE_MS)
+
+
+class ProbeTimings:
+    """
+    Phase timings (ms) of the requests made by one probe
+
+    Filled in by the connections of a TimedAdapter. Every request is a hop
+    carrying the DNS, TCP connect and TLS handshake times of the connection
+    it opened (None when it reused a kept-alive one) and its time to first
+    byte, measured from the request being sent to the response headers.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.hops = []
+        self.pending = None
+
+    def resolving(self, started, resolved):
+        self.pending = {
+            'started': started, 'dns_time': elapsed_ms(started, resolved),
+            'connect_time': None, 'tls_time': None, 'ttfb': None, 'resolved': resolved
+        }
+
+    def connected(self, finished):
+        self.pending['connect_time'] = elapsed_ms(self.pending['resolved'], finished)
+        self.pending['connected'] = finished
+
+    def tls_established(self, finished):
+        self.pending['tls_time'] = elapsed_ms(self.pending['connected'], finished)
+
+    def request_sent(self, started, sent):
+        hop = self.pending or {'started': started, 'dns_time': None, 'connect_time': None, 'tls_time': None, 'ttfb': None}
+        hop['sent'] = sent
+        self.pending = None
+        self.hops.append(hop)
+
+    def response_received(self, received):
+        hop = self.hops[-1]
+        hop['ttfb'] = elapsed_ms(hop['sent'], received)
+
+    def result(self):
+        """
+        Timings of the last request, with the number of redirects followed
+        before it and the time they took; None if no request got as far as
+        a DNS lookup
+        """
+        hops = self.hops + ([self.pending] if self.pending else [])
+        if not hops:
+            return None
+        final = hops[-1]
+        redirect_count = len(hops) - 1
+        return {
+            'dns_time': final['dns_time'],
+            'connect_time': final['connect_time'],
+            'tls_time': final['tls_time'],
+            'ttfb': final['ttfb'],
+            'redirect_count': redirect_count,
+            'redirect_time': elapsed_ms(hops[0]['started'], final['started']) if redirect_count else None,
+        }
+
+
+class TimedConnectionMixin:
+    """Record connection phases and time to first byte into a ProbeTimings"""
+
+    def __init__(self, *args, timings, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timings = timings
+
+    def _new_conn(self):
+        # Resolve separately from connecting so the two can be timed apart
+        started = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(self._dns_host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        self.timings.resolving(started, time.perf_counter())
+
+        dns_host = self._dns_host
+        try:
+            for index, (*_, sockaddr) in enumerate(addresses):
+                self._dns_host = sockaddr[0]
+                try:
+                    sock = super()._new_conn()
+                    break
+                except ConnectTimeoutError:
+                    if index == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = dns_host
+        self.timings.connected(time.perf_counter())
+        return sock
+
+    def request(self, *args, **kwargs):
+        started = time.perf_counter()
+        super().request(*args, **kwargs)
+        self.timings.request_sent(started, time.perf_counter())
+
+    def getresponse(self):
+        response = super().getresponse()
+        self.timings.response_received(time.perf_counter())
+        return response
+
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+
+    def connect(self):
+        super().connect()
+        self.timings.tls_established(time.perf_counter())
+
+
+class TimedPoolManager(PoolManager):
+
+    def __init__(self, timings, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timings = timings
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        pool = super()._new_pool(scheme, host, port, request_context)
+        pool.ConnectionCls = TimedHTTPSConnection if scheme == 'https' else TimedHTTPConnection
+        pool.conn_kw['timings'] = self.timings
+        return pool
+
+
+class TimedAdapter(HTTPAdapter):
+    """requests transport adapter whose connections report into a ProbeTimings"""
+
+    def __init__(self, timings, **kwargs):
+        self.timings = timings
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = TimedPoolManager(
+            self.timings, num_pools=connections, maxsize=maxsize, block=block, **pool_kwargs
+        )
+
+
+def timed_session(timings):
+    session = requests.Session()
+    adapter = TimedAdapter(timings)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class ContentMatcher:
+    """
+    Incremental keyword or regex matcher over a streamed response body
+
+    Chunks are fed as they arrive; only a small tail of the previous chunk
+    is kept so a match straddling two chunks is still found. Regex matches
+    are looked for within windows of `regex_overlap` bytes across chunk
+    boundaries, so patterns matching longer spans may be missed.
+    """
+
+    def __init__(self, pattern, match_type='keyword', regex_overlap=1024):
+        self.match_type = match_type
+        if match_type == 'regex':
+            self.regex = re.compile(pattern.encode('utf-8'))
+            self.overlap = regex_overlap
+        else:
+            self.keyword = pattern.encode('utf-8')
+            self.overlap = max(len(self.keyword) - 1, 0)
+        self.tail = b''
+        self.matched = False
+
+    def feed(self, chunk):
+        """Consume a chunk of bytes, returning True once the content matched"""
+        if self.matched:
+            return True
+
+        window = self.tail + chunk
+        if self.match_type == 'regex':
+            self.matched = self.regex.search(window) is not None
+        else:
+            self.matched = self.keyword in window
+
+        self.tail = window[-self.overlap:] if self.overlap else b''
+        return self.matched
+
+
+def read_capped(response, max_bytes, matcher=None, chunk_size=8192):
+    """
+    Stream at most `max_bytes` of a `requests` response body
+
+    Reading stops as soon as the matcher is satisfied or the cap is hit;
+    the body is never held in memory as a whole. Returns the number of
+    bytes read.
+    """
+    read = 0
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        if not chunk:
+            continue
+        chunk = chunk[:max_bytes - read]
+        read += len(chunk)
+        if matcher is not None and matcher.feed(chunk):
+            break
+        if read >= max_bytes:
+            break
+    return read
+
+
+def check_content(response, expected_content, match_type, max_bytes):
+    """
+    Stream the body of a GET response (up to `max_bytes`) and return an
+    error message if the expected content was not found
+    """
+    matcher = ContentMatcher(expected_content, match_type)
+    read = read_capped(response, max_bytes, matcher)
+
+    if matcher.matched:
+        return None
+    return f"Content check failed: {expected_content!r} not found in first {read} bytes"
+
+
+def probe_url(url, timeout, method='head', expected_content='', content_match_type='keyword',
+              max_body_bytes=256 * 1024):
+    """
+    Probe a URL once and classify the outcome
+
+    Returns a dict with status ('online', 'slow', 'offline' or 'error'),
+    status_code, response_time (ms), error_message and timings (the
+    TIMING_FIELDS phase breakdown of the last request, or None).
+    """
+    timings = ProbeTimings()
+    session = timed_session(timings)
+    start_time = time.time()
+    status = 'offline'
+    status_code = None
+    response_time = None
+    error_message = None
+
+    request_kwargs = {
+        'timeout': timeout,
+        'headers': {'User-Agent': USER_AGENT},
+        'allow_redirects': True,
+    }
+
+    try:
+        # Make the request
+        if method == 'head':
+            response = session.head(url, **request_kwargs)
+            if response.status_code in HEAD_FALLBACK_STATUS_CODES:
+                # Server rejects HEAD, retry with a GET that reads no body
+                timings.reset()
+                response = session.get(url, stream=True, **request_kwargs)
+                response.close()
+        else:
+            response = session.get(url, stream=True, **request_kwargs)
+
+        response_time = int((time.time() - start_time) * 1000)  # Convert to milliseconds
+        status_code = response.status_code
+
+        if response.ok:
+            # Determine if it's slow or online
+            if response_time > SLOW_THRESHOLD_MS:
+                status = 'slow'
+            else:
+                status = 'online'
+        else:
+            status = 'offline'
+            error_message = f"HTTP {status_code}"
+
+        if method == 'get':
+            with response:
+                if response.ok and expected_content:
+                    error_message = check_content(response, expected_content, content_match_type, max_body_bytes)
+                    if error_message:
+                        status = 'offline'
+
+    except requests.exceptions.Timeout:
+        response_time = timeout * 1000  # Convert to milliseconds
+        status = 'offline'
+        error_message = "Request timeout"
+
+    except requests.exceptions.ConnectionError:
+        response_time = int((time.time() - start_time) * 1000)
+        status = 'offline'
+        error_message = "Connection failed"
+
+    except requests.exceptions.RequestException as e:
+        response_time = int((time.time() - start_time) * 1000)
+        status = 'error'
+        error_message = str(e)
+
+    finally:
+        session.close()
+
+    return {
+        'status': status,
+        'status_code': status_code,
+        'response_time': response_time,
+        'error_message': error_message,
+        'timings': timings.result(),
+    }
+
+
+def inspect_certificate(host, port=443, timeout=10):
+    """
+    Complete a TLS handshake with host:port and return the peer certificate
+
+    Returns a dict with subject, issuer, not_before and not_after (aware
+    UTC datetimes). Verification errors are raised as ssl.SSLError.
+    """
+    context = ssl.create_default_context()
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        with context.wrap_socket(sock, server_hostname=host) as tls:
+            cert = tls.getpeercert()
+
+    def name(field):
+        return ', '.join('='.join(pair) for rdn in cert.get(field, ()) for pair in rdn)
+
+    def when(field):
+        return datetime.fromtimestamp(ssl.cert_time_to_seconds(cert[field]), tz=timezone.utc)
+
+    return {
+        'subject': name('subject'),
+        'issuer': name('issuer'),
+        'not_before': when('notBefore'),
+        'not_after': when('notAfter'),
+    }
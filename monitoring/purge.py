@@ -0,0 +1,77 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import (
+    AlertNotification, Incident, NotificationDelivery, StatusCheck, StatusCheckCounter, UptimeAlert, Website
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def delete_in_chunks(queryset, deadline):
+    """
+    Delete a queryset's rows in PK-ordered chunks of WEBSITE_PURGE_CHUNK_SIZE
+
+    Every chunk is its own short transaction (autocommit) followed by a
+    WEBSITE_PURGE_THROTTLE pause, so row locks are held briefly and
+    replication and vacuum can keep up. Returns (deleted, finished); stops
+    early once `deadline` (a time.monotonic() value) has passed.
+    """
+    deleted = 0
+    while True:
+        chunk = list(queryset.order_by('pk').values_list('pk', flat=True)[:settings.WEBSITE_PURGE_CHUNK_SIZE])
+        if not chunk:
+            return deleted, True
+
+        deleted += queryset.model.objects.filter(pk__in=chunk).delete()[1].get(queryset.model._meta.label, 0)
+        if time.monotonic() >= deadline:
+            return deleted, False
+        time.sleep(settings.WEBSITE_PURGE_THROTTLE)
+
+
+def purge_deleted_websites():
+    """
+    Hard-delete websites soft-deleted more than WEBSITE_PURGE_GRACE seconds ago
+
+    Dependent rows go first, leaves of the cascade before their parents,
+    in small chunks; the website row itself is deleted last, once nothing
+    references it. A run stops after WEBSITE_PURGE_MAX_SECONDS and the next
+    run picks up where it left off. Returns (websites purged, rows deleted).
+    """
+    deadline = time.monotonic() + settings.WEBSITE_PURGE_MAX_SECONDS
+    cutoff = timezone.now() - timedelta(seconds=settings.WEBSITE_PURGE_GRACE)
+    website_ids = list(
+        Website.objects.filter(status='deleted', updated_at__lt=cutoff).order_by('pk').values_list('pk', flat=True)
+    )
+
+    purged = 0
+    rows = 0
+    for website_id in website_ids:
+        dependents = [
+            NotificationDelivery.objects.filter(notification__alert__website_id=website_id),
+            AlertNotification.objects.filter(alert__website_id=website_id),
+            UptimeAlert.objects.filter(website_id=website_id),
+            StatusCheck.objects.filter(website_id=website_id),
+            Incident.objects.filter(website_id=website_id),
+            StatusCheckCounter.objects.filter(website_id=website_id),
+        ]
+        for queryset in dependents:
+            deleted, finished = delete_in_chunks(queryset, deadline)
+            rows += deleted
+            if not finished:
+                return purged, rows
+
+        # Skip websites restored while their rows were being purged
+        deleted, _ = Website.objects.filter(pk=website_id, status='deleted').delete()
+        if deleted:
+            purged += 1
+            logger.info("Purged deleted website %s", website_id)
+        if time.monotonic() >= deadline:
+            break
+
+    return purged, rows
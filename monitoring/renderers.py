@@ -0,0 +1,28 @@
+from rest_framework.renderers import JSONRenderer
+
+from .hot_store import STATUSES
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    """
+    JSON renderer for the columnar check representation.
+
+    Selected with `?format=columnar` or `Accept: application/vnd.monitor.columnar+json`.
+    Views switch their status check payloads to parallel arrays (see
+    monitoring.serializers.columnar_checks) when this renderer is chosen.
+    Their status indexes refer to a single `statuses` legend added at the
+    top level of successful responses. Output is never indented, whatever
+    the Accept header asks for.
+    """
+
+    media_type = 'application/vnd.monitor.columnar+json'
+    format = 'columnar'
+
+    def get_indent(self, accepted_media_type, renderer_context):
+        return None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get('response')
+        if isinstance(data, dict) and not (response is not None and response.exception):
+            data = {'statuses': STATUSES, **data}
+        return super().render(data, accepted_media_type, renderer_context)
@@ -0,0 +1,240 @@
+import logging
+import math
+import time
+from datetime import datetime, timezone as dt_timezone
+
+import redis
+from django.db import DatabaseError, DataError, IntegrityError, close_old_connections, transaction
+
+from .dashboard import record_checks
+from .hot_store import remember
+from .models import StatusCheck, Website
+from .probe_worker import RESULT_STREAM, RESULT_STREAM_MAXLEN, decode_result
+from .probes import MAX_PHASE_MS, TIMING_FIELDS
+from .tasks import evaluate_alerts, update_current_status, update_incident
+
+
+WRITER_GROUP = 'writers'
+# Malformed results, and results the database rejects, are moved here with
+# their original entry ID and acknowledged
+DEAD_LETTER_STREAM = 'probe:results:dead'
+
+# Seconds to wait before retrying after a database error, doubled per failure
+MIN_BACKOFF = 1
+MAX_BACKOFF = 60
+
+logger = logging.getLogger(__name__)
+
+STATUSES = {value for value, _ in StatusCheck.STATUS_CHOICES}
+RESULT_KEY_LENGTH = StatusCheck._meta.get_field('result_key').max_length
+
+BIGINT_MAX = 2 ** 63 - 1
+INTEGER_MAX = 2 ** 31 - 1
+SMALLINT_MAX = 2 ** 15 - 1
+# Start of year 10000, past what datetime can represent
+MAX_TIMESTAMP = 253402300800
+
+# Errors that mean the database refused the data itself, not that it is unavailable
+REJECTED_ERRORS = (DataError, IntegrityError, TypeError, ValueError)
+
+
+def is_int(value, minimum, maximum):
+    return isinstance(value, int) and not isinstance(value, bool) and minimum <= value <= maximum
+
+
+def is_optional_int(value, maximum):
+    return value is None or is_int(value, 0, maximum)
+
+
+def is_valid_result(result):
+    """Whether a decoded result can be stored as a StatusCheck; optional fields may be missing"""
+    if not isinstance(result, dict):
+        return False
+    checked_at = result.get('checked_at')
+    error_message = result.get('error_message')
+    timings = result.get('timings') or {}
+    return (
+        isinstance(result.get('key'), str) and 0 < len(result['key']) <= RESULT_KEY_LENGTH
+        and is_int(result.get('website_id'), 1, BIGINT_MAX)
+        and isinstance(checked_at, (int, float)) and not isinstance(checked_at, bool)
+        and math.isfinite(checked_at) and 0 <= checked_at < MAX_TIMESTAMP
+        and isinstance(result.get('status'), str) and result['status'] in STATUSES
+        and is_optional_int(result.get('status_code'), SMALLINT_MAX)
+        and is_optional_int(result.get('response_time'), INTEGER_MAX)
+        and (error_message is None or (isinstance(error_message, str) and '\x00' not in error_message))
+        and isinstance(timings, dict) and set(timings) <= set(TIMING_FIELDS)
+        and all(is_optional_int(value, MAX_PHASE_MS) for value in timings.values())
+    )
+
+
+class ResultWriter:
+    """
+    Consumer-group reader that persists streamed probe results in batches
+
+    Entries are acknowledged only after their batch is committed, so a
+    crash or database stall leaves them pending; they are re-read by this
+    consumer or claimed by another one after `claim_idle` milliseconds.
+    Every result carries an idempotency key stored as
+    StatusCheck.result_key, which makes redelivered entries no-ops.
+    Malformed entries, and entries the database rejects when a failed
+    batch is retried one entry at a time, are moved to DEAD_LETTER_STREAM
+    and acknowledged once the rest of the batch is committed.
+    """
+
+    def __init__(self, client, consumer, batch_size=500, block=5000, claim_idle=60000):
+        self.client = client
+        self.consumer = consumer
+        self.batch_size = batch_size
+        self.block = block
+        self.claim_idle = claim_idle
+
+    def ensure_group(self):
+        try:
+            self.client.xgroup_create(RESULT_STREAM, WRITER_GROUP, id='0', mkstream=True)
+        except redis.ResponseError as exc:
+            if 'BUSYGROUP' not in str(exc):
+                raise
+
+    def read(self):
+        """Return the next batch of entries, reclaiming stale pending ones first"""
+        _, claimed, *_ = self.client.xautoclaim(
+            RESULT_STREAM, WRITER_GROUP, self.consumer,
+            min_idle_time=self.claim_idle, start_id='0-0', count=self.batch_size
+        )
+        if claimed:
+            return claimed
+
+        response = self.client.xreadgroup(
+            WRITER_GROUP, self.consumer, {RESULT_STREAM: '>'},
+            count=self.batch_size, block=self.block
+        )
+        return response[0][1] if response else []
+
+    def decode(self, entries):
+        """Split entries into (entry ID, fields, result) triples and malformed (entry ID, fields) pairs"""
+        results = []
+        malformed = []
+        for entry_id, fields in entries:
+            if not fields:
+                # Trimmed from the stream before it could be stored
+                continue
+            try:
+                result = decode_result(fields)
+            except (KeyError, ValueError):
+                result = None
+            if is_valid_result(result):
+                results.append((entry_id, fields, result))
+            else:
+                malformed.append((entry_id, fields))
+        return results, malformed
+
+    def store_batch(self, results):
+        """
+        Store decoded results in one transaction, or one entry at a time if
+        the database rejects the batch; returns the number of new checks and
+        the (entry ID, fields) pairs that could not be stored
+        """
+        try:
+            return self.store([result for _, _, result in results]), []
+        except REJECTED_ERRORS as exc:
+            logger.warning("Storing %d probe results one at a time: %s", len(results), exc)
+
+        stored = 0
+        rejected = []
+        for entry_id, fields, result in results:
+            try:
+                stored += self.store([result])
+            except REJECTED_ERRORS:
+                rejected.append((entry_id, fields))
+        return stored, rejected
+
+    def store(self, results):
+        """Persist a batch of decoded results; returns the number of new checks"""
+        # Drop results repeated within this batch
+        results = list({result['key']: result for result in reversed(results)}.values())
+
+        websites = Website.objects.filter(status='active').select_related('user').in_bulk(
+            {result['website_id'] for result in results}
+        )
+        checks = self.new_checks(results, websites)
+
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    StatusCheck.objects.bulk_create(checks)
+            except IntegrityError:
+                # Another writer claimed and stored some of these entries
+                # meanwhile; a second conflict sends the batch to store_batch's
+                # one-at-a-time retry
+                checks = self.new_checks(results, websites)
+                StatusCheck.objects.bulk_create(checks)
+            remember(checks)
+            update_current_status(checks)
+            record_checks(checks)
+            for status_check in checks:
+                update_incident(status_check.website, status_check)
+                evaluate_alerts(status_check)
+
+        return len(checks)
+
+    def new_checks(self, results, websites):
+        """Unsaved checks for the results not stored yet, oldest first"""
+        existing = set(
+            StatusCheck.objects.filter(
+                result_key__in=[result['key'] for result in results]
+            ).values_list('result_key', flat=True)
+        )
+        return [
+            StatusCheck(
+                website=websites[result['website_id']],
+                status=result['status'],
+                status_code=result.get('status_code'),
+                response_time=result.get('response_time'),
+                error_message=result.get('error_message'),
+                checked_at=datetime.fromtimestamp(result['checked_at'], tz=dt_timezone.utc),
+                result_key=result['key'],
+                **(result.get('timings') or {})
+            )
+            for result in sorted(results, key=lambda result: result['checked_at'])
+            if result['website_id'] in websites and result['key'] not in existing
+        ]
+
+    def dead_letter(self, entries):
+        if not entries:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        for entry_id, fields in entries:
+            logger.warning("Moving probe result %s to %s", entry_id, DEAD_LETTER_STREAM)
+            pipe.xadd(
+                DEAD_LETTER_STREAM, {**fields, 'entry_id': entry_id},
+                maxlen=RESULT_STREAM_MAXLEN, approximate=True
+            )
+        pipe.execute()
+
+    def run_once(self):
+        entries = self.read()
+        if not entries:
+            return 0
+        results, malformed = self.decode(entries)
+        stored, rejected = self.store_batch(results)
+        # Only after the commit, so a batch retried after a stall is dead-lettered once
+        self.dead_letter(malformed + rejected)
+        self.client.xack(RESULT_STREAM, WRITER_GROUP, *[entry_id for entry_id, _ in entries])
+        return stored
+
+    def run(self):
+        self.ensure_group()
+        backoff = MIN_BACKOFF
+        while True:
+            try:
+                stored = self.run_once()
+            except DatabaseError as exc:
+                # The batch stays pending and is reclaimed after claim_idle
+                logger.warning("Could not store probe results, retrying in %ds: %s", backoff, exc)
+                close_old_connections()
+                time.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+                continue
+            backoff = MIN_BACKOFF
+            if stored:
+                logger.info("Stored %d probe results", stored)
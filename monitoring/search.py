@@ -0,0 +1,107 @@
+"""
+Indexed website search
+
+WebsiteViewSet's ?search= matches name, URL and normalized host by
+substring. On PostgreSQL the icontains lookups built by DRF's SearchFilter
+compile to UPPER(column::text) LIKE UPPER(...), so the pg_trgm GIN index
+is built over those same expressions for the planner to use it; on
+SQLite (local development) the same terms are matched against an FTS5
+table with the trigram tokenizer, kept in step with monitoring_website by
+triggers.
+"""
+from django.db import connections
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import SearchFilter
+
+
+SEARCH_FIELDS = ['name', 'url', 'host']
+
+TRIGRAM_INDEX = 'monitoring_website_search_upper_trgm'
+FTS_TABLE = 'monitoring_website_fts'
+
+# The trigram tokenizer cannot match shorter terms
+MIN_FTS_TERM_LENGTH = 3
+
+SQLITE_INSTALL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, url, host, content='monitoring_website', content_rowid='id', tokenize='trigram'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON monitoring_website BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, url, host) VALUES (new.id, new.name, new.url, new.host);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON monitoring_website BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, url, host) VALUES ('delete', old.id, old.name, old.url, old.host);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name, url, host ON monitoring_website BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, url, host) VALUES ('delete', old.id, old.name, old.url, old.host);
+        INSERT INTO {FTS_TABLE}(rowid, name, url, host) VALUES (new.id, new.name, new.url, new.host);
+    END""",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+POSTGRESQL_INSTALL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"""CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} ON monitoring_website USING gin (
+        (UPPER(name::text)) gin_trgm_ops, (UPPER(url::text)) gin_trgm_ops, (UPPER(host::text)) gin_trgm_ops
+    )""",
+]
+
+POSTGRESQL_UNINSTALL = [
+    f"DROP INDEX IF EXISTS {TRIGRAM_INDEX}",
+]
+
+
+def _execute(connection, statements):
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def install_search_index(connection):
+    """
+    Create the search index for the connection's database; idempotent
+
+    SQLite drops a table's triggers whenever a migration rebuilds it, so
+    this also runs after every migrate there (see MonitoringConfig.ready).
+    Migrations keep their own frozen copies of these statements.
+    """
+    if connection.vendor == 'sqlite':
+        _execute(connection, SQLITE_INSTALL)
+    elif connection.vendor == 'postgresql':
+        _execute(connection, POSTGRESQL_INSTALL)
+
+
+def uninstall_search_index(connection):
+    if connection.vendor == 'sqlite':
+        _execute(connection, SQLITE_UNINSTALL)
+    elif connection.vendor == 'postgresql':
+        _execute(connection, POSTGRESQL_UNINSTALL)
+
+
+def fts_query(terms):
+    """FTS5 query matching rows that contain every term, in any column"""
+    return ' AND '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+class WebsiteSearchFilter(SearchFilter):
+    """SearchFilter that answers from the FTS5 table on SQLite"""
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if (
+            not terms
+            or connections[queryset.db].vendor != 'sqlite'
+            or any(len(term) < MIN_FTS_TERM_LENGTH for term in terms)
+        ):
+            return super().filter_queryset(request, queryset, view)
+
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [fts_query(terms)])
+        )
@@ -1,37 +1,165 @@
+import re
+from django.urls import reverse
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Website, StatusCheck, UptimeAlert, AlertNotification
+from .heartbeats import generate_token
+from .hot_store import STATUS_INDEX, load_recent_checks
+from .probes import TIMING_FIELDS
+from .models import (
+    Website, StatusCheck, Incident, UptimeAlert, AlertNotification, NotificationChannel,
+    TLSCertificate, StatusPage
+)
 
 
 class StatusCheckSerializer(serializers.ModelSerializer):
     """Serializer for StatusCheck model"""
     
+    timings = serializers.SerializerMethodField()
+    
     class Meta:
         model = StatusCheck
-        fields = ['id', 'status', 'status_code', 'response_time', 'error_message', 'checked_at']
+        fields = ['id', 'status', 'status_code', 'response_time', 'error_message', 'timings', 'checked_at']
         read_only_fields = ['id', 'checked_at']
+    
+    def get_timings(self, obj):
+        """Phase breakdown of the probe (ms), or None for checks recorded without one"""
+        timings = {field: getattr(obj, field) for field in TIMING_FIELDS}
+        if all(value is None for value in timings.values()):
+            return None
+        return timings
+
+
+COLUMNAR_FIELDS = ('id', 'checked_at', 'status', 'status_code', 'response_time', 'error_message', *TIMING_FIELDS)
+
+
+def columnar_checks(rows):
+    """
+    Pack rows of COLUMNAR_FIELDS values (id, checked_at, status,
+    status_code, response_time, error_message and the phase timings) into
+    parallel arrays, with epoch-second timestamps and status codes
+    indexing the `statuses` legend ColumnarJSONRenderer adds to the response
+    """
+    columns = {field: [] for field in COLUMNAR_FIELDS}
+    for check_id, checked_at, status, *values in rows:
+        columns['id'].append(check_id)
+        columns['checked_at'].append(int(checked_at.timestamp()))
+        columns['status'].append(STATUS_INDEX[status])
+        for field, value in zip(COLUMNAR_FIELDS[3:], values):
+            columns[field].append(value)
+    return columns
+
+
+def columnar_row(check):
+    """COLUMNAR_FIELDS values of a StatusCheck instance"""
+    return (
+        check.pk, check.checked_at, check.status, check.status_code, check.response_time,
+        check.error_message, *(getattr(check, field) for field in TIMING_FIELDS)
+    )
+
+
+def ping_url(serializer, website):
+    """Absolute ping URL of a heartbeat monitor"""
+    if website.monitor_type != 'heartbeat' or not website.heartbeat_token:
+        return None
+    path = reverse('heartbeat-ping', args=[website.heartbeat_token])
+    request = serializer.context.get('request')
+    return request.build_absolute_uri(path) if request else path
+
+
+def validate_content_check(instance, attrs):
+    """Validate content assertion settings of a website"""
+    def current(field):
+        return attrs.get(field, getattr(instance, field, Website._meta.get_field(field).get_default()))
+    
+    expected_content = current('expected_content')
+    if expected_content and current('check_method') != 'get':
+        raise serializers.ValidationError({'expected_content': "Content checks require the GET check method."})
+    if expected_content and current('content_match_type') == 'regex':
+        try:
+            re.compile(expected_content)
+        except re.error as exc:
+            raise serializers.ValidationError({'expected_content': f"Invalid regular expression: {exc}"})
+    return attrs
+
+
+class IncidentSerializer(serializers.ModelSerializer):
+    """Serializer for Incident model"""
+    
+    duration = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = Incident
+        fields = ['id', 'started_at', 'ended_at', 'cause', 'check_count', 'duration']
+        read_only_fields = fields
+    
+    def get_duration(self, obj):
+        """Outage duration in seconds"""
+        return int(obj.duration.total_seconds())
+
+
+class TLSCertificateSerializer(serializers.ModelSerializer):
+    """Serializer for TLSCertificate model"""
+    
+    days_remaining = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = TLSCertificate
+        fields = ['host', 'port', 'subject', 'issuer', 'not_before', 'not_after', 'days_remaining', 'error', 'checked_at']
+        read_only_fields = fields
+
+
+class WebsiteListSerializer(serializers.ListSerializer):
+    """Loads the recent checks of all listed websites in one batch"""
+    
+    def to_representation(self, data):
+        websites = list(data.all() if hasattr(data, 'all') else data)
+        load_recent_checks(websites)
+        return super().to_representation(websites)
 
 
 class WebsiteSerializer(serializers.ModelSerializer):
     """Serializer for Website model"""
     
-    latest_status_check = StatusCheckSerializer(read_only=True)
+    latest_status_check = serializers.SerializerMethodField()
     uptime_percentage = serializers.ReadOnlyField()
     recent_checks = serializers.SerializerMethodField()
+    ping_url = serializers.SerializerMethodField()
     
     class Meta:
         model = Website
         fields = [
-            'id', 'name', 'url', 'status', 'created_at', 'updated_at',
-            'check_interval', 'timeout', 'latest_status_check', 
-            'uptime_percentage', 'recent_checks'
+            'id', 'name', 'url', 'host', 'status', 'current_status', 'created_at', 'updated_at',
+            'check_interval', 'timeout', 'check_method', 'expected_content',
+            'content_match_type', 'monitor_type', 'heartbeat_grace', 'last_heartbeat_at',
+            'ping_url', 'latest_status_check', 'uptime_percentage', 'recent_checks'
+        ]
+        read_only_fields = [
+            'id', 'host', 'current_status', 'created_at', 'updated_at', 'monitor_type', 'last_heartbeat_at',
+            'latest_status_check', 'uptime_percentage'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'latest_status_check', 'uptime_percentage']
+        list_serializer_class = WebsiteListSerializer
+    
+    def validate(self, attrs):
+        return validate_content_check(self.instance, attrs)
+    
+    def get_latest_status_check(self, obj):
+        check = obj.latest_status_check
+        if check is None:
+            return None
+        if self.context.get('columnar'):
+            return columnar_checks([columnar_row(check)])
+        return StatusCheckSerializer(check).data
     
     def get_recent_checks(self, obj):
         """Get recent status checks for the website"""
-        recent_checks = obj.status_checks.order_by('-checked_at')[:10]
+        recent_checks = obj.recent_status_checks[:10]
+        if self.context.get('columnar'):
+            return columnar_checks(map(columnar_row, recent_checks))
         return StatusCheckSerializer(recent_checks, many=True).data
     
+    def get_ping_url(self, obj):
+        return ping_url(self, obj)
+    
     def create(self, validated_data):
         """Create a new website and associate it with the current user"""
         validated_data['user'] = self.context['request'].user
@@ -41,15 +169,58 @@ class WebsiteSerializer(serializers.ModelSerializer):
 class WebsiteCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating new websites"""
     
+    ping_url = serializers.SerializerMethodField()
+    
     class Meta:
         model = Website
-        fields = ['name', 'url', 'check_interval', 'timeout']
+        fields = [
+            'id', 'name', 'url', 'check_interval', 'timeout',
+            'check_method', 'expected_content', 'content_match_type',
+            'monitor_type', 'heartbeat_grace', 'ping_url'
+        ]
+        read_only_fields = ['id']
+        # Heartbeat monitors get their ping URL as url
+        extra_kwargs = {'url': {'required': False}}
+    
+    def validate(self, attrs):
+        if attrs.get('monitor_type', 'http') == 'http' and not attrs.get('url'):
+            raise serializers.ValidationError({'url': "This field is required."})
+        return validate_content_check(self.instance, attrs)
+    
+    def get_ping_url(self, obj):
+        return ping_url(self, obj)
     
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
+        if validated_data.get('monitor_type') == 'heartbeat':
+            validated_data['heartbeat_token'] = generate_token()
+            validated_data['url'] = self.context['request'].build_absolute_uri(
+                reverse('heartbeat-ping', args=[validated_data['heartbeat_token']])
+            )
         return super().create(validated_data)
 
 
+class WebsiteImportRowSerializer(serializers.Serializer):
+    """
+    Serializer for a single row of a bulk website import.
+
+    Validation is purely syntactic so a whole batch can be checked without
+    touching the database; (user, url) conflicts are resolved in one query
+    by the bulk import view.
+    """
+    
+    name = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    url = serializers.URLField(max_length=200)
+    check_interval = serializers.IntegerField(min_value=1, required=False)
+    timeout = serializers.IntegerField(min_value=1, required=False)
+    
+    def validate(self, attrs):
+        """Default the display name to the URL"""
+        if not attrs.get('name'):
+            attrs['name'] = attrs['url'][:255]
+        return attrs
+
+
 class UptimeAlertSerializer(serializers.ModelSerializer):
     """Serializer for UptimeAlert model"""
     
@@ -78,6 +249,58 @@ class AlertNotificationSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'sent_at']
 
 
+class NotificationChannelSerializer(serializers.ModelSerializer):
+    """Serializer for NotificationChannel model"""
+    
+    class Meta:
+        model = NotificationChannel
+        fields = ['id', 'channel_type', 'target', 'is_active', 'created_at']
+        read_only_fields = ['id', 'created_at']
+    
+    def validate(self, attrs):
+        """Validate the target against the channel type"""
+        channel_type = attrs.get('channel_type', getattr(self.instance, 'channel_type', None))
+        target = attrs.get('target', getattr(self.instance, 'target', None))
+        field = serializers.EmailField() if channel_type == 'email' else serializers.URLField()
+        try:
+            field.run_validation(target)
+        except serializers.ValidationError as exc:
+            raise serializers.ValidationError({'target': exc.detail})
+        return attrs
+    
+    def create(self, validated_data):
+        validated_data['user'] = self.context['request'].user
+        return super().create(validated_data)
+
+
+class StatusPageSerializer(serializers.ModelSerializer):
+    """Serializer for StatusPage model"""
+    
+    public_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = StatusPage
+        fields = ['id', 'slug', 'title', 'websites', 'is_public', 'public_url', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_at', 'updated_at']
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is not None:
+            # Only the user's own websites can be put on a page
+            fields['websites'].child_relation.queryset = Website.objects.filter(user=request.user, status='active')
+        return fields
+    
+    def get_public_url(self, obj):
+        path = reverse('status-page', args=[obj.slug])
+        request = self.context.get('request')
+        return request.build_absolute_uri(path) if request else path
+    
+    def create(self, validated_data):
+        validated_data['user'] = self.context['request'].user
+        return super().create(validated_data)
+
+
 class WebsiteStatusHistorySerializer(serializers.Serializer):
     """Serializer for website status history"""
     
@@ -101,4 +324,33 @@ class DashboardStatsSerializer(serializers.Serializer):
     offline_websites = serializers.IntegerField()
     average_response_time = serializers.FloatField()
     average_uptime = serializers.FloatField()
-    alerts_last_24h = serializers.IntegerField()
\ No newline at end of file
+    alerts_last_24h = serializers.IntegerField()
+
+
+class SLAReportSerializer(serializers.Serializer):
+    """Serializer for SLA figures of a website over a window"""
+    
+    website_id = serializers.IntegerField()
+    website_name = serializers.CharField()
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+    total_checks = serializers.IntegerField()
+    up_checks = serializers.IntegerField()
+    uptime_percentage = serializers.FloatField(allow_null=True)
+    average_response_time = serializers.FloatField(allow_null=True)
+
+
+class SLAWindowSerializer(serializers.Serializer):
+    """Serializer for the [start, end) window of an SLA report"""
+    
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+    
+    def validate(self, attrs):
+        """Default to the current month up to now"""
+        now = timezone.now()
+        attrs.setdefault('end', now)
+        attrs.setdefault('start', now.replace(day=1, hour=0, minute=0, second=0, microsecond=0))
+        if attrs['start'] >= attrs['end']:
+            raise serializers.ValidationError("start must be before end")
+        return attrs
\ No newline at end of file
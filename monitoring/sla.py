@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+
+from .models import Incident, StatusCheck, StatusCheckCounter, Website
+
+
+COUNTER_FIELDS = ['checks', 'up_checks', 'response_time_total', 'response_time_count']
+
+
+def bucket_size():
+    return timedelta(seconds=settings.SLA_COUNTER_BUCKET)
+
+
+def floor_to_bucket(moment):
+    """Round a datetime down to the nearest counter boundary"""
+    epoch = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+    size = bucket_size()
+    return epoch + ((moment - epoch) // size) * size
+
+
+def counters_at(website_ids, boundary):
+    """
+    Return {website_id: {field: total}} with the cumulative totals at a boundary
+
+    Uses the latest counter row at or before the boundary for each website,
+    fetched in a single query. Websites without rows are left out.
+    """
+    latest = StatusCheckCounter.objects.filter(
+        website=OuterRef('pk'),
+        boundary__lte=boundary
+    ).order_by('-boundary').values('pk')[:1]
+
+    rows = StatusCheckCounter.objects.filter(
+        pk__in=Website.objects.filter(pk__in=website_ids).annotate(
+            counter_id=Subquery(latest)
+        ).values('counter_id')
+    ).values('website_id', *COUNTER_FIELDS)
+
+    return {row.pop('website_id'): row for row in rows}
+
+
+def build_reports(websites, start, end):
+    """
+    Build SLA figures for each website over [start, end)
+
+    Both ends are floored to a counter boundary, so the answer costs two
+    lookups regardless of the window length.
+    """
+    start = floor_to_bucket(start)
+    end = floor_to_bucket(end)
+    website_ids = [website.id for website in websites]
+
+    empty = dict.fromkeys(COUNTER_FIELDS, 0)
+    at_start = counters_at(website_ids, start)
+    at_end = counters_at(website_ids, end)
+
+    reports = []
+    for website in websites:
+        before = at_start.get(website.id, empty)
+        after = at_end.get(website.id, empty)
+        totals = {field: after[field] - before[field] for field in COUNTER_FIELDS}
+
+        checks = totals['checks']
+        response_time_count = totals['response_time_count']
+        reports.append({
+            'website_id': website.id,
+            'website_name': website.name,
+            'start': start,
+            'end': end,
+            'total_checks': checks,
+            'up_checks': totals['up_checks'],
+            'uptime_percentage': (totals['up_checks'] / checks * 100) if checks else None,
+            'average_response_time': (
+                totals['response_time_total'] / response_time_count
+            ) if response_time_count else None,
+        })
+    return reports
+
+
+def rollup_bucket(boundary):
+    """
+    Write cumulative counter rows at `boundary` for websites checked in the
+    bucket that ends there
+
+    The bucket is aggregated with one grouped query and added on top of
+    each website's previous totals. Rows already at `boundary` are
+    overwritten, so a bucket can be rolled up again once late checks have
+    been stored. Returns the number of rows written.
+    """
+    bucket_start = boundary - bucket_size()
+    aggregates = StatusCheck.objects.filter(
+        checked_at__gte=bucket_start,
+        checked_at__lt=boundary
+    ).order_by().values('website_id').annotate(
+        checks=Count('id'),
+        up_checks=Count('id', filter=~Q(status__in=Incident.DOWN_STATUSES)),
+        response_time_total=Sum('response_time'),
+        response_time_count=Count('response_time'),
+    )
+    aggregates = {row.pop('website_id'): row for row in aggregates}
+    if not aggregates:
+        return 0
+
+    previous = counters_at(list(aggregates), bucket_start)
+    empty = dict.fromkeys(COUNTER_FIELDS, 0)
+
+    counters = []
+    for website_id, bucket in aggregates.items():
+        base = previous.get(website_id, empty)
+        counters.append(StatusCheckCounter(
+            website_id=website_id,
+            boundary=boundary,
+            **{field: base[field] + (bucket[field] or 0) for field in COUNTER_FIELDS}
+        ))
+
+    with transaction.atomic():
+        StatusCheckCounter.objects.bulk_create(
+            counters, batch_size=1000, update_conflicts=True,
+            unique_fields=['website', 'boundary'], update_fields=COUNTER_FIELDS
+        )
+    return len(counters)
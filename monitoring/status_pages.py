@@ -0,0 +1,179 @@
+"""
+Public status pages
+
+A page's snapshot (overall and per-website status, daily uptime bars and
+active incidents) is built and serialized to JSON ahead of time: when a
+website on the page opens or closes an incident, when the page is edited,
+and hourly so the uptime bars roll over. The rendered bytes and their ETag
+go into the cache and, when STATUS_PAGE_ROOT is set, into a static
+<slug>.json file that a web server or CDN can serve directly.
+
+Serving a page is a single cache read; the database is only consulted
+when a snapshot is missing from the cache.
+"""
+import json
+from datetime import datetime, time as dt_time, timedelta, timezone as dt_timezone
+from hashlib import blake2b
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils import timezone
+
+from .hot_store import load_recent_checks
+from .models import Incident, StatusPage
+
+
+CACHE_PREFIX = 'status-page:'
+
+# Cached for unknown slugs, so probing random page names stays off the database
+MISSING = {'missing': True}
+
+
+def cache_key(slug):
+    return f'{CACHE_PREFIX}{slug}'
+
+
+def daily_uptime(websites, days, now):
+    """
+    Return {website_id: [uptime percentage per day]} for the last `days`
+    UTC days, oldest first; days before a website existed are None
+    """
+    first_day = datetime.combine(now.date(), dt_time.min, tzinfo=dt_timezone.utc) - timedelta(days=days - 1)
+    downtime = {website.id: [timedelta(0)] * days for website in websites}
+
+    incidents = Incident.objects.filter(
+        website__in=websites, started_at__lt=now
+    ).filter(
+        Q(ended_at__isnull=True) | Q(ended_at__gt=first_day)
+    ).values_list('website_id', 'started_at', 'ended_at')
+
+    for website_id, started_at, ended_at in incidents:
+        started_at = max(started_at, first_day)
+        ended_at = min(ended_at or now, now)
+        day = (started_at - first_day).days
+        while day < days and first_day + timedelta(days=day) < ended_at:
+            day_start = first_day + timedelta(days=day)
+            overlap = min(ended_at, day_start + timedelta(days=1)) - max(started_at, day_start)
+            downtime[website_id][day] += overlap
+            day += 1
+
+    bars = {}
+    for website in websites:
+        bars[website.id] = []
+        for day in range(days):
+            day_start = max(first_day + timedelta(days=day), website.created_at)
+            day_end = min(first_day + timedelta(days=day + 1), now)
+            if day_end <= day_start:
+                bars[website.id].append(None)
+                continue
+            uptime = 1 - downtime[website.id][day] / (day_end - day_start)
+            bars[website.id].append(round(max(0.0, uptime) * 100, 3))
+    return bars
+
+
+def build_snapshot(page, now=None):
+    """Return the public snapshot of a status page as a JSON-serializable dict"""
+    now = now or timezone.now()
+    websites = list(page.websites.filter(status='active').order_by('name'))
+    load_recent_checks(websites)
+
+    days = settings.STATUS_PAGE_DAYS
+    bars = daily_uptime(websites, days, now)
+    first_day = now.date() - timedelta(days=days - 1)
+
+    open_incidents = {
+        incident.website_id: incident
+        for incident in Incident.objects.filter(website__in=websites, ended_at__isnull=True)
+    }
+
+    entries = []
+    for website in websites:
+        latest = website.latest_status_check
+        if website.id in open_incidents:
+            status = 'down'
+        elif latest is None:
+            status = 'unknown'
+        elif latest.status == 'slow':
+            status = 'degraded'
+        else:
+            status = 'operational'
+        known = [uptime for uptime in bars[website.id] if uptime is not None]
+        entries.append({
+            'name': website.name,
+            'status': status,
+            'uptime': round(sum(known) / len(known), 3) if known else None,
+            'daily_uptime': bars[website.id],
+        })
+
+    down = sum(1 for entry in entries if entry['status'] == 'down')
+    if down and down == len(entries):
+        overall = 'major_outage'
+    elif down:
+        overall = 'partial_outage'
+    elif any(entry['status'] == 'degraded' for entry in entries):
+        overall = 'degraded'
+    else:
+        overall = 'operational'
+
+    names = {website.id: website.name for website in websites}
+    return {
+        'title': page.title,
+        'slug': page.slug,
+        'status': overall,
+        'generated_at': now,
+        'first_day': first_day,
+        'websites': entries,
+        'incidents': [
+            {'website': names[website_id], 'started_at': incident.started_at}
+            for website_id, incident in sorted(open_incidents.items(), key=lambda item: item[1].started_at)
+        ],
+    }
+
+
+def render(page):
+    """Pre-render a page into the cache (and the static directory); returns the cached entry"""
+    body = json.dumps(build_snapshot(page), cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+    rendered = {'body': body, 'etag': f'"{blake2b(body, digest_size=16).hexdigest()}"'}
+    cache.set(cache_key(page.slug), rendered, settings.STATUS_PAGE_CACHE_TIMEOUT)
+
+    if settings.STATUS_PAGE_ROOT:
+        root = Path(settings.STATUS_PAGE_ROOT)
+        root.mkdir(parents=True, exist_ok=True)
+        temporary = root / f'.{page.slug}.json.tmp'
+        temporary.write_bytes(body)
+        temporary.replace(root / f'{page.slug}.json')
+    return rendered
+
+
+def render_pages(pages):
+    count = 0
+    for page in pages:
+        render(page)
+        count += 1
+    return count
+
+
+def render_pages_for_websites(website_ids):
+    """Re-render every public page showing one of the websites"""
+    return render_pages(StatusPage.objects.filter(websites__in=website_ids, is_public=True).distinct())
+
+
+def unpublish(slug):
+    cache.delete(cache_key(slug))
+    if settings.STATUS_PAGE_ROOT:
+        (Path(settings.STATUS_PAGE_ROOT) / f'{slug}.json').unlink(missing_ok=True)
+
+
+def get_rendered(slug):
+    """Return the pre-rendered page for a slug, rendering it on a cache miss; None if there is no such page"""
+    rendered = cache.get(cache_key(slug))
+    if rendered is None:
+        page = StatusPage.objects.filter(slug=slug, is_public=True).first()
+        if page is None:
+            cache.set(cache_key(slug), MISSING, 60)
+            return None
+        rendered = render(page)
+    return None if rendered.get('missing') else rendered
@@ -1,183 +1,416 @@
-import requests
-import time
-from celery import shared_task
+from collections import defaultdict
+
+import redis
+from celery import group, shared_task
 from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from django.utils import timezone
-from .models import Website, StatusCheck
+from datetime import timedelta
+from django.db.models import F, Max, Min, OuterRef, Subquery
+from .models import Website, StatusCheck, Incident, StatusCheckCounter
+from .anomalies import detect_anomalies
+from .certificates import refresh_certificates, send_certificate_alerts
+from .dashboard import reconcile_aggregates, record_alerts, record_checks
+from .heartbeats import flush_pings, heartbeat_result
+from .hot_store import remember
+from .notifications import create_deliveries, deliver_pending
+from .probe_worker import WORK_QUEUE, encode_batch, publish_results, with_result_metadata
+from .probes import probe_url
+from .purge import purge_deleted_websites
+from .sla import bucket_size, floor_to_bucket, rollup_bucket
+from .status_pages import render_pages, render_pages_for_websites
 
 
-@shared_task
+@shared_task(ignore_result=True)
 def check_website_status(website_id):
     """
     Celery task to check the status of a website
     """
     try:
-        website = Website.objects.get(id=website_id, status='active')
+        website = Website.objects.get(id=website_id, status='active', monitor_type='http')
     except Website.DoesNotExist:
         return f"Website with id {website_id} not found or not active"
     
-    start_time = time.time()
-    status = 'offline'
-    status_code = None
-    response_time = None
-    error_message = None
-    
-    try:
-        # Make the request
-        response = requests.head(
-            website.url,
-            timeout=website.timeout,
-            headers={'User-Agent': 'StatusMonitor/1.0'},
-            allow_redirects=True
-        )
-        
-        response_time = int((time.time() - start_time) * 1000)  # Convert to milliseconds
-        status_code = response.status_code
-        
-        if response.ok:
-            # Determine if it's slow or online
-            if response_time > 3000:  # 3 seconds threshold
-                status = 'slow'
-            else:
-                status = 'online'
-        else:
-            status = 'offline'
-            error_message = f"HTTP {status_code}"
-            
-    except requests.exceptions.Timeout:
-        response_time = website.timeout * 1000  # Convert to milliseconds
-        status = 'offline'
-        error_message = "Request timeout"
-        
-    except requests.exceptions.ConnectionError:
-        response_time = int((time.time() - start_time) * 1000)
-        status = 'offline'
-        error_message = "Connection failed"
-        
-    except requests.exceptions.RequestException as e:
-        response_time = int((time.time() - start_time) * 1000)
-        status = 'error'
-        error_message = str(e)
+    result = probe_url(
+        website.url,
+        website.timeout,
+        method=website.check_method,
+        expected_content=website.expected_content,
+        content_match_type=website.content_match_type,
+        max_body_bytes=settings.WEBSITE_CHECK_MAX_BODY_BYTES
+    )
+    if settings.PROBE_RESULT_PIPELINE == 'stream':
+        # Leave persistence to the stream writers (manage.py persist_probe_results)
+        publish_results(get_redis(), [with_result_metadata(dict(result), website.id)])
+    else:
+        record_status_check(website, result)
     
+    return {
+        'website_id': website.id,
+        'website_name': website.name,
+        **result
+    }
+
+
+def record_status_check(website, result):
+    """
+    Persist a probe result and run the follow-up bookkeeping
+    (incident tracking and alert evaluation)
+    """
     # Save the status check result
     status_check = StatusCheck.objects.create(
         website=website,
-        status=status,
-        status_code=status_code,
-        response_time=response_time,
-        error_message=error_message
+        status=result['status'],
+        status_code=result['status_code'],
+        response_time=result['response_time'],
+        error_message=result['error_message'],
+        checked_at=result.get('checked_at') or timezone.now(),
+        **(result.get('timings') or {})
     )
+    remember([status_check])
+    
+    update_current_status([status_check])
+    record_checks([status_check])
+    update_incident(website, status_check)
     
     # Check if we need to send alerts
     check_and_send_alerts.delay(status_check.id)
     
-    return {
-        'website_id': website.id,
-        'website_name': website.name,
-        'status': status,
-        'response_time': response_time,
-        'status_code': status_code,
-        'error_message': error_message
-    }
+    return status_check
 
 
-@shared_task
+def update_current_status(checks):
+    """
+    Copy the status of each website's newest check in `checks` onto
+    Website.current_status, with one UPDATE per status that only touches
+    websites whose status actually changed, and re-render their status pages
+    """
+    latest = {}
+    for status_check in sorted(checks, key=lambda status_check: status_check.checked_at):
+        latest[status_check.website_id] = status_check.status
+    
+    website_ids_by_status = defaultdict(list)
+    for website_id, check_status in latest.items():
+        website_ids_by_status[check_status].append(website_id)
+    changed = []
+    for check_status, website_ids in website_ids_by_status.items():
+        website_ids = list(
+            Website.objects.filter(pk__in=website_ids).exclude(current_status=check_status).values_list('pk', flat=True)
+        )
+        if website_ids:
+            Website.objects.filter(pk__in=website_ids).update(current_status=check_status)
+            changed.extend(website_ids)
+    if changed:
+        status_changed(changed)
+
+
+def update_incident(website, status_check):
+    """
+    Open, extend or close the website's incident for a new status check
+    Consecutive failed checks collapse into one Incident row; the first
+    healthy check after them closes it
+    """
+    is_down = status_check.status in Incident.DOWN_STATUSES
+    with transaction.atomic():
+        # Serialize concurrent checks of the website so only one of them
+        # can open its incident
+        Website.objects.select_for_update().filter(pk=website.pk).exists()
+        open_incident = Incident.objects.filter(website=website, ended_at__isnull=True).first()
+
+        if is_down and open_incident is None:
+            incident = Incident.objects.create(
+                website=website,
+                started_at=status_check.checked_at,
+                cause=status_check.error_message or status_check.status
+            )
+            status_changed([website.id])
+            return incident
+        if is_down:
+            Incident.objects.filter(pk=open_incident.pk).update(check_count=F('check_count') + 1)
+        elif open_incident is not None:
+            open_incident.ended_at = status_check.checked_at
+            open_incident.save(update_fields=['ended_at'])
+            status_changed([website.id])
+        return open_incident
+
+
+def status_changed(website_ids):
+    """Re-render the websites' status pages once the change is committed"""
+    transaction.on_commit(lambda: render_status_pages.delay(website_ids))
+
+
+@shared_task(ignore_result=True)
+def reconcile_dashboards():
+    """Rebuild live dashboard aggregates from the database to correct drift"""
+    return reconcile_aggregates()
+
+
+@shared_task(ignore_result=True)
+def render_status_pages(website_ids=None):
+    """
+    Pre-render public status pages showing the given websites, or all
+    public pages (hourly, so the daily uptime bars roll over)
+    """
+    if website_ids is None:
+        from .models import StatusPage
+        return render_pages(StatusPage.objects.filter(is_public=True))
+    return render_pages_for_websites(website_ids)
+
+
+def dispatch_website_checks(websites):
+    """
+    Send status checks for the given websites
+    
+    With PROBE_BACKEND 'celery' the checks go out as a single Celery group;
+    the probe tasks ignore their results, so only the compact group ID is
+    handed back. With 'redis' the websites are pushed as job batches for
+    the standalone probe workers (see monitoring.probe_worker) and no ID
+    is returned. Heartbeat monitors are skipped, they are never probed.
+    """
+    websites = websites.filter(monitor_type='http')
+    if settings.PROBE_BACKEND == 'redis':
+        return None, publish_probe_jobs(websites)
+    
+    website_ids = list(websites.values_list('id', flat=True).iterator())
+    if not website_ids:
+        return None, 0
+    
+    result = group(check_website_status.s(website_id) for website_id in website_ids).apply_async()
+    return result.id, len(website_ids)
+
+
+def publish_probe_jobs(websites):
+    """Push websites to the probe work queue in batches of PROBE_BATCH_SIZE"""
+    jobs = websites.values(
+        'id', 'url', 'timeout', 'expected_content', 'content_match_type', method=F('check_method')
+    ).order_by()
+    
+    client = get_redis()
+    pipe = client.pipeline(transaction=False)
+    total = 0
+    batch = []
+    for job in jobs.iterator():
+        batch.append(job)
+        if len(batch) >= settings.PROBE_BATCH_SIZE:
+            pipe.lpush(WORK_QUEUE, encode_batch(batch))
+            total += len(batch)
+            batch = []
+    if batch:
+        pipe.lpush(WORK_QUEUE, encode_batch(batch))
+        total += len(batch)
+    pipe.execute()
+    return total
+
+
+def get_redis():
+    """Return a raw Redis client for the work queue and result stream"""
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+@shared_task(ignore_result=True)
 def check_all_websites():
     """
     Celery task to check all active websites
     """
-    active_websites = Website.objects.filter(status='active')
-    results = []
-    
-    for website in active_websites:
-        task = check_website_status.delay(website.id)
-        results.append({
-            'website_id': website.id,
-            'website_name': website.name,
-            'task_id': task.id
-        })
+    group_id, total = dispatch_website_checks(Website.objects.filter(status='active'))
     
     return {
-        'message': f'Initiated checks for {len(results)} websites',
-        'results': results
+        'message': f'Initiated checks for {total} websites',
+        'group_id': group_id
     }
 
 
-@shared_task
+@shared_task(ignore_result=True)
+def schedule_initial_checks(website_ids, spread=None):
+    """
+    Schedule the first status check for newly created websites
+    Checks are staggered evenly over `spread` seconds so a large import
+    does not hit the workers (or the monitored hosts) all at once
+    """
+    if spread is None:
+        spread = settings.WEBSITE_BULK_IMPORT_STAGGER
+    
+    total = len(website_ids)
+    for index, website_id in enumerate(website_ids):
+        countdown = (index * spread) / total if total else 0
+        check_website_status.apply_async((website_id,), countdown=countdown)
+    
+    return f"Scheduled initial checks for {total} websites over {spread}s"
+
+
+def format_duration(duration):
+    """Format a timedelta as a short human readable string, e.g. '1h 5m'"""
+    seconds = int(duration.total_seconds())
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f"{hours}h {minutes}m"
+    if minutes:
+        return f"{minutes}m {seconds}s"
+    return f"{seconds}s"
+
+
+@shared_task(ignore_result=True)
 def check_and_send_alerts(status_check_id):
     """
     Check if any alerts should be triggered based on the status check
     """
     try:
-        from .models import StatusCheck, UptimeAlert, AlertNotification
-        
-        status_check = StatusCheck.objects.get(id=status_check_id)
-        website = status_check.website
-        
-        # Get active alerts for this website
-        alerts = UptimeAlert.objects.filter(website=website, is_active=True)
+        status_check = StatusCheck.objects.select_related('website__user').get(id=status_check_id)
+    except StatusCheck.DoesNotExist:
+        return f"StatusCheck with id {status_check_id} not found"
+    
+    notifications_sent = evaluate_alerts(status_check)
+    
+    return {
+        'status_check_id': status_check_id,
+        'notifications_sent': len(notifications_sent),
+        'details': notifications_sent
+    }
+
+
+def evaluate_alerts(status_check):
+    """
+    Create notifications for the website's alerts triggered by a status check
+    and queue their delivery; returns a summary of what was created
+    """
+    from .models import UptimeAlert, AlertNotification
+    
+    website = status_check.website
+    
+    # Incident closed by this check, if the website just recovered
+    resolved_incident = Incident.objects.filter(
+        website=website,
+        ended_at=status_check.checked_at
+    ).first()
+    
+    # Get active alerts for this website
+    alerts = UptimeAlert.objects.filter(website=website, is_active=True)
+    
+    notifications_sent = []
+    created_notifications = []
+    
+    for alert in alerts:
+        should_send = False
         
-        notifications_sent = []
+        if alert.alert_type == 'down' and status_check.status in Incident.DOWN_STATUSES:
+            should_send = True
+        elif alert.alert_type == 'slow' and status_check.response_time and status_check.response_time > alert.threshold:
+            should_send = True
+        elif alert.alert_type == 'up' and status_check.status == 'online':
+            # Only send 'up' alert if this check ended an outage
+            if resolved_incident is not None:
+                should_send = True
         
-        for alert in alerts:
-            should_send = False
+        if should_send:
+            # Create alert notification
+            message = f"Alert for {website.name}: {alert.get_alert_type_display()}"
+            if alert.alert_type == 'down':
+                message += f" - Status: {status_check.status}"
+                if status_check.error_message:
+                    message += f" - Error: {status_check.error_message}"
+            elif alert.alert_type == 'slow':
+                message += f" - Response time: {status_check.response_time}ms (threshold: {alert.threshold}ms)"
+            elif alert.alert_type == 'up':
+                message += f" - Website is back online"
+                message += f" after {format_duration(resolved_incident.duration)}"
             
-            if alert.alert_type == 'down' and status_check.status in ['offline', 'error']:
-                should_send = True
-            elif alert.alert_type == 'slow' and status_check.response_time and status_check.response_time > alert.threshold:
-                should_send = True
-            elif alert.alert_type == 'up' and status_check.status == 'online':
-                # Only send 'up' alert if the previous status was down
-                previous_check = StatusCheck.objects.filter(
-                    website=website,
-                    checked_at__lt=status_check.checked_at
-                ).order_by('-checked_at').first()
-                
-                if previous_check and previous_check.status in ['offline', 'error']:
-                    should_send = True
+            notification = AlertNotification.objects.create(
+                alert=alert,
+                status_check=status_check,
+                message=message
+            )
+            created_notifications.append(notification)
             
-            if should_send:
-                # Create alert notification
-                message = f"Alert for {website.name}: {alert.get_alert_type_display()}"
-                if alert.alert_type == 'down':
-                    message += f" - Status: {status_check.status}"
-                    if status_check.error_message:
-                        message += f" - Error: {status_check.error_message}"
-                elif alert.alert_type == 'slow':
-                    message += f" - Response time: {status_check.response_time}ms (threshold: {alert.threshold}ms)"
-                elif alert.alert_type == 'up':
-                    message += f" - Website is back online"
-                
-                notification = AlertNotification.objects.create(
-                    alert=alert,
-                    status_check=status_check,
-                    message=message
-                )
-                
-                notifications_sent.append({
-                    'alert_type': alert.alert_type,
-                    'message': message
-                })
-        
-        return {
-            'status_check_id': status_check_id,
-            'notifications_sent': len(notifications_sent),
-            'details': notifications_sent
-        }
-        
-    except StatusCheck.DoesNotExist:
-        return f"StatusCheck with id {status_check_id} not found"
+            notifications_sent.append({
+                'alert_type': alert.alert_type,
+                'message': message
+            })
+    
+    # Queue outbound delivery; sending happens in batched digests
+    if created_notifications:
+        create_deliveries(website.user, created_notifications)
+        record_alerts(website.user_id, created_notifications)
+    
+    return notifications_sent
+
+
+@shared_task
+def deliver_notifications():
+    """
+    Send queued notification deliveries as per-recipient digests
+    Runs once per digest window; a cache lock keeps runs from overlapping
+    """
+    lock_key = 'monitoring:deliver-notifications:lock'
+    if not cache.add(lock_key, 1, settings.NOTIFICATION_DIGEST_WINDOW * 5):
+        return "Delivery already in progress"
+    
+    try:
+        sent, failed = deliver_pending(limit=settings.NOTIFICATION_BATCH_SIZE)
+    finally:
+        cache.delete(lock_key)
+    
+    return f"Sent {sent} digests, {failed} failed"
+
+
+@shared_task
+def check_certificates():
+    """
+    Low-frequency TLS certificate pass, kept off the per-minute probe path
+    Refreshes stale certificates per host:port and raises expiry alerts
+    """
+    inspected = refresh_certificates()
+    notifications = send_certificate_alerts()
+    return f"Inspected {inspected} certificates, created {notifications} alerts"
+
+
+@shared_task
+def detect_response_time_anomalies():
+    """
+    Batch analytics pass flagging websites whose response times jumped
+    well above their own rolling baseline
+    """
+    notifications = detect_anomalies()
+    return f"Created {notifications} anomaly alerts"
+
+
+@shared_task
+def sweep_heartbeats():
+    """
+    Flush buffered heartbeat pings and record a status check for every
+    heartbeat monitor whose check_interval has elapsed, so missed
+    heartbeats open incidents and trigger alerts like failed probes
+    """
+    flushed = flush_pings()
+    now = timezone.now()
+    
+    latest_check = StatusCheck.objects.filter(website=OuterRef('pk')).order_by('-checked_at').values('checked_at')[:1]
+    websites = Website.objects.filter(
+        monitor_type='heartbeat', status='active'
+    ).annotate(last_checked_at=Subquery(latest_check))
+    
+    recorded = 0
+    for website in websites.iterator():
+        if website.last_checked_at and now - website.last_checked_at < timedelta(seconds=website.check_interval):
+            continue
+        result = heartbeat_result(website, now)
+        if result is None:
+            continue
+        record_status_check(website, {**result, 'checked_at': now})
+        recorded += 1
+    
+    return f"Flushed {flushed} heartbeats, recorded {recorded} checks"
 
 
 @shared_task
 def cleanup_old_status_checks():
     """
     Cleanup old status checks to prevent database bloat
-    Keep only the last 1000 checks per website
+    Keep only the last 1000 checks per website (deleted websites are
+    removed entirely by purge_websites)
     """
-    from django.db.models import OuterRef, Subquery
-    
-    websites = Website.objects.filter(status='active')
+    websites = Website.objects.filter(status__in=['active', 'paused'])
     total_deleted = 0
     
     for website in websites:
@@ -200,11 +433,63 @@ def cleanup_old_status_checks():
     return f"Cleaned up {total_deleted} old status checks"
 
 
-# Periodic task setup (to be configured in celery beat)
 @shared_task
+def purge_websites():
+    """
+    Hard-delete soft-deleted websites and their history in small chunks
+    once WEBSITE_PURGE_GRACE has passed
+    """
+    purged, rows = purge_deleted_websites()
+    return f"Purged {purged} websites ({rows} rows)"
+
+
+@shared_task
+def rollup_status_check_counters():
+    """
+    Extend the cumulative StatusCheckCounter series up to the last closed bucket
+    The last SLA_ROLLUP_REROLL_BUCKETS buckets already rolled up are rolled up
+    again, counting checks stored after their bucket closed (e.g. a result
+    writer backlog). Buckets are processed oldest first, at most
+    SLA_ROLLUP_MAX_BUCKETS per run, and stretches without any checks are skipped
+    """
+    size = bucket_size()
+    # Leave a short grace period for checks still being written
+    closed = floor_to_bucket(timezone.now() - timedelta(seconds=settings.SLA_ROLLUP_DELAY))
+    
+    last = StatusCheckCounter.objects.aggregate(last=Max('boundary'))['last']
+    if last is not None:
+        last -= settings.SLA_ROLLUP_REROLL_BUCKETS * size
+    next_check = StatusCheck.objects.filter(
+        **({'checked_at__gte': last} if last else {})
+    ).aggregate(first=Min('checked_at'))['first']
+    
+    buckets = 0
+    rows = 0
+    while next_check is not None and buckets < settings.SLA_ROLLUP_MAX_BUCKETS:
+        boundary = floor_to_bucket(next_check) + size
+        if boundary > closed:
+            break
+        
+        written = rollup_bucket(boundary)
+        rows += written
+        buckets += 1
+        if written:
+            # Checks usually continue into the next bucket; only look up the
+            # next check (a scan up to now) to skip an idle stretch
+            next_check = boundary
+        else:
+            next_check = StatusCheck.objects.filter(
+                checked_at__gte=boundary
+            ).aggregate(first=Min('checked_at'))['first']
+    
+    return f"Rolled up {buckets} buckets ({rows} counter rows)"
+
+
+# Periodic task setup (to be configured in celery beat)
+@shared_task(ignore_result=True)
 def periodic_website_checks():
     """
     Periodic task to check all websites
     This should be called every minute by celery beat
     """
-    return check_all_websites.delay()
\ No newline at end of file
+    return check_all_websites()
\ No newline at end of file
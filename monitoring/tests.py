@@ -1,3 +1,983 @@
-from django.test import TestCase
+import json
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import DataError, OperationalError, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import Count, Q, Sum
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from backend.db_router import PIN_COOKIE, PrimaryReplicaRouter, ReplicaRoutingMiddleware
+from . import dashboard, heartbeats, hot_store, notifications, tasks
+from .anomalies import detect_anomalies
+from .hot_store import STATUSES
+from .models import (
+    AlertNotification, Incident, NotificationChannel, NotificationDelivery, StatusCheck, StatusPage,
+    UptimeAlert, Website
+)
+from .notifications import LocmemWebhookBackend, create_deliveries, deliver_pending
+from .probe_worker import RESULT_STREAM, WORK_QUEUE, encode_result
+from .probes import ContentMatcher, read_capped
+from .purge import purge_deleted_websites
+from .result_writer import DEAD_LETTER_STREAM, WRITER_GROUP, ResultWriter, is_valid_result
+from .sla import COUNTER_FIELDS, bucket_size, counters_at, floor_to_bucket
+from .status_pages import render_pages_for_websites
+from .tasks import dispatch_website_checks, rollup_status_check_counters, sweep_heartbeats, update_incident
+from .views import WebsiteViewSet
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+try:
+    import lupa
+except ImportError:
+    lupa = None
+
+
+class PrimaryReplicaRouterTests(SimpleTestCase):
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        self.factory = RequestFactory()
+
+    def serve(self, request, write=False):
+        """Run a request through the middleware, returning (response, read aliases before and after a write)"""
+        reads = []
+
+        def view(request):
+            reads.append(self.router.db_for_read(Website))
+            if write:
+                self.router.db_for_write(Website)
+            reads.append(self.router.db_for_read(Website))
+            return HttpResponse()
+
+        return ReplicaRoutingMiddleware(view)(request), reads
+
+    @override_settings(DATABASE_REPLICAS=['replica1'])
+    def test_safe_request_reads_from_replica(self):
+        response, reads = self.serve(self.factory.get('/'))
+        self.assertEqual(reads, ['replica1', 'replica1'])
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    @override_settings(DATABASE_REPLICAS=['replica1'])
+    def test_write_pins_request_and_follow_ups(self):
+        response, reads = self.serve(self.factory.get('/'), write=True)
+        self.assertEqual(reads, ['replica1', 'default'])
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+        request = self.factory.get('/')
+        request.COOKIES[PIN_COOKIE] = response.cookies[PIN_COOKIE].value
+        _, reads = self.serve(request)
+        self.assertEqual(reads, ['default', 'default'])
+
+    @override_settings(DATABASE_REPLICAS=['replica1'])
+    def test_unsafe_requests_and_background_reads_use_primary(self):
+        _, reads = self.serve(self.factory.post('/'))
+        self.assertEqual(reads, ['default', 'default'])
+        self.assertEqual(self.router.db_for_read(Website), 'default')
+
+    def test_without_replicas(self):
+        _, reads = self.serve(self.factory.get('/'))
+        self.assertEqual(reads, ['default', 'default'])
+
+
+class HotStoreRecordTests(SimpleTestCase):
+
+    def test_round_trip(self):
+        check = StatusCheck(
+            pk=42,
+            website_id=7,
+            checked_at=datetime(2025, 3, 1, 12, 30, 5, 123456, tzinfo=dt_timezone.utc),
+            status='slow',
+            status_code=503,
+            response_time=2345,
+            error_message='délai dépassé',
+            dns_time=4,
+            tls_time=31,
+            redirect_count=0,
+        )
+
+        decoded = hot_store.decode_check(hot_store.encode_check(check), 7)
+
+        fields = ['pk', 'website_id', 'checked_at', 'status', 'status_code', 'response_time', 'error_message']
+        for field in [*fields, *hot_store.TIMING_FIELDS]:
+            self.assertEqual(getattr(decoded, field), getattr(check, field), field)
+
+    def test_round_trip_without_optional_values(self):
+        check = StatusCheck(pk=1, website_id=1, checked_at=timezone.now(), status='offline')
+
+        decoded = hot_store.decode_check(hot_store.encode_check(check), 1)
+
+        self.assertIsNone(decoded.status_code)
+        self.assertIsNone(decoded.response_time)
+        self.assertIsNone(decoded.error_message)
+        for field in hot_store.TIMING_FIELDS:
+            self.assertIsNone(getattr(decoded, field), field)
+
+
+class ChoiceIndexFieldTests(TestCase):
+    """StatusCheck.status is a string in Python and a smallint in the column"""
+
+    def setUp(self):
+        user = User.objects.create_user('owner')
+        self.website = Website.objects.create(user=user, name='Example', url='https://example.com')
+
+    def test_stores_choice_position(self):
+        StatusCheck.objects.create(website=self.website, status='error')
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT status FROM monitoring_statuscheck")
+            self.assertEqual(cursor.fetchone()[0], 3)
+        self.assertEqual(StatusCheck.objects.get().status, 'error')
+        self.assertEqual(StatusCheck.objects.filter(status__in=['error', 'slow']).count(), 1)
+        self.assertEqual(list(StatusCheck.objects.values_list('status', flat=True)), ['error'])
+
+    def test_to_python(self):
+        field = StatusCheck._meta.get_field('status')
+        self.assertEqual(field.to_python('offline'), 'offline')
+        self.assertEqual(field.to_python('1'), 'offline')
+        with self.assertRaises(ValidationError):
+            field.to_python('unknown')
+
+
+class CompactStatusChecksMigrationTests(TransactionTestCase):
+    """0011 interns error messages and indexes statuses, and can be rolled back"""
+
+    before = [('monitoring', '0010_website_heartbeat')]
+    after = [('monitoring', '0011_compact_status_checks')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_round_trip(self):
+        apps = self.migrate(self.before)
+        user = apps.get_model('auth', 'User').objects.create(username='owner')
+        website = apps.get_model('monitoring', 'Website').objects.create(
+            user_id=user.id, name='Example', url='https://example.com'
+        )
+        StatusCheck = apps.get_model('monitoring', 'StatusCheck')
+        for status, error_message in [('online', None), ('offline', 'timed out'), ('error', 'timed out'), ('slow', '')]:
+            StatusCheck.objects.create(website_id=website.id, status=status, error_message=error_message)
+
+        apps = self.migrate(self.after)
+        checks = apps.get_model('monitoring', 'StatusCheck').objects.select_related('error').order_by('pk')
+        self.assertEqual(
+            [(check.status, check.error and check.error.text) for check in checks],
+            [('online', None), ('offline', 'timed out'), ('error', 'timed out'), ('slow', None)]
+        )
+        self.assertEqual(apps.get_model('monitoring', 'ErrorMessage').objects.count(), 1)
+
+        apps = self.migrate(self.before)
+        checks = apps.get_model('monitoring', 'StatusCheck').objects.order_by('pk')
+        self.assertEqual(
+            [(check.status, check.error_message) for check in checks],
+            [('online', None), ('offline', 'timed out'), ('error', 'timed out'), ('slow', None)]
+        )
+
+
+@skipUnless(fakeredis and lupa, "fakeredis with Lua support is not installed")
+class DashboardAggregateTests(TestCase):
+    """The write-through aggregate agrees with the figures computed from the database"""
+
+    def setUp(self):
+        client = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+        for patcher in [
+            mock.patch.object(dashboard, 'get_client', return_value=client),
+            mock.patch.object(hot_store, 'get_client', return_value=client),
+            mock.patch.dict(dashboard._scripts, clear=True),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user('owner')
+        self.first = Website.objects.create(user=self.user, name='First', url='https://first.example')
+        self.second = Website.objects.create(user=self.user, name='Second', url='https://second.example')
+        Website.objects.create(user=self.user, name='Paused', url='https://paused.example', status='paused')
+        self.start = timezone.now() - timedelta(hours=1)
+        self.add_check(self.first, 'online', 100, minutes=1)
+        self.add_check(self.first, 'offline', None, minutes=2)
+
+    def add_check(self, website, status, response_time, minutes):
+        return StatusCheck.objects.create(
+            website=website, status=status, response_time=response_time,
+            checked_at=self.start + timedelta(minutes=minutes)
+        )
+
+    def database_stats(self):
+        with override_settings(DASHBOARD_AGGREGATE=False, RECENT_CHECKS_STORE=False):
+            return dashboard.get_dashboard_stats(self.user.id)
+
+    def test_matches_database_after_new_checks(self):
+        self.assertEqual(dashboard.get_dashboard_stats(self.user.id), self.database_stats())
+
+        checks = [
+            self.add_check(self.second, 'online', 200, minutes=3),
+            self.add_check(self.first, 'online', 50, minutes=4),
+            self.add_check(self.second, 'slow', 3000, minutes=5),
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            hot_store.remember(checks)
+            dashboard.record_checks(checks)
+
+        stats = dashboard.get_dashboard_stats(self.user.id)
+        self.assertEqual(stats, self.database_stats())
+        self.assertEqual(stats['online_websites'], 1)
+        self.assertEqual(stats['offline_websites'], 1)
+
+    def test_reconcile_restores_aggregate(self):
+        dashboard.get_dashboard_stats(self.user.id)
+        dashboard.get_client().hset(dashboard.aggregate_key(self.user.id), 'online', 5)
+
+        self.assertEqual(dashboard.reconcile_aggregates(), 1)
+        self.assertEqual(dashboard.get_dashboard_stats(self.user.id), self.database_stats())
+
+
+@skipUnless(fakeredis, "fakeredis is not installed")
+@override_settings(RECENT_CHECKS_STORE=False, DASHBOARD_AGGREGATE=False)
+class ResultWriterTests(TestCase):
+
+    def setUp(self):
+        self.client = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+        self.writer = ResultWriter(self.client, 'test', block=1)
+        self.writer.ensure_group()
+        user = User.objects.create_user('owner')
+        self.website = Website.objects.create(user=user, name='Example', url='https://example.com')
+
+    def publish(self, **result):
+        self.client.xadd(RESULT_STREAM, encode_result({
+            'website_id': self.website.id, 'checked_at': time.time(), 'status': 'online',
+            'status_code': 200, 'response_time': 120, 'error_message': None, **result
+        }))
+
+    def test_stores_each_result_once(self):
+        self.publish(key='a')
+        self.publish(key='a')
+        self.assertEqual(self.writer.run_once(), 1)
+
+        self.publish(key='a')
+        self.assertEqual(self.writer.run_once(), 0)
+        self.assertEqual(StatusCheck.objects.filter(result_key='a').count(), 1)
+
+    def test_dead_letters_malformed_results(self):
+        self.publish()
+        self.client.xadd(RESULT_STREAM, {'data': 'not json'})
+        self.publish(key='b')
+
+        self.assertEqual(self.writer.run_once(), 1)
+
+        self.assertEqual(self.client.xlen(DEAD_LETTER_STREAM), 2)
+        self.assertEqual(self.client.xpending(RESULT_STREAM, WRITER_GROUP)['pending'], 0)
+        dead = self.client.xrange(DEAD_LETTER_STREAM)[1][1]
+        self.assertEqual(dead[b'data'], b'not json')
+        self.assertIn(b'entry_id', dead)
+
+    def test_stores_results_without_optional_fields(self):
+        self.client.xadd(RESULT_STREAM, encode_result({
+            'website_id': self.website.id, 'checked_at': time.time(), 'status': 'offline', 'key': 'c'
+        }))
+
+        self.assertEqual(self.writer.run_once(), 1)
+        check = StatusCheck.objects.get(result_key='c')
+        self.assertIsNone(check.status_code)
+        self.assertIsNone(check.error_message)
+
+    def test_validates_types_and_ranges(self):
+        valid = {
+            'key': 'k', 'website_id': 1, 'checked_at': 1700000000.5, 'status': 'online',
+            'status_code': 200, 'response_time': 120, 'error_message': None,
+            'timings': {'dns_time': 3, 'ttfb': None},
+        }
+        self.assertTrue(is_valid_result(valid))
+        for change in [
+            {'key': 'k' * 33},
+            {'website_id': True},
+            {'checked_at': float('nan')},
+            {'checked_at': 1e20},
+            {'status': ['online']},
+            {'status_code': 70000},
+            {'response_time': 1.5},
+            {'response_time': -1},
+            {'error_message': 'nul\x00byte'},
+            {'timings': {'dns_time': 40000}},
+            {'timings': {'website_id': 2}},
+            {'timings': ['dns_time']},
+        ]:
+            self.assertFalse(is_valid_result({**valid, **change}), change)
+
+    def test_dead_letters_entries_the_database_rejects(self):
+        store = self.writer.store
+
+        def reject_bad(results):
+            if any(result['key'] == 'bad' for result in results):
+                raise DataError("value out of range")
+            return store(results)
+
+        self.publish(key='good')
+        self.publish(key='bad')
+        with mock.patch.object(self.writer, 'store', side_effect=reject_bad):
+            self.assertEqual(self.writer.run_once(), 1)
+
+        self.assertTrue(StatusCheck.objects.filter(result_key='good').exists())
+        self.assertEqual(self.client.xlen(DEAD_LETTER_STREAM), 1)
+        self.assertEqual(self.client.xpending(RESULT_STREAM, WRITER_GROUP)['pending'], 0)
+
+    def test_database_stall_leaves_batch_pending(self):
+        self.publish(key='d')
+        self.client.xadd(RESULT_STREAM, {'data': 'not json'})
+        with mock.patch.object(self.writer, 'store', side_effect=OperationalError("stall")):
+            with self.assertRaises(OperationalError):
+                self.writer.run_once()
+
+        self.assertEqual(self.client.xpending(RESULT_STREAM, WRITER_GROUP)['pending'], 2)
+        self.assertEqual(self.client.xlen(DEAD_LETTER_STREAM), 0)
+
+        self.writer.claim_idle = 0
+        self.assertEqual(self.writer.run_once(), 1)
+        self.assertEqual(self.client.xlen(DEAD_LETTER_STREAM), 1)
+        self.assertEqual(self.client.xpending(RESULT_STREAM, WRITER_GROUP)['pending'], 0)
+
+
+@override_settings(SLA_COUNTER_BUCKET=3600, SLA_ROLLUP_DELAY=0, SLA_ROLLUP_REROLL_BUCKETS=2)
+class CounterRollupTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_user('owner')
+        self.websites = [
+            Website.objects.create(user=user, name=name, url=f'https://{name}.example.com')
+            for name in ('first', 'second')
+        ]
+        self.now = floor_to_bucket(timezone.now())
+
+    def add_checks(self, hours_ago, website, *statuses):
+        StatusCheck.objects.bulk_create(
+            StatusCheck(
+                website=website, status=status, checked_at=self.now - timedelta(hours=hours_ago, minutes=index),
+                response_time=None if status == 'error' else 100 + index
+            )
+            for index, status in enumerate(statuses)
+        )
+
+    def assertCountersMatch(self):
+        for boundary in [self.now - n * bucket_size() for n in range(12)]:
+            counters = counters_at([website.id for website in self.websites], boundary)
+            for website in self.websites:
+                direct = StatusCheck.objects.filter(website=website, checked_at__lt=boundary).aggregate(
+                    checks=Count('id'),
+                    up_checks=Count('id', filter=~Q(status__in=Incident.DOWN_STATUSES)),
+                    response_time_total=Sum('response_time', default=0),
+                    response_time_count=Count('response_time'),
+                )
+                with self.subTest(boundary=boundary, website=website.name):
+                    self.assertEqual(counters.get(website.id, dict.fromkeys(COUNTER_FIELDS, 0)), direct)
+
+    def test_counters_match_direct_counts(self):
+        first, second = self.websites
+        self.add_checks(10, first, 'online', 'slow', 'offline')
+        self.add_checks(9, second, 'online')
+        # Idle stretch between 9 and 3 hours ago
+        self.add_checks(3, first, 'error', 'online')
+        self.add_checks(2, second, 'online', 'online')
+        self.add_checks(1, first, 'online')
+
+        rollup_status_check_counters()
+
+        self.assertCountersMatch()
+
+    def test_late_checks_are_counted_on_the_next_run(self):
+        first, second = self.websites
+        self.add_checks(5, first, 'online')
+        self.add_checks(1, second, 'online')
+        rollup_status_check_counters()
+
+        # Stored after their buckets were rolled up, within the re-rolled range
+        self.add_checks(1, first, 'offline')
+        self.add_checks(2, second, 'slow')
+        rollup_status_check_counters()
+
+        self.assertCountersMatch()
+
+
+@override_settings(DASHBOARD_AGGREGATE=False)
+class AnomalyDetectionTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_user('owner')
+        self.website = Website.objects.create(user=user, name='Example', url='https://example.com')
+        self.alert = UptimeAlert.objects.create(website=self.website, alert_type='anomaly', threshold=500)
+        self.checked_at = timezone.now() - timedelta(hours=1)
+        self.add_checks('online', [100 + index % 7 for index in range(40)])
+
+    def add_checks(self, status, response_times):
+        for response_time in response_times:
+            self.checked_at += timedelta(seconds=30)
+            StatusCheck.objects.create(
+                website=self.website, status=status, response_time=response_time, checked_at=self.checked_at
+            )
+
+    def test_slow_responses_are_flagged(self):
+        self.add_checks('slow', [2000, 2100, 1900])
+
+        self.assertEqual(detect_anomalies(), 1)
+        notification = AlertNotification.objects.get(alert=self.alert)
+        self.assertEqual(notification.status_check, StatusCheck.objects.latest('checked_at'))
+
+    def test_outages_are_not_anomalies(self):
+        # Timed out probes record the timeout as their response time
+        self.add_checks('offline', [30000, 30000, 30000])
+
+        self.assertEqual(detect_anomalies(), 0)
+
+    def test_sites_without_history_are_skipped(self):
+        StatusCheck.objects.all().delete()
+
+        self.assertEqual(detect_anomalies(), 0)
+
+
+@override_settings(RECENT_CHECKS_STORE=False)
+class WebsiteSearchTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.shop = Website.objects.create(user=self.user, name='Shop', url='https://shop.example.com')
+        Website.objects.create(user=self.user, name='Blog', url='https://blog.example.org')
+        Website.objects.create(user=User.objects.create_user('other'), name='Shop', url='https://shop.example.net')
+
+    def search(self, term):
+        response = self.client.get('/api/websites/', {'search': term})
+        self.assertEqual(response.status_code, 200)
+        return sorted(website['name'] for website in response.data['results'])
+
+    def test_matches_substrings_of_name_url_and_host(self):
+        self.assertEqual(self.search('hop'), ['Shop'])
+        self.assertEqual(self.search('EXAMPLE'), ['Blog', 'Shop'])
+        self.assertEqual(self.search('example.org'), ['Blog'])
+        # Shorter than a trigram
+        self.assertEqual(self.search('bl'), ['Blog'])
+
+    def test_follows_renamed_websites(self):
+        self.shop.name = 'Store'
+        self.shop.save()
+
+        self.assertEqual(self.search('store'), ['Store'])
+        self.assertEqual(self.search('shop'), ['Store'])
+        self.assertEqual(self.search('shop example'), ['Store'])
+
+
+@override_settings(RECENT_CHECKS_STORE=False, DASHBOARD_AGGREGATE=False)
+class BulkImportTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Website.objects.create(user=self.user, name='Existing', url='https://existing.example.com')
+
+    def statuses(self, response):
+        return [result['status'] for result in response.data['results']]
+
+    def test_resolves_conflicts_per_row(self):
+        response = self.client.post('/api/websites/bulk_import/', [
+            {'url': 'https://new.example.com'},
+            {'url': 'https://existing.example.com'},
+            {'url': 'https://new.example.com', 'name': 'Again'},
+            {'url': 'not a url'},
+        ], format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.statuses(response), ['created', 'duplicate', 'duplicate', 'invalid'])
+        self.assertEqual(Website.objects.get(url='https://new.example.com').name, 'https://new.example.com')
+
+    def test_concurrent_import_of_the_same_url(self):
+        # The other import commits between the conflict lookup and the insert
+        Website.objects.create(user=self.user, name='Raced', url='https://raced.example.com')
+        lookup = WebsiteViewSet.get_existing_urls
+        lookups = []
+
+        def stale_lookup(view, urls):
+            lookups.append(urls)
+            return set() if len(lookups) == 1 else lookup(view, urls)
+
+        with mock.patch.object(WebsiteViewSet, 'get_existing_urls', stale_lookup):
+            response = self.client.post('/api/websites/bulk_import/', [
+                {'url': 'https://raced.example.com'},
+                {'url': 'https://other.example.com'},
+            ], format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(lookups), 2)
+        self.assertEqual(self.statuses(response), ['duplicate', 'created'])
+        self.assertEqual(Website.objects.filter(url='https://raced.example.com').count(), 1)
+
+    def test_csv_upload(self):
+        response = self.client.post(
+            '/api/websites/bulk_import/', 'url,name\nhttps://csv.example.com, From CSV \n',
+            content_type='text/csv'
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Website.objects.get(url='https://csv.example.com').name, 'From CSV')
+
+    @override_settings(WEBSITE_BULK_IMPORT_MAX_ROWS=2)
+    def test_too_many_rows(self):
+        rows = ''.join(f'https://{index}.example.com\n' for index in range(5))
+        response = self.client.post('/api/websites/bulk_import/', 'url\n' + rows, content_type='text/csv')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Website.objects.count(), 1)
+
+
+@override_settings(RECENT_CHECKS_STORE=False)
+class ColumnarFormatTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_user('owner')
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        self.website = Website.objects.create(user=user, name='Example', url='https://example.com')
+        now = timezone.now()
+        self.checks = [
+            StatusCheck.objects.create(
+                website=self.website, status=status, status_code=code, response_time=120,
+                checked_at=now - timedelta(minutes=minutes)
+            )
+            for status, code, minutes in (('online', 200, 2), ('offline', 503, 1))
+        ]
+
+    def get(self, path, **params):
+        response = self.client.get(path, {'format': 'columnar', **params})
+        return response.status_code, json.loads(response.content)
+
+    def test_website_list(self):
+        status_code, data = self.get('/api/websites/')
+
+        self.assertEqual(status_code, 200)
+        self.assertEqual(data['statuses'], STATUSES)
+        website = data['results'][0]
+        self.assertEqual(website['latest_status_check']['id'], [self.checks[1].id])
+        self.assertEqual(website['latest_status_check']['status'], [STATUSES.index('offline')])
+        self.assertEqual(website['recent_checks']['status_code'], [503, 200])
+        self.assertNotIn('statuses', website['recent_checks'])
+
+    def test_history(self):
+        status_code, data = self.get(f'/api/websites/{self.website.id}/history/')
+
+        self.assertEqual(status_code, 200)
+        self.assertEqual(data['statuses'], STATUSES)
+        self.assertEqual(data['checks']['id'], [check.id for check in reversed(self.checks)])
+
+    def test_errors_are_left_alone(self):
+        status_code, data = self.get('/api/websites/0/history/')
+
+        self.assertEqual(status_code, 404)
+        self.assertNotIn('statuses', data)
+
+    def test_history_timing_averages(self):
+        StatusCheck.objects.filter(pk=self.checks[0].pk).update(dns_time=10, ttfb=40)
+        StatusCheck.objects.filter(pk=self.checks[1].pk).update(dns_time=15)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/websites/{self.website.id}/history/')
+        averages = response.data['timing_averages']
+        self.assertEqual((averages['dns_time'], averages['ttfb'], averages['tls_time']), (12.5, 40, None))
+
+        status_code, data = self.get(f'/api/websites/{self.website.id}/history/', limit=1)
+        self.assertEqual(data['timing_averages']['dns_time'], 15)
+
+
+@override_settings(RECENT_CHECKS_STORE=False, DASHBOARD_AGGREGATE=False)
+class ContentCheckSettingsTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('owner'))
+
+    def create(self, **data):
+        data = {'name': 'Example', 'url': 'https://example.com', **data}
+        return self.client.post('/api/websites/', data, format='json')
+
+    def test_website_without_expected_content(self):
+        response = self.create()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Website.objects.get().expected_content, '')
+
+    def test_website_with_expected_content(self):
+        response = self.create(expected_content='Welcome', check_method='get')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Website.objects.get().expected_content, 'Welcome')
+
+    def test_expected_content_requires_get(self):
+        response = self.create(expected_content='Welcome')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('expected_content', response.data)
+
+    def test_invalid_regex_is_rejected(self):
+        response = self.create(expected_content='(unclosed', content_match_type='regex', check_method='get')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Website.objects.exists())
+
+
+class ContentMatcherTests(SimpleTestCase):
+
+    def feed(self, matcher, *chunks):
+        return [matcher.feed(chunk) for chunk in chunks]
+
+    def test_keyword_across_chunks(self):
+        matcher = ContentMatcher('Welcome')
+
+        self.assertEqual(self.feed(matcher, b'<h1>Wel', b'c', b'ome</h1>'), [False, False, True])
+
+    def test_keyword_missing(self):
+        matcher = ContentMatcher('Welcome')
+
+        self.assertEqual(self.feed(matcher, b'<h1>Welc', b'<h1>ome'), [False, False])
+
+    def test_regex_across_chunks(self):
+        matcher = ContentMatcher(r'status: (ok|up)', match_type='regex')
+
+        self.assertEqual(self.feed(matcher, b'{"status', b': o', b'k"}'), [False, False, True])
+
+    def test_reading_stops_at_the_match(self):
+        response = mock.Mock()
+        response.iter_content.return_value = iter([b'x' * 10, b'Welcome', b'y' * 10])
+
+        self.assertEqual(read_capped(response, 100, ContentMatcher('Welcome')), 17)
+        self.assertEqual(read_capped(mock.Mock(iter_content=lambda chunk_size: [b'z' * 64]), 16), 16)
+
+
+class IncidentTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_user('owner')
+        self.website = Website.objects.create(user=user, name='Example', url='https://example.com')
+        self.start = datetime(2026, 1, 1, 10, tzinfo=dt_timezone.utc)
+
+    def check(self, minutes, status, error_message=None):
+        status_check = StatusCheck(
+            website=self.website, status=status, error_message=error_message,
+            checked_at=self.start + timedelta(minutes=minutes)
+        )
+        return update_incident(self.website, status_check)
+
+    def test_consecutive_failures_form_one_incident(self):
+        self.assertIsNone(self.check(0, 'online'))
+        opened = self.check(1, 'offline', 'Connection timeout')
+        self.check(2, 'error')
+        self.check(3, 'online')
+        self.assertIsNone(self.check(4, 'online'))
+
+        incident = Incident.objects.get()
+        self.assertEqual(incident, opened)
+        self.assertEqual(incident.cause, 'Connection timeout')
+        self.assertEqual(incident.check_count, 2)
+        self.assertEqual(
+            (incident.started_at, incident.ended_at),
+            (self.start + timedelta(minutes=1), self.start + timedelta(minutes=3))
+        )
+
+        self.check(5, 'error')
+        self.assertEqual(Incident.objects.filter(ended_at__isnull=True).count(), 1)
+        self.assertEqual(Incident.objects.count(), 2)
+
+    def test_uptime_between(self):
+        hour = timedelta(hours=1)
+        Incident.objects.create(
+            website=self.website, started_at=self.start - hour, ended_at=self.start + timedelta(minutes=15)
+        )
+        Incident.objects.create(website=self.website, started_at=self.start + timedelta(minutes=45))
+
+        self.assertEqual(self.website.uptime_between(self.start, self.start + hour), 50.0)
+        self.assertEqual(
+            self.website.uptime_between(self.start + timedelta(minutes=15), self.start + timedelta(minutes=45)), 100.0
+        )
+        self.assertEqual(self.website.uptime_between(self.start - hour, self.start), 0.0)
+        self.assertEqual(self.website.uptime_between(self.start, self.start), 100.0)
+
+
+@override_settings(
+    NOTIFICATION_WEBHOOK_BACKEND='monitoring.notifications.LocmemWebhookBackend',
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'
+)
+class DigestDeliveryTests(TestCase):
+
+    def setUp(self):
+        notifications.outbox.clear()
+        self.user = User.objects.create_user('owner', email='owner@example.com')
+        self.notifications = []
+        for name in ('first', 'second'):
+            website = Website.objects.create(user=self.user, name=name, url=f'https://{name}.example.com')
+            alert = UptimeAlert.objects.create(website=website, alert_type='down', threshold=1)
+            self.notifications += [
+                AlertNotification.objects.create(alert=alert, message=f'{name} is down ({attempt})')
+                for attempt in range(2)
+            ]
+
+    def test_one_digest_per_channel(self):
+        NotificationChannel.objects.create(user=self.user, channel_type='webhook', target='https://hooks.example.com/a')
+        NotificationChannel.objects.create(user=self.user, channel_type='email', target='ops@example.com')
+        create_deliveries(self.user, self.notifications)
+
+        self.assertEqual(deliver_pending(), (2, 0))
+
+        self.assertEqual(len(notifications.outbox), 1)
+        payload = notifications.outbox[0]['payload']
+        self.assertEqual(payload['count'], 4)
+        self.assertEqual({alert['website'] for alert in payload['alerts']}, {'first', 'second'})
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['ops@example.com'])
+        self.assertEqual(mail.outbox[0].subject, '[Status Monitor] 4 alerts')
+        self.assertFalse(NotificationDelivery.objects.exclude(status='sent').exists())
+        self.assertEqual(deliver_pending(), (0, 0))
+
+    def test_account_email_without_channels(self):
+        create_deliveries(self.user, self.notifications[:1])
+
+        self.assertEqual(deliver_pending(), (1, 0))
+        self.assertEqual(mail.outbox[0].to, ['owner@example.com'])
+        self.assertEqual(mail.outbox[0].subject, '[Status Monitor] first is down (0)')
+
+    def test_failed_digests_are_retried_later(self):
+        NotificationChannel.objects.create(user=self.user, channel_type='webhook', target='https://hooks.example.com/a')
+        create_deliveries(self.user, self.notifications)
+
+        with mock.patch.object(LocmemWebhookBackend, 'send', side_effect=ConnectionError('refused')):
+            self.assertEqual(deliver_pending(), (0, 1))
+
+        delivery = NotificationDelivery.objects.first()
+        self.assertEqual((delivery.status, delivery.attempts, delivery.last_error), ('pending', 1, 'refused'))
+        # Backing off
+        self.assertEqual(deliver_pending(), (0, 0))
+
+        NotificationDelivery.objects.update(next_attempt_at=delivery.next_attempt_at - timedelta(hours=1))
+        self.assertEqual(deliver_pending(), (1, 0))
+        self.assertEqual(notifications.outbox[0]['payload']['count'], 4)
+
+
+@skipUnless(fakeredis, "fakeredis is not installed")
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    RECENT_CHECKS_STORE=False, DASHBOARD_AGGREGATE=False
+)
+class HeartbeatTests(TestCase):
+
+    def setUp(self):
+        redis_client = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+        for patcher in (
+            mock.patch.object(heartbeats, 'get_client', return_value=redis_client),
+            mock.patch.object(tasks.check_and_send_alerts, 'delay'),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        user = User.objects.create_user('owner')
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        response = self.client.post(
+            '/api/websites/', {'name': 'Nightly backup', 'monitor_type': 'heartbeat', 'check_interval': 3600},
+            format='json'
+        )
+        self.website = Website.objects.get(pk=response.data['id'])
+        self.ping_url = response.data['ping_url']
+
+    def test_pings_are_flushed_by_the_sweep(self):
+        with self.assertNumQueries(1):
+            # Resolving the token is the only query, and it is cached
+            self.assertEqual(self.client.get(self.ping_url).status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.post(self.ping_url).status_code, 200)
+        self.website.refresh_from_db()
+        self.assertIsNone(self.website.last_heartbeat_at)
+
+        sweep_heartbeats()
+
+        self.website.refresh_from_db()
+        self.assertAlmostEqual(self.website.last_heartbeat_at, timezone.now(), delta=timedelta(seconds=5))
+        self.assertEqual(StatusCheck.objects.get(website=self.website).status, 'online')
+
+        # Not due again until check_interval has elapsed
+        sweep_heartbeats()
+        self.assertEqual(StatusCheck.objects.count(), 1)
+
+    def test_missed_heartbeat_opens_an_incident(self):
+        Website.objects.filter(pk=self.website.pk).update(
+            last_heartbeat_at=timezone.now() - timedelta(hours=3),
+            created_at=timezone.now() - timedelta(days=1)
+        )
+
+        sweep_heartbeats()
+
+        check = StatusCheck.objects.get(website=self.website)
+        self.assertEqual(check.status, 'offline')
+        self.assertTrue(check.error_message.startswith('No heartbeat since'))
+        self.assertTrue(Incident.objects.get(website=self.website).is_open)
+
+    def test_new_monitor_gets_a_first_interval(self):
+        sweep_heartbeats()
+
+        self.assertFalse(StatusCheck.objects.exists())
+
+    def test_unknown_token(self):
+        self.assertEqual(self.client.get('/api/heartbeats/unknown/').status_code, 404)
+
+
+@override_settings(
+    WEBSITE_PURGE_CHUNK_SIZE=2, WEBSITE_PURGE_THROTTLE=0, WEBSITE_PURGE_GRACE=3600,
+    RECENT_CHECKS_STORE=False, DASHBOARD_AGGREGATE=False
+)
+class PurgeTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_user('owner')
+        self.deleted = self.website(user, 'deleted', deleted_ago=timedelta(days=1))
+        self.recent = self.website(user, 'recent', deleted_ago=timedelta(minutes=5))
+        self.active = self.website(user, 'active')
+
+    def website(self, user, name, deleted_ago=None):
+        website = Website.objects.create(user=user, name=name, url=f'https://{name}.example.com')
+        StatusCheck.objects.bulk_create(StatusCheck(website=website, status='offline') for _ in range(5))
+        Incident.objects.create(website=website, started_at=timezone.now())
+        alert = UptimeAlert.objects.create(website=website, alert_type='down', threshold=1)
+        AlertNotification.objects.create(alert=alert, message=f'{name} is down')
+        if deleted_ago is not None:
+            Website.objects.filter(pk=website.pk).update(status='deleted', updated_at=timezone.now() - deleted_ago)
+        return website
+
+    def test_purges_in_chunks(self):
+        with CaptureQueriesContext(connection) as queries:
+            purged, rows = purge_deleted_websites()
+
+        self.assertEqual((purged, rows), (1, 8))
+        self.assertFalse(Website.objects.filter(pk=self.deleted.pk).exists())
+        self.assertFalse(StatusCheck.objects.filter(website_id=self.deleted.pk).exists())
+        check_deletes = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('DELETE FROM "monitoring_statuscheck"')
+        ]
+        self.assertEqual(len(check_deletes), 3)
+        for website in (self.recent, self.active):
+            self.assertEqual(website.status_checks.count(), 5)
+            self.assertEqual(website.alerts.count(), 1)
+
+    @override_settings(WEBSITE_PURGE_MAX_SECONDS=0)
+    def test_resumes_after_the_deadline(self):
+        self.assertEqual(purge_deleted_websites(), (0, 1))
+        self.assertTrue(Website.objects.filter(pk=self.deleted.pk).exists())
+
+        with self.settings(WEBSITE_PURGE_MAX_SECONDS=300):
+            self.assertEqual(purge_deleted_websites(), (1, 7))
+        self.assertFalse(Website.objects.filter(pk=self.deleted.pk).exists())
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    STATUS_PAGE_ROOT='', RECENT_CHECKS_STORE=False
+)
+class StatusPageTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user('owner')
+        self.website = Website.objects.create(user=user, name='API', url='https://api.example.com')
+        self.page = StatusPage.objects.create(user=user, slug='acme', title='Acme')
+        self.page.websites.add(self.website)
+
+    def test_snapshot_is_served_from_the_cache(self):
+        response = self.client.get('/api/public/status/acme/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['websites'][0]['status'], 'unknown')
+        self.assertTrue(response['Cache-Control'].startswith('public'))
+        with self.assertNumQueries(0):
+            again = self.client.get('/api/public/status/acme/')
+        self.assertEqual(again.content, response.content)
+        self.assertEqual(again['ETag'], response['ETag'])
+
+    def test_not_modified(self):
+        etag = self.client.get('/api/public/status/acme/')['ETag']
+
+        response = self.client.get('/api/public/status/acme/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_rerendered_when_an_incident_opens(self):
+        etag = self.client.get('/api/public/status/acme/')['ETag']
+
+        Incident.objects.create(website=self.website, started_at=timezone.now())
+        render_pages_for_websites([self.website.id])
+
+        response = self.client.get('/api/public/status/acme/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(json.loads(response.content)['status'], 'major_outage')
+
+    def test_unknown_and_private_pages(self):
+        StatusPage.objects.filter(pk=self.page.pk).update(is_public=False)
+
+        self.assertEqual(self.client.get('/api/public/status/acme/').status_code, 404)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/public/status/acme/').status_code, 404)
+        self.assertEqual(self.client.get('/api/public/status/missing/').status_code, 404)
+
+
+@override_settings(RECENT_CHECKS_STORE=False, DASHBOARD_AGGREGATE=False)
+class DispatchTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_user('owner')
+        self.websites = [
+            Website.objects.create(user=user, name=name, url=f'https://{name}.example.com')
+            for name in ('first', 'second', 'third')
+        ]
+        Website.objects.create(user=user, name='cron', url='https://example.com/ping', monitor_type='heartbeat')
+
+    @override_settings(PROBE_BACKEND='celery')
+    def test_celery_group(self):
+        with mock.patch.object(tasks, 'group') as group:
+            group.return_value.apply_async.return_value.id = 'group-id'
+            self.assertEqual(dispatch_website_checks(Website.objects.all()), ('group-id', 3))
+
+        website_ids = sorted(signature.args[0] for signature in group.call_args.args[0])
+        self.assertEqual(website_ids, [website.id for website in self.websites])
+        group.return_value.apply_async.assert_called_once_with()
+
+    @override_settings(PROBE_BACKEND='celery')
+    def test_nothing_to_check(self):
+        with mock.patch.object(tasks, 'group') as group:
+            self.assertEqual(dispatch_website_checks(Website.objects.filter(monitor_type='heartbeat')), (None, 0))
+        group.assert_not_called()
+
+    @skipUnless(fakeredis, "fakeredis is not installed")
+    @override_settings(PROBE_BACKEND='redis', PROBE_BATCH_SIZE=2)
+    def test_redis_job_batches(self):
+        client = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+        with mock.patch.object(tasks, 'get_redis', return_value=client):
+            self.assertEqual(dispatch_website_checks(Website.objects.all()), (None, 3))
+
+        batches = [json.loads(batch) for batch in client.lrange(WORK_QUEUE, 0, -1)]
+        self.assertEqual(sorted(map(len, batches)), [1, 2])
+        self.assertEqual(
+            sorted(job['id'] for batch in batches for job in batch), [website.id for website in self.websites]
+        )
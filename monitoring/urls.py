@@ -2,7 +2,8 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     WebsiteViewSet, StatusCheckViewSet, 
-    UptimeAlertViewSet, AlertNotificationViewSet
+    UptimeAlertViewSet, AlertNotificationViewSet, NotificationChannelViewSet,
+    StatusPageViewSet, heartbeat, status_page
 )
 
 # Create router and register viewsets
@@ -11,7 +12,11 @@ router.register(r'websites', WebsiteViewSet, basename='website')
 router.register(r'status-checks', StatusCheckViewSet, basename='statuscheck')
 router.register(r'alerts', UptimeAlertViewSet, basename='uptimealert')
 router.register(r'notifications', AlertNotificationViewSet, basename='alertnotification')
+router.register(r'notification-channels', NotificationChannelViewSet, basename='notificationchannel')
+router.register(r'status-pages', StatusPageViewSet, basename='statuspage')
 
 urlpatterns = [
+    path('heartbeats/<str:token>/', heartbeat, name='heartbeat-ping'),
+    path('public/status/<slug:slug>/', status_page, name='status-page'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,22 +1,51 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
+from rest_framework.filters import OrderingFilter
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django_filters.rest_framework import DjangoFilterBackend
+from django.http import HttpResponse, HttpResponseNotFound, HttpResponseNotModified
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
 from django.utils import timezone
-from django.db.models import Count, Avg, Q
+from django.db.models import Count, Q
 from datetime import timedelta, datetime
-from .models import Website, StatusCheck, UptimeAlert, AlertNotification
+from .models import (
+    Website, StatusCheck, UptimeAlert, AlertNotification, NotificationChannel, TLSCertificate,
+    StatusPage, normalize_host
+)
 from .serializers import (
     WebsiteSerializer, WebsiteCreateSerializer, StatusCheckSerializer,
     UptimeAlertSerializer, AlertNotificationSerializer,
-    DashboardStatsSerializer, WebsiteStatusHistorySerializer
+    DashboardStatsSerializer, WebsiteStatusHistorySerializer,
+    WebsiteImportRowSerializer, IncidentSerializer,
+    SLAReportSerializer, SLAWindowSerializer, NotificationChannelSerializer,
+    TLSCertificateSerializer, StatusPageSerializer, columnar_checks
 )
-from .tasks import check_website_status
+from .certificates import certificate_endpoint
+from .dashboard import forget, get_dashboard_stats
+from .heartbeats import record_ping, resolve_token
+from .parsers import CSVParser
+from .probes import TIMING_FIELDS
+from .renderers import ColumnarJSONRenderer
+from .search import SEARCH_FIELDS, WebsiteSearchFilter
+from .sla import build_reports
+from .status_pages import get_rendered, render, unpublish
+from .tasks import check_website_status, dispatch_website_checks, schedule_initial_checks, status_changed
 
 
 class WebsiteViewSet(viewsets.ModelViewSet):
     """ViewSet for managing websites"""
     
     permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, ColumnarJSONRenderer]
+    filter_backends = [DjangoFilterBackend, WebsiteSearchFilter, OrderingFilter]
+    filterset_fields = ['current_status', 'monitor_type']
+    search_fields = SEARCH_FIELDS
+    ordering_fields = ['name', 'host', 'current_status', 'created_at']
     
     def get_queryset(self):
         """Return websites for the current user only"""
@@ -28,10 +57,33 @@ class WebsiteViewSet(viewsets.ModelViewSet):
             return WebsiteCreateSerializer
         return WebsiteSerializer
     
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['columnar'] = self.is_columnar()
+        return context
+    
+    def is_columnar(self):
+        """Whether the client asked for parallel-array check payloads"""
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        return isinstance(renderer, ColumnarJSONRenderer)
+    
+    def perform_create(self, serializer):
+        serializer.save()
+        forget(self.request.user.id)
+    
+    def perform_update(self, serializer):
+        previous_status = serializer.instance.status
+        website = serializer.save()
+        if website.status != previous_status:
+            forget(self.request.user.id)
+            status_changed([website.id])
+    
     def perform_destroy(self, instance):
         """Soft delete by setting status to 'deleted'"""
         instance.status = 'deleted'
         instance.save()
+        forget(self.request.user.id)
+        status_changed([instance.id])
     
     @action(detail=True, methods=['post'])
     def check_status(self, request, pk=None):
@@ -50,18 +102,163 @@ class WebsiteViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['post'])
     def check_all(self, request):
         """Trigger status checks for all user's websites"""
-        websites = self.get_queryset()
-        task_ids = []
-        
-        for website in websites:
-            task = check_website_status.delay(website.id)
-            task_ids.append(task.id)
+        group_id, total = dispatch_website_checks(self.get_queryset())
         
         return Response({
-            'message': f'Status checks initiated for {websites.count()} websites',
-            'task_ids': task_ids
+            'message': f'Status checks initiated for {total} websites',
+            'group_id': group_id
         }, status=status.HTTP_202_ACCEPTED)
     
+    @action(detail=False, methods=['post'], parser_classes=[JSONParser, CSVParser])
+    def bulk_import(self, request):
+        """
+        Import many websites at once from a JSON list or a CSV upload
+        
+        Rows are validated in batch, existing (user, url) pairs are looked
+        up with a single query and new websites are inserted with
+        bulk_create, retried if a concurrent import added some of the URLs
+        first. Returns one result entry per input row.
+        """
+        rows = request.data
+        if isinstance(rows, dict):
+            rows = rows.get('websites')
+        if not isinstance(rows, list):
+            return Response(
+                {'error': 'Expected a list of websites or a CSV upload'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        max_rows = settings.WEBSITE_BULK_IMPORT_MAX_ROWS
+        if len(rows) > max_rows:
+            return Response(
+                {'error': f'Too many rows: at most {max_rows} websites can be imported at once'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        results = [None] * len(rows)
+        valid_rows = []
+        
+        # Syntactic validation, no queries
+        for index, row in enumerate(rows):
+            if isinstance(row, dict):
+                row = {key: value for key, value in row.items() if value not in ('', None)}
+            serializer = WebsiteImportRowSerializer(data=row)
+            if serializer.is_valid():
+                valid_rows.append((index, serializer.validated_data))
+            else:
+                results[index] = {'row': index, 'status': 'invalid', 'errors': serializer.errors}
+        
+        # Resolve (user, url) conflicts with the database and within the batch.
+        # A concurrent import can still insert one of the URLs before this
+        # one commits; the insert then fails and conflicts are resolved again.
+        for attempt in range(settings.WEBSITE_BULK_IMPORT_ATTEMPTS):
+            existing_urls = self.get_existing_urls([data['url'] for _, data in valid_rows])
+            
+            pending = []
+            for index, data in valid_rows:
+                if data['url'] in existing_urls:
+                    results[index] = {'row': index, 'status': 'duplicate', 'url': data['url']}
+                    continue
+                existing_urls.add(data['url'])
+                pending.append((index, Website(user=request.user, host=normalize_host(data['url']), **data)))
+            
+            try:
+                with transaction.atomic():
+                    created = Website.objects.bulk_create(
+                        [website for _, website in pending],
+                        batch_size=settings.WEBSITE_BULK_IMPORT_BATCH_SIZE
+                    )
+                break
+            except IntegrityError:
+                if attempt == settings.WEBSITE_BULK_IMPORT_ATTEMPTS - 1:
+                    raise
+        
+        for (index, _), website in zip(pending, created):
+            results[index] = {'row': index, 'status': 'created', 'id': website.id, 'url': website.url}
+        
+        # Stagger the first checks instead of probing everything at once
+        created_ids = [website.id for website in created]
+        if created_ids:
+            forget(request.user.id)
+            transaction.on_commit(lambda: schedule_initial_checks.delay(created_ids))
+        
+        return Response({
+            'created': len(created_ids),
+            'duplicates': sum(1 for result in results if result['status'] == 'duplicate'),
+            'invalid': sum(1 for result in results if result['status'] == 'invalid'),
+            'results': results
+        }, status=status.HTTP_201_CREATED if created_ids else status.HTTP_200_OK)
+    
+    def get_existing_urls(self, urls):
+        """Return the subset of `urls` the user already monitors"""
+        return set(
+            Website.objects.filter(user=self.request.user, url__in=urls).values_list('url', flat=True)
+        )
+    
+    def get_period_start(self, period):
+        """Return the start of a '1h', '24h', '7d' or '30d' period (default 24h)"""
+        now = timezone.now()
+        if period == '1h':
+            return now - timedelta(hours=1)
+        elif period == '7d':
+            return now - timedelta(days=7)
+        elif period == '30d':
+            return now - timedelta(days=30)
+        return now - timedelta(hours=24)
+    
+    @action(detail=True, methods=['get'])
+    def incidents(self, request, pk=None):
+        """List outages for a website with the uptime they leave over the period"""
+        website = self.get_object()
+        
+        period = request.query_params.get('period', '24h')
+        start_time = self.get_period_start(period)
+        now = timezone.now()
+        
+        incidents = website.incidents.filter(
+            Q(ended_at__isnull=True) | Q(ended_at__gt=start_time)
+        ).order_by('-started_at')
+        
+        return Response({
+            'website': website.name,
+            'period': period,
+            'uptime_percentage': round(website.uptime_between(start_time, now), 3),
+            'incidents': IncidentSerializer(incidents, many=True).data
+        })
+    
+    @action(detail=True, methods=['get'])
+    def certificate(self, request, pk=None):
+        """Latest cached TLS certificate inspection for a website"""
+        website = self.get_object()
+        
+        endpoint = certificate_endpoint(website.url)
+        certificate = endpoint and TLSCertificate.objects.filter(host=endpoint[0], port=endpoint[1]).first()
+        if not certificate:
+            return Response({'error': 'No certificate information yet'}, status=status.HTTP_404_NOT_FOUND)
+        
+        return Response(TLSCertificateSerializer(certificate).data)
+    
+    @action(detail=True, methods=['get'])
+    def sla(self, request, pk=None):
+        """SLA figures for a website over ?start=&end= (default: this month)"""
+        website = self.get_object()
+        
+        window = SLAWindowSerializer(data=request.query_params)
+        window.is_valid(raise_exception=True)
+        
+        reports = build_reports([website], window.validated_data['start'], window.validated_data['end'])
+        return Response(SLAReportSerializer(reports[0]).data)
+    
+    @action(detail=False, methods=['get'])
+    def sla_report(self, request):
+        """SLA figures for all of the user's websites over ?start=&end="""
+        window = SLAWindowSerializer(data=request.query_params)
+        window.is_valid(raise_exception=True)
+        
+        websites = list(self.get_queryset().only('id', 'name'))
+        reports = build_reports(websites, window.validated_data['start'], window.validated_data['end'])
+        return Response(SLAReportSerializer(reports, many=True).data)
+    
     @action(detail=True, methods=['get'])
     def history(self, request, pk=None):
         """Get status history for a specific website"""
@@ -72,80 +269,40 @@ class WebsiteViewSet(viewsets.ModelViewSet):
         limit = int(request.query_params.get('limit', '100'))
         
         # Calculate time range
-        now = timezone.now()
-        if period == '1h':
-            start_time = now - timedelta(hours=1)
-        elif period == '24h':
-            start_time = now - timedelta(hours=24)
-        elif period == '7d':
-            start_time = now - timedelta(days=7)
-        elif period == '30d':
-            start_time = now - timedelta(days=30)
-        else:
-            start_time = now - timedelta(hours=24)
+        start_time = self.get_period_start(period)
         
         # Get status checks
         status_checks = website.status_checks.filter(
             checked_at__gte=start_time
-        ).order_by('-checked_at')[:limit]
+        ).select_related('error').order_by('-checked_at')[:limit]
+        
+        if self.is_columnar():
+            checks = columnar_checks(status_checks.values_list(
+                'id', 'checked_at', 'status', 'status_code', 'response_time', 'error__text', *TIMING_FIELDS
+            ))
+            timings = {field: checks[field] for field in TIMING_FIELDS}
+        else:
+            status_checks = list(status_checks)
+            checks = StatusCheckSerializer(status_checks, many=True).data
+            timings = {field: [getattr(check, field) for check in status_checks] for field in TIMING_FIELDS}
+        
+        # Average of each probe phase over the returned checks, to spot the bottleneck
+        timing_averages = {}
+        for field, values in timings.items():
+            values = [value for value in values if value is not None]
+            timing_averages[field] = round(sum(values) / len(values), 1) if values else None
         
-        serializer = StatusCheckSerializer(status_checks, many=True)
         return Response({
             'website': website.name,
             'period': period,
-            'checks': serializer.data
+            'timing_averages': timing_averages,
+            'checks': checks
         })
     
     @action(detail=False, methods=['get'])
     def dashboard_stats(self, request):
-        """Get dashboard statistics for the current user"""
-        websites = self.get_queryset()
-        
-        # Basic counts
-        total_websites = websites.count()
-        
-        # Get latest status for each website
-        online_count = 0
-        offline_count = 0
-        total_response_time = 0
-        response_time_count = 0
-        total_uptime = 0
-        
-        for website in websites:
-            latest_check = website.latest_status_check
-            if latest_check:
-                if latest_check.status == 'online':
-                    online_count += 1
-                else:
-                    offline_count += 1
-                
-                if latest_check.response_time:
-                    total_response_time += latest_check.response_time
-                    response_time_count += 1
-            
-            uptime = website.uptime_percentage
-            if uptime is not None:
-                total_uptime += uptime
-        
-        # Calculate averages
-        avg_response_time = (total_response_time / response_time_count) if response_time_count > 0 else 0
-        avg_uptime = (total_uptime / total_websites) if total_websites > 0 else 0
-        
-        # Count alerts in last 24 hours
-        alerts_24h = AlertNotification.objects.filter(
-            alert__website__user=request.user,
-            sent_at__gte=timezone.now() - timedelta(hours=24)
-        ).count()
-        
-        stats = {
-            'total_websites': total_websites,
-            'online_websites': online_count,
-            'offline_websites': offline_count,
-            'average_response_time': round(avg_response_time, 2),
-            'average_uptime': round(avg_uptime, 2),
-            'alerts_last_24h': alerts_24h
-        }
-        
+        """Get dashboard statistics for the current user (one read of the write-through aggregate)"""
+        stats = get_dashboard_stats(request.user.id)
         serializer = DashboardStatsSerializer(stats)
         return Response(serializer.data)
 
@@ -161,7 +318,7 @@ class StatusCheckViewSet(viewsets.ReadOnlyModelViewSet):
         return StatusCheck.objects.filter(
             website__user=self.request.user,
             website__status='active'
-        ).order_by('-checked_at')
+        ).select_related('error').order_by('-checked_at')
 
 
 class UptimeAlertViewSet(viewsets.ModelViewSet):
@@ -188,4 +345,89 @@ class AlertNotificationViewSet(viewsets.ReadOnlyModelViewSet):
         """Return notifications for the current user's websites only"""
         return AlertNotification.objects.filter(
             alert__website__user=self.request.user
-        ).order_by('-sent_at')
\ No newline at end of file
+        ).select_related('alert', 'status_check__error').order_by('-sent_at')
+
+
+class NotificationChannelViewSet(viewsets.ModelViewSet):
+    """ViewSet for managing where alert notifications are delivered"""
+    
+    serializer_class = NotificationChannelSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        """Return channels for the current user only"""
+        return NotificationChannel.objects.filter(user=self.request.user)
+
+
+class StatusPageViewSet(viewsets.ModelViewSet):
+    """ViewSet for managing public status pages; every change re-renders the page"""
+    
+    serializer_class = StatusPageSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        """Return status pages for the current user only"""
+        return StatusPage.objects.filter(user=self.request.user).prefetch_related('websites')
+    
+    def perform_create(self, serializer):
+        self.publish(serializer.save())
+    
+    def perform_update(self, serializer):
+        old_slug = serializer.instance.slug
+        page = serializer.save()
+        if page.slug != old_slug:
+            unpublish(old_slug)
+        self.publish(page)
+    
+    def perform_destroy(self, instance):
+        unpublish(instance.slug)
+        instance.delete()
+    
+    def publish(self, page):
+        if page.is_public:
+            render(page)
+        else:
+            unpublish(page.slug)
+
+
+@require_http_methods(['GET', 'HEAD'])
+def status_page(request, slug):
+    """
+    Public, unauthenticated status page snapshot
+    
+    Serves the pre-rendered JSON straight from the cache with public
+    caching headers and an ETag, so traffic spikes during an outage cost
+    no database queries and can be absorbed by a CDN.
+    """
+    rendered = get_rendered(slug)
+    if rendered is None:
+        return HttpResponseNotFound('Unknown status page')
+    
+    if request.headers.get('If-None-Match') == rendered['etag']:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(rendered['body'], content_type='application/json')
+    response['ETag'] = rendered['etag']
+    response['Cache-Control'] = (
+        f'public, max-age={settings.STATUS_PAGE_MAX_AGE}, '
+        f'stale-while-revalidate={settings.STATUS_PAGE_STALE_SECONDS}'
+    )
+    response['Access-Control-Allow-Origin'] = '*'
+    return response
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'HEAD', 'POST'])
+def heartbeat(request, token):
+    """
+    Ping endpoint of a heartbeat monitor
+    
+    Kept outside DRF and free of database writes: the token is resolved
+    through the cache and the ping time buffered in Redis until the next
+    sweep_heartbeats run.
+    """
+    website_id = resolve_token(token)
+    if website_id is None:
+        return HttpResponseNotFound('Unknown heartbeat')
+    record_ping(website_id)
+    return HttpResponse('OK', content_type='text/plain')